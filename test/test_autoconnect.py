@@ -0,0 +1,745 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# ******************************************************************************
+# ZYNTHIAN PROJECT: Zynthian Autoconnector
+#
+# Autoconnect regression tests & benchmark, using an in-process fake JACK client
+#
+# Copyright (C) 2015-2024 Fernando Moyano <jofemodo@zynthian.org>
+#
+# ******************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+# ******************************************************************************
+#
+# Runs zynautoconnect's MIDI & audio routing passes against synthetic setups
+# (chains, USB MIDI devices, ...) with JACK replaced by an in-memory fake that
+# records every call. No JACK server, zyncore library or hardware is needed.
+#
+# Run regression tests:
+#   python3 test/test_autoconnect.py
+# Run benchmark:
+#   python3 test/test_autoconnect.py --benchmark [--chains 1,4,16,32] [--devices 0,4,16] [--json]
+#
+# ******************************************************************************
+
+import os
+import re
+import sys
+import json
+import types
+import argparse
+import unittest
+import importlib.util
+from time import perf_counter
+from threading import Lock
+from collections import Counter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# ------------------------------------------------------------------------------
+# Fake JACK
+# ------------------------------------------------------------------------------
+
+
+class fake_jack_error(Exception):
+    pass
+
+
+class fake_jack_port:
+
+    def __init__(self, client, name, is_input, is_midi, is_physical=False, aliases=None):
+        """Fake JACK port
+
+        client : Fake JACK client owning port
+        name : Full port name (client:port)
+        is_input : True for input (destination) ports
+        is_midi : True for MIDI ports, False for audio ports
+        is_physical : True for hardware ports
+        aliases : List of port aliases
+        """
+
+        self.client = client
+        self.name = name
+        self.shortname = name.split(":", 1)[1]
+        self.is_input = is_input
+        self.is_output = not is_input
+        self.is_midi = is_midi
+        self.is_audio = not is_midi
+        self.is_physical = is_physical
+        self._aliases = list(aliases) if aliases else []
+
+    @property
+    def aliases(self):
+        self.client.calls["get_aliases"] += 1
+        return list(self._aliases)
+
+    def set_alias(self, alias):
+        self.client.calls["set_alias"] += 1
+        if len(self._aliases) < 2:
+            self._aliases.append(alias)
+
+    def unset_alias(self, alias):
+        self.client.calls["unset_alias"] += 1
+        self._aliases.remove(alias)
+
+    def __repr__(self):
+        return f"fake_jack_port('{self.name}')"
+
+
+class fake_jack_client:
+
+    def __init__(self, name="Zynthian_autoconnect"):
+        """In-memory JACK client, recording calls, connections and callbacks
+
+        name : Client name
+        """
+
+        self.name = name
+        self.ports = {}  # Ports indexed by name, in registration order
+        self.connections = set()  # Set of (source name, destination name)
+        self.calls = Counter()  # Number of calls indexed by method name
+        self.log = []  # List of ("connect"|"disconnect", source name, destination name)
+        self.samplerate = 48000
+        self.blocksize = 256
+        self.cb_port_registration = None
+        self.cb_port_rename = None
+        self.cb_client_registration = None
+        self.cb_port_connect = None
+
+    # Setup
+
+    def add_port(self, name, is_input, is_midi, is_physical=False, aliases=None):
+        port = fake_jack_port(self, name, is_input, is_midi, is_physical, aliases)
+        self.ports[name] = port
+        if self.cb_port_registration:
+            self.cb_port_registration(port, True)
+        return port
+
+    def remove_port(self, name):
+        port = self.ports.pop(name)
+        for src, dst in list(self.connections):
+            if name in (src, dst):
+                self.connections.discard((src, dst))
+                if self.cb_port_connect:
+                    self.cb_port_connect(self.ports.get(src, port), self.ports.get(dst, port), False)
+        if self.cb_port_registration:
+            self.cb_port_registration(None, False)
+
+    def reset_stats(self):
+        self.calls.clear()
+        self.log = []
+
+    # JACK-Client API
+
+    def get_ports(self, name_pattern='', is_audio=False, is_midi=False, is_input=False, is_output=False, is_physical=False):
+        self.calls["get_ports"] += 1
+        regex = re.compile(name_pattern)
+        result = []
+        for port in self.ports.values():
+            if is_audio and not port.is_audio or is_midi and not port.is_midi:
+                continue
+            if is_input and not port.is_input or is_output and not port.is_output:
+                continue
+            if is_physical and not port.is_physical:
+                continue
+            if regex.search(port.name):
+                result.append(port)
+        return result
+
+    def get_port_by_name(self, name):
+        self.calls["get_port_by_name"] += 1
+        try:
+            return self.ports[name]
+        except KeyError:
+            raise fake_jack_error(f"Port '{name}' not available")
+
+    def get_all_connections(self, port):
+        self.calls["get_all_connections"] += 1
+        name = getattr(port, "name", port)
+        result = []
+        for src, dst in self.connections:
+            if dst == name:
+                result.append(self.ports[src])
+            elif src == name:
+                result.append(self.ports[dst])
+        return result
+
+    def connect(self, source, destination):
+        self.calls["connect"] += 1
+        src = getattr(source, "name", source)
+        dst = getattr(destination, "name", destination)
+        if src not in self.ports or dst not in self.ports:
+            raise fake_jack_error(f"Can't connect '{src}' => '{dst}'")
+        if (src, dst) in self.connections:
+            raise fake_jack_error(f"Connection '{src}' => '{dst}' already exists")
+        self.connections.add((src, dst))
+        self.log.append(("connect", src, dst))
+        if self.cb_port_connect:
+            self.cb_port_connect(self.ports[src], self.ports[dst], True)
+
+    def disconnect(self, source, destination):
+        self.calls["disconnect"] += 1
+        src = getattr(source, "name", source)
+        dst = getattr(destination, "name", destination)
+        if (src, dst) not in self.connections:
+            raise fake_jack_error(f"Can't disconnect '{src}' => '{dst}'")
+        self.connections.discard((src, dst))
+        self.log.append(("disconnect", src, dst))
+        if self.cb_port_connect:
+            self.cb_port_connect(self.ports[src], self.ports[dst], False)
+
+    def set_xrun_callback(self, callback):
+        pass
+
+    def set_port_registration_callback(self, callback, only_available=True):
+        self.cb_port_registration = callback
+
+    def set_port_rename_callback(self, callback, only_available=True):
+        self.cb_port_rename = callback
+
+    def set_client_registration_callback(self, callback):
+        self.cb_client_registration = callback
+
+    def set_port_connect_callback(self, callback, only_available=True):
+        self.cb_port_connect = callback
+
+    def activate(self):
+        pass
+
+    def deactivate(self):
+        pass
+
+    def cpu_load(self):
+        return 0.0
+
+
+class fake_lib_zyncore:
+    """Accepts any lib_zyncore call, returning 1 (e.g. MIDI input device in active chain mode)"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: 1
+
+
+def install_fake_modules():
+    """Replace JACK & zyncore python modules with fakes, so zynautoconnect can be imported anywhere"""
+
+    jack = types.ModuleType("jack")
+    jack.Client = fake_jack_client
+    jack.Port = fake_jack_port
+    jack.JackError = fake_jack_error
+    sys.modules["jack"] = jack
+
+    zyncore = types.ModuleType("zyncoder.zyncore")
+    zyncore.lib_zyncore = fake_lib_zyncore()
+    sys.modules["zyncoder.zyncore"] = zyncore
+
+    # pyusb is only used for "in-hw-" ALSA ports, which aren't simulated
+    try:
+        import usb
+    except ImportError:
+        sys.modules["usb"] = types.ModuleType("usb")
+
+
+install_fake_modules()
+
+from zynautoconnect import zynthian_autoconnect as za
+from zyngui import zynthian_gui_config
+
+# MIDI options are loaded by state manager
+zynthian_gui_config.set_midi_config()
+
+# Load chain module alone, avoiding zyngine package, which imports all engines
+spec = importlib.util.spec_from_file_location("zynthian_chain", os.path.join(ROOT_DIR, "zyngine", "zynthian_chain.py"))
+zynthian_chain_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(zynthian_chain_module)
+zynthian_chain = zynthian_chain_module.zynthian_chain
+
+# ------------------------------------------------------------------------------
+# Fake Zynthian objects
+# ------------------------------------------------------------------------------
+
+NUM_MIDI_DEVS = 24
+ZMIP_SEQ_INDEX = NUM_MIDI_DEVS
+ZMIP_STEP_INDEX = NUM_MIDI_DEVS + 1
+ZMIP_INT_INDEX = NUM_MIDI_DEVS + 2
+MAIN_MIXER_CHAN = za.MAIN_MIX_CHAN - 1
+
+
+class fake_engine:
+
+    def __init__(self, jackname):
+        self.jackname = jackname
+        self.options = {"ctrl_fb": False}
+
+    def get_jackname(self):
+        return self.jackname
+
+
+class fake_processor:
+
+    next_id = 1
+
+    def __init__(self, jackname, type):
+        self.id = fake_processor.next_id
+        fake_processor.next_id += 1
+        self.type = type
+        self.engine = fake_engine(jackname)
+        self.jackname = jackname
+        self.chain = None
+        self.chain_id = None
+        self.midi_chan = None
+
+    def get_jackname(self, engine=False):
+        return self.jackname
+
+    def set_chain(self, chain):
+        self.chain = chain
+        self.chain_id = chain.chain_id
+
+    def set_midi_chan(self, midi_chan):
+        self.midi_chan = midi_chan
+
+
+class fake_chain_manager:
+
+    def __init__(self):
+        self.chains = {}
+        self.processors = {}
+
+    def get_chain(self, chain_id):
+        return self.chains.get(chain_id)
+
+    def get_chain_midi_routing(self, chain_id):
+        return self.chains[chain_id].midi_routes
+
+    def get_chain_audio_routing(self, chain_id):
+        return self.chains[chain_id].audio_routes
+
+    def get_processors(self, chain_id, type=None, slot=None):
+        return self.chains[chain_id].get_processors(type, slot)
+
+
+class fake_ctrldev_manager:
+
+    def __init__(self):
+        self.loaded = set()
+
+    def load_driver(self, izmip):
+        self.loaded.add(izmip)
+
+    def unload_driver(self, izmip):
+        self.loaded.discard(izmip)
+
+
+class fake_zynmixer:
+
+    def normalise(self, chan, enable):
+        pass
+
+
+class fake_state_manager:
+
+    def __init__(self, chain_manager, num_zmop_chains):
+        self.chain_manager = chain_manager
+        self.ctrldev_manager = fake_ctrldev_manager()
+        self.zynmixer = fake_zynmixer()
+        self.audio_player = None
+        self.aubio_in = [1, 2]
+        self.power_save_mode = False
+        self.status_xrun = False
+        self.num_zmop_chains = num_zmop_chains
+
+    def get_num_midi_devs_in(self):
+        return NUM_MIDI_DEVS + 3
+
+    def get_num_midi_devs_out(self):
+        return NUM_MIDI_DEVS
+
+    def get_max_num_midi_devs(self):
+        return NUM_MIDI_DEVS
+
+    def get_num_zmop_chains(self):
+        return self.num_zmop_chains
+
+    def get_zmip_seq_index(self):
+        return ZMIP_SEQ_INDEX
+
+    def get_zmip_step_index(self):
+        return ZMIP_STEP_INDEX
+
+    def get_zmip_int_index(self):
+        return ZMIP_INT_INDEX
+
+
+# ------------------------------------------------------------------------------
+# Synthetic setups
+# ------------------------------------------------------------------------------
+
+def mixer_chan_of(chain_id):
+    """Mixer channel of chain, skipping main mixbus channel"""
+
+    chan = chain_id - 1
+    if chan >= MAIN_MIXER_CHAN:
+        chan += 1
+    return chan
+
+
+class autoconnect_setup:
+
+    def __init__(self, num_chains=4, num_devices=2, num_fx=0):
+        """Build a synthetic Zynthian setup and attach zynautoconnect to it
+
+        num_chains : Number of synth chains (1..32)
+        num_devices : Number of USB MIDI devices, each one with an input and an output port
+        num_fx : Number of audio effects in each chain
+        """
+
+        self.num_chains = num_chains
+        self.num_devices = 0
+        self.client = fake_jack_client()
+        self.chain_manager = fake_chain_manager()
+        self.state_manager = fake_state_manager(self.chain_manager, max(17, num_chains + 1))
+        self.add_core_ports()
+        for i in range(num_devices):
+            self.add_usb_device()
+        self.attach()
+        self.add_chain(0)
+        for chain_id in range(1, num_chains + 1):
+            self.add_chain(chain_id, num_fx)
+
+    def add_core_ports(self):
+        add = self.client.add_port
+        for i in range(1, 3):
+            add(f"system:capture_{i}", False, False, True)
+            add(f"system:playback_{i}", True, False, True)
+        add("ttymidi:MIDI_in", False, True, True, ["ttymidi:MIDI_in", "DIN-5 MIDI"])
+        add("ttymidi:MIDI_out", True, True, True, ["ttymidi:MIDI_out", "DIN-5 MIDI"])
+        for i in range(NUM_MIDI_DEVS + 3):
+            add(f"ZynMidiRouter:dev{i}_in", True, True)
+        for i in range(NUM_MIDI_DEVS):
+            add(f"ZynMidiRouter:dev{i}_out", False, True)
+        for i in range(self.state_manager.num_zmop_chains):
+            add(f"ZynMidiRouter:ch{i}_out", False, True)
+        for name in ("step_in", "seq_in", "ctrl_in"):
+            add(f"ZynMidiRouter:{name}", True, True)
+        for name in ("step_out", "ctrl_out"):
+            add(f"ZynMidiRouter:{name}", False, True)
+        add("zynseq:input", True, True)
+        add("zynseq:output", False, True)
+        add("zynseq:metronome", False, False)
+        add("zynsmf:midi_in", True, True)
+        add("zynsmf:midi_out", False, True)
+        for chan in range(max(MAIN_MIXER_CHAN, mixer_chan_of(self.num_chains)) + 1):
+            for side in "ab":
+                add(f"zynmixer:input_{chan + 1:02d}{side}", True, False)
+                add(f"zynmixer:output_{chan + 1:02d}{side}", False, False)
+
+    def add_usb_device(self):
+        """Plug a USB MIDI device with one input and one output port
+
+        Returns : Index of device
+        """
+
+        i = self.num_devices
+        self.num_devices += 1
+        name = f"Controller {i}"
+        self.client.add_port(f"a2j:{name} [{20 + i}] (capture): {name} MIDI 1", False, True, True,
+                             [f"USB:1.{i + 1}/{name} IN 1", name])
+        self.client.add_port(f"a2j:{name} [{20 + i}] (playback): {name} MIDI 1", True, True, True,
+                             [f"USB:1.{i + 1}/{name} OUT 1", name])
+        return i
+
+    def remove_usb_device(self, i):
+        """Unplug a USB MIDI device
+
+        i : Index of device
+        """
+
+        name = f"Controller {i}"
+        self.client.remove_port(f"a2j:{name} [{20 + i}] (capture): {name} MIDI 1")
+        self.client.remove_port(f"a2j:{name} [{20 + i}] (playback): {name} MIDI 1")
+
+    def attach(self):
+        """Attach zynautoconnect to fake JACK client & managers, like zynautoconnect.start, without thread"""
+
+        za.jclient = self.client
+        za.state_manager = self.state_manager
+        za.chain_manager = self.chain_manager
+        za.lock = Lock()
+        za.exit_flag = False
+        za.paused_flag = False
+        za.devices_in.clear()
+        za.devices_in_mode.clear()
+        za.devices_out.clear()
+        za.devices_out_name.clear()
+        za.hw_midi_src_ports = []
+        za.hw_midi_dst_ports = []
+        za.zyn_routed_audio.clear()
+        za.zyn_routed_midi.clear()
+        za.ctrl_fb_procs.clear()
+        za.sidechain_ports.clear()
+        za.jack_routes_dirty = True
+        za.invalidate_port_info()
+        self.client.set_port_registration_callback(za.cb_jack_port_registration, only_available=False)
+        self.client.set_port_rename_callback(za.cb_jack_port_rename, only_available=False)
+        self.client.set_client_registration_callback(za.cb_jack_client_registration)
+        self.client.set_port_connect_callback(za.cb_jack_port_connect)
+        za.init()
+        za.hw_audio_dst_ports = self.client.get_ports("system:playback", is_input=True, is_audio=True, is_physical=True)
+
+    def add_chain(self, chain_id, num_fx=0):
+        """Add a chain. Chain 0 is main mixbus, other chains get a synth and optional audio effects.
+
+        chain_id : Chain ID
+        num_fx : Number of audio effects
+        """
+
+        if chain_id == 0:
+            chain = zynthian_chain(0)
+            chain.mixer_chan = MAIN_MIXER_CHAN
+        else:
+            chain = zynthian_chain(chain_id, (chain_id - 1) % 16)
+            chain.set_zmop_index(chain_id - 1)
+            chain.mixer_chan = mixer_chan_of(chain_id)
+            synth = fake_processor(f"synth_{chain_id:02d}", "MIDI Synth")
+            self.add_processor_ports(synth.jackname, True)
+            chain.insert_processor(synth)
+            self.chain_manager.processors[synth.id] = synth
+        self.chain_manager.chains[chain_id] = chain
+        for i in range(num_fx):
+            self.add_fx(chain_id)
+        chain.rebuild_graph()
+        return chain
+
+    def add_fx(self, chain_id):
+        """Add an audio effect at end of chain's pre-fader slots
+
+        chain_id : Chain ID
+        """
+
+        chain = self.chain_manager.chains[chain_id]
+        fx = fake_processor(f"fx_{chain_id:02d}_{len(chain.audio_slots) + 1:02d}", "Audio Effect")
+        self.add_processor_ports(fx.jackname, False)
+        chain.insert_processor(fx)
+        chain.fader_pos = len(chain.audio_slots)
+        self.chain_manager.processors[fx.id] = fx
+        chain.rebuild_graph()
+        return fx
+
+    def add_processor_ports(self, jackname, is_synth):
+        if is_synth:
+            self.client.add_port(f"{jackname}:midi_in", True, True)
+        else:
+            for i in range(1, 3):
+                self.client.add_port(f"{jackname}:in_{i}", True, False)
+        for i in range(1, 3):
+            self.client.add_port(f"{jackname}:out_{i}", False, False)
+
+    def run(self):
+        """Run a full autoconnect pass, like autoconnect thread on graph change
+
+        Returns : Dictionary with wall time, JACK call counts and route changes
+        """
+
+        self.client.reset_stats()
+        ts = perf_counter()
+        za.update_hw_midi_ports()
+        za.midi_autoconnect()
+        za.audio_autoconnect()
+        elapsed = perf_counter() - ts
+        return {
+            "time_ms": elapsed * 1000,
+            "jack_calls": sum(self.client.calls.values()),
+            "calls": dict(self.client.calls),
+            "connects": sum(1 for entry in self.client.log if entry[0] == "connect"),
+            "disconnects": sum(1 for entry in self.client.log if entry[0] == "disconnect"),
+            "routes": len(self.client.connections)
+        }
+
+    def is_connected(self, src, dst):
+        return (src, dst) in self.client.connections
+
+
+# ------------------------------------------------------------------------------
+# Regression tests
+# ------------------------------------------------------------------------------
+
+class test_autoconnect(unittest.TestCase):
+
+    def test_aa00_device_routes(self):
+        setup = autoconnect_setup(num_chains=2, num_devices=3)
+        setup.run()
+        for i in range(3):
+            src = f"a2j:Controller {i} [{20 + i}] (capture): Controller {i} MIDI 1"
+            devnum = za.devices_in.index(setup.client.ports[src])
+            self.assertTrue(setup.is_connected(src, f"ZynMidiRouter:dev{devnum}_in"))
+            dst = f"a2j:Controller {i} [{20 + i}] (playback): Controller {i} MIDI 1"
+            devnum = za.devices_out.index(setup.client.ports[dst])
+            self.assertTrue(setup.is_connected(f"ZynMidiRouter:dev{devnum}_out", dst))
+        self.assertTrue(setup.is_connected("zynseq:output", "ZynMidiRouter:step_in"))
+        self.assertTrue(setup.is_connected("zynsmf:midi_out", "ZynMidiRouter:seq_in"))
+        self.assertTrue(setup.is_connected("ZynMidiRouter:step_out", "zynseq:input"))
+
+    def test_aa01_chain_routes(self):
+        setup = autoconnect_setup(num_chains=4, num_devices=1)
+        setup.run()
+        for chain_id in range(1, 5):
+            self.assertTrue(setup.is_connected(f"ZynMidiRouter:ch{chain_id - 1}_out", f"synth_{chain_id:02d}:midi_in"))
+            mixer_input = f"zynmixer:input_{mixer_chan_of(chain_id) + 1:02d}"
+            self.assertTrue(setup.is_connected(f"synth_{chain_id:02d}:out_1", f"{mixer_input}a"))
+            self.assertTrue(setup.is_connected(f"synth_{chain_id:02d}:out_2", f"{mixer_input}b"))
+        main_output = f"zynmixer:output_{MAIN_MIXER_CHAN + 1:02d}"
+        self.assertTrue(setup.is_connected(f"{main_output}a", "system:playback_1"))
+        self.assertTrue(setup.is_connected(f"{main_output}b", "system:playback_2"))
+
+    def test_aa02_steady_state(self):
+        setup = autoconnect_setup(num_chains=8, num_devices=4, num_fx=1)
+        setup.run()
+        result = setup.run()
+        self.assertEqual(result["connects"], 0)
+        self.assertEqual(result["disconnects"], 0)
+        self.assertEqual(result["calls"].get("get_all_connections", 0), 0)
+
+    def test_aa03_chain_edit(self):
+        setup = autoconnect_setup(num_chains=4, num_devices=1)
+        setup.run()
+        fx = setup.add_fx(2)
+        result = setup.run()
+        mixer_input = f"zynmixer:input_{mixer_chan_of(2) + 1:02d}"
+        self.assertTrue(setup.is_connected("synth_02:out_1", f"{fx.jackname}:in_1"))
+        self.assertTrue(setup.is_connected(f"{fx.jackname}:out_1", f"{mixer_input}a"))
+        self.assertFalse(setup.is_connected("synth_02:out_1", f"{mixer_input}a"))
+        self.assertEqual(result["connects"], 4)
+        self.assertEqual(result["disconnects"], 2)
+
+    def test_aa04_hotplug(self):
+        setup = autoconnect_setup(num_chains=2, num_devices=1)
+        setup.run()
+        za.midi_ports_changed = False
+        i = setup.add_usb_device()
+        # Port registration callback must wake up autoconnect
+        self.assertTrue(za.midi_ports_changed)
+        src = f"a2j:Controller {i} [{20 + i}] (capture): Controller {i} MIDI 1"
+        setup.run()
+        devnum = za.devices_in.index(setup.client.ports[src])
+        self.assertTrue(setup.is_connected(src, f"ZynMidiRouter:dev{devnum}_in"))
+        self.assertIn(devnum, setup.state_manager.ctrldev_manager.loaded)
+        setup.remove_usb_device(i)
+        setup.run()
+        self.assertIsNone(za.devices_in[devnum])
+        self.assertNotIn(devnum, setup.state_manager.ctrldev_manager.loaded)
+
+    def test_aa05_foreign_routes(self):
+        setup = autoconnect_setup(num_chains=2, num_devices=1)
+        setup.run()
+        # Routes made by other clients must be kept
+        setup.client.connect("system:capture_1", "zynmixer:input_01a")
+        setup.client.connect("zynseq:output", "synth_01:midi_in")
+        result = setup.run()
+        self.assertTrue(setup.is_connected("system:capture_1", "zynmixer:input_01a"))
+        self.assertTrue(setup.is_connected("zynseq:output", "synth_01:midi_in"))
+        self.assertEqual(result["disconnects"], 0)
+
+    def test_aa06_port_cache(self):
+        setup = autoconnect_setup(num_chains=4, num_devices=2)
+        setup.run()
+        result = setup.run()
+        # Port metadata is cached => No alias queries and a single MIDI port listing for hardware ports
+        self.assertEqual(result["calls"].get("get_aliases", 0), 0)
+        self.assertEqual(result["calls"]["get_ports"], 3)
+        src = "a2j:Controller 1 [21] (capture): Controller 1 MIDI 1"
+        devnum = za.get_midi_in_devid_by_uid("USB:1.2/Controller 1 IN 1", True)
+        self.assertIs(za.devices_in[devnum], setup.client.ports[src])
+        self.assertEqual(za.get_port_info(setup.client.ports[src]).zmip, devnum)
+        self.assertEqual(za.devices_out[za.dev_in_2_dev_out(devnum)].name,
+                         "a2j:Controller 1 [21] (playback): Controller 1 MIDI 1")
+        # Renamed ports get their new friendly name
+        za.set_port_friendly_name(setup.client.ports[src], "Keys")
+        self.assertEqual(za.get_port_aliases(setup.client.ports[src]), ("USB:1.2/Controller 1 IN 1", "Keys"))
+        # Unplugged device metadata is dropped
+        setup.remove_usb_device(1)
+        setup.run()
+        self.assertNotIn(src, za.port_infos)
+        self.assertIsNone(za.get_midi_in_devid_by_uid("USB:1.2/Controller 1 IN 1", True))
+
+    def test_aa07_model_resync(self):
+        setup = autoconnect_setup(num_chains=2, num_devices=1)
+        setup.run()
+        # Connection removed behind autoconnect's back, without notification
+        setup.client.connections.discard(("synth_01:out_1", "zynmixer:input_01a"))
+        za.jack_routes_dirty = True
+        setup.run()
+        self.assertTrue(setup.is_connected("synth_01:out_1", "zynmixer:input_01a"))
+
+
+# ------------------------------------------------------------------------------
+# Benchmark
+# ------------------------------------------------------------------------------
+
+def benchmark(chain_counts, device_counts, num_fx=1):
+    """Run autoconnect passes on synthetic setups
+
+    chain_counts : List of number of chains
+    device_counts : List of number of USB MIDI devices
+    num_fx : Number of audio effects per chain
+    Returns : List of result dictionaries
+    """
+
+    results = []
+    for num_chains in chain_counts:
+        for num_devices in device_counts:
+            setup = autoconnect_setup(num_chains, num_devices, num_fx)
+            scenarios = [("initial", None),
+                         ("steady", None),
+                         ("chain edit", lambda: setup.add_fx(1)),
+                         ("hotplug", setup.add_usb_device)]
+            for scenario, action in scenarios:
+                if action:
+                    action()
+                result = setup.run()
+                result.update({"chains": num_chains, "devices": num_devices, "scenario": scenario})
+                results.append(result)
+    return results
+
+
+def format_results(results):
+    lines = [f"{'chains':>6} {'devices':>7} {'scenario':<10} {'time(ms)':>9} {'jack calls':>10} {'connects':>8} {'disconnects':>11} {'routes':>6}"]
+    for res in results:
+        lines.append(f"{res['chains']:>6} {res['devices']:>7} {res['scenario']:<10} {res['time_ms']:>9.2f} {res['jack_calls']:>10} {res['connects']:>8} {res['disconnects']:>11} {res['routes']:>6}")
+    return "\n".join(lines)
+
+
+def parse_int_list(text):
+    return [int(i) for i in text.split(",") if i.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="zynautoconnect regression tests & benchmark")
+    parser.add_argument("--benchmark", action="store_true", help="run benchmark instead of tests")
+    parser.add_argument("--chains", default="1,4,16,32", help="comma separated number of chains")
+    parser.add_argument("--devices", default="0,4,16", help="comma separated number of USB MIDI devices")
+    parser.add_argument("--fx", type=int, default=1, help="number of audio effects per chain")
+    parser.add_argument("--json", action="store_true", help="print benchmark results as JSON")
+    args, unittest_args = parser.parse_known_args()
+
+    if args.benchmark:
+        results = benchmark(parse_int_list(args.chains), parse_int_list(args.devices), args.fx)
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            print(format_results(results))
+    else:
+        unittest.main(argv=[sys.argv[0]] + unittest_args)
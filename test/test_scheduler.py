@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# ******************************************************************************
+# ZYNTHIAN PROJECT: Zynthian Scheduler
+#
+# Scheduler regression tests, using a fake clock
+#
+# Copyright (C) 2015-2024 Fernando Moyano <jofemodo@zynthian.org>
+#
+# ******************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+# ******************************************************************************
+#
+# Drives the timer wheel like the scheduler thread does, but with a fake
+# monotonic clock, so long delays are checked without waiting.
+#
+# Run regression tests:
+#   python3 test/test_scheduler.py
+#
+# ******************************************************************************
+
+import os
+import random
+import unittest
+import importlib.util
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Load scheduler module alone, avoiding zyngine package, which imports all engines
+spec = importlib.util.spec_from_file_location("zynthian_scheduler", os.path.join(ROOT_DIR, "zyngine", "zynthian_scheduler.py"))
+zs = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(zs)
+
+# ------------------------------------------------------------------------------
+# Fake clock scheduler
+# ------------------------------------------------------------------------------
+
+
+class fake_clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class fake_clock_scheduler:
+
+    def __init__(self):
+        """Scheduler driven by a fake clock, without thread"""
+
+        self.clock = fake_clock()
+        zs.monotonic = self.clock
+        self.sched = zs.zynthian_scheduler()
+        self.sched.start = lambda: None
+        self.fired = []  # List of (task name, tick)
+
+    def set_tick(self, tick):
+        self.clock.now = tick * zs.TICK + zs.TICK / 2
+
+    def add_oneshot(self, delay, name):
+        return self.sched.add_oneshot(delay, self.on_task, name, name=name)
+
+    def add_periodic(self, period, name):
+        return self.sched.add_periodic(period, self.on_task, name, name=name)
+
+    def on_task(self, name):
+        self.fired.append((name, self.sched.get_tick()))
+
+    def run_until(self, tick):
+        """Run like scheduler thread, sleeping until next wakeup, up to a tick
+
+        tick : Last tick to run
+        """
+
+        sched = self.sched
+        while True:
+            with sched.cond:
+                wakeup = max(sched.get_next_wakeup(), sched.get_tick())
+            if wakeup > tick:
+                self.set_tick(tick)
+                return
+            self.set_tick(wakeup)
+            with sched.cond:
+                due = sched.pop_due_tasks(sched.get_tick())
+            for task in due:
+                sched.run_task(task)
+
+
+# ------------------------------------------------------------------------------
+# Regression tests
+# ------------------------------------------------------------------------------
+
+class test_scheduler(unittest.TestCase):
+
+    def test_aa00_short_delay(self):
+        setup = fake_clock_scheduler()
+        setup.add_oneshot(0.5, "short")
+        setup.run_until(1000)
+        self.assertEqual(setup.fired, [("short", 50)])
+
+    def test_aa01_long_delay(self):
+        setup = fake_clock_scheduler()
+        setup.set_tick(1)
+        setup.run_until(1)
+        setup.add_oneshot(2.99, "long")
+        setup.run_until(20000)
+        self.assertEqual(setup.fired, [("long", 300)])
+
+    def test_aa02_random_delays(self):
+        setup = fake_clock_scheduler()
+        rnd = random.Random(0)
+        expected = {}
+        tick = 0
+        for i in range(3000):
+            tick += rnd.randrange(20)
+            setup.run_until(tick)
+            delay = rnd.randrange(1, 40000)
+            name = f"task{i}"
+            setup.add_oneshot(delay * zs.TICK, name)
+            expected[name] = tick + delay
+        setup.run_until(tick + 50000)
+        self.assertEqual(len(setup.fired), 3000)
+        for name, fired_tick in setup.fired:
+            self.assertEqual(fired_tick, expected[name], name)
+
+    def test_aa03_long_period(self):
+        setup = fake_clock_scheduler()
+        setup.add_periodic(5, "journal")
+        setup.run_until(2600)
+        self.assertEqual([tick for name, tick in setup.fired], [500, 1000, 1500, 2000, 2500])
+
+
+if __name__ == "__main__":
+    unittest.main()
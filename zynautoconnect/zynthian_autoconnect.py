@@ -28,8 +28,8 @@ import usb
 import jack
 import logging
 import json
-from time import sleep
-from threading import Thread, Lock
+from time import sleep, monotonic
+from threading import Thread, Lock, Event
 
 # Zynthian specific modules
 from zyncoder.zyncore import lib_zyncore
@@ -58,6 +58,11 @@ class fake_port:
         self.name = name
         self.short_name = name
         self.aliases = [name, name]
+        self.is_input = False
+        self.is_output = True
+        self.is_midi = True
+        self.is_audio = False
+        self.is_physical = False
 
     def set_alias(self, alias):
         pass
@@ -71,6 +76,14 @@ class fake_port:
 # -------------------------------------------------------------------------------
 
 MAIN_MIX_CHAN = 17 				# TODO: Get this from mixer
+HW_PORTS_POLL_TIME = 10			# Period of fallback hardware MIDI ports check (in seconds)
+GRAPH_DEBOUNCE_TIME = 0.1		# Quiet time after a JACK graph change before running autoconnect (in seconds)
+GRAPH_DEBOUNCE_MAX = 0.5		# Max delay of autoconnect while JACK graph keeps changing (in seconds)
+
+# Virtual MIDI destination ports treated as hardware (regex)
+HW_MIDI_DST_PORTS = ("QmidiNet:in", "jackrtpmidid:rtpmidi_in", "jacknetumpd:netump_in", "RtMidiIn Client:TouchOSC Bridge", "ZynMaster:midi_in", "ZynMidiRouter:seq_in")
+# Virtual MIDI source ports treated as hardware (regex)
+HW_MIDI_SRC_PORTS = ("QmidiNet:out", "jackrtpmidid:rtpmidi_out", "jacknetumpd:netump_out", "RtMidiOut Client:TouchOSC Bridge", "aubio")
 
 jclient = None					# JACK client
 thread = None					# Thread to check for changed MIDI ports
@@ -84,6 +97,14 @@ xruns = 0						# Quantity of xruns since startup or last reset
 deferred_midi_connect = False
 # True to perform audio connect on next port check cycle
 deferred_audio_connect = False
+# Set to wake up autoconnect thread, e.g. when JACK graph changes
+graph_event = Event()
+# True when JACK MIDI ports have been registered, unregistered or renamed
+midi_ports_changed = False
+# True when JACK audio ports have been registered, unregistered or renamed
+audio_ports_changed = False
+# Protects midi_ports_changed & audio_ports_changed, so changes flagged while they are read are not lost
+ports_changed_lock = Lock()
 # List of hardware MIDI  source ports (including network, aubionotes, etc.)
 hw_midi_src_ports = []
 # List of hardware MIDI destination ports (including network, aubionotes, etc.)
@@ -103,17 +124,254 @@ devices_out = []      			# List of MIDI output devices
 devices_out_name = []           # List of MIDI output devices names
 
 # zyn_routed_* are used to avoid changing routes made by other jack clients
-# Map of lists of audio sources routed by zynautoconnect, indexed by destination
+# Map of sets of audio sources routed by zynautoconnect, indexed by destination
 zyn_routed_audio = {}
-# Map of lists of MIDI sources routed by zynautoconnect, indexed by destination
+# Map of sets of MIDI sources routed by zynautoconnect, indexed by destination
 zyn_routed_midi = {}
 
+# Model of actual JACK connections: Map of sets of source port names, indexed by destination port name.
+# It is kept up to date by JACK callbacks, so routing passes don't need to query connections from JACK.
+jack_routes = {}
+jack_routes_lock = Lock()
+# True to reload jack_routes from JACK, e.g. when a change couldn't be tracked
+jack_routes_dirty = True
+
+# Port metadata cache: Map of port_info objects indexed by port name.
+# Entries are dropped by JACK callbacks when ports are registered, unregistered or renamed.
+port_infos = {}
+port_infos_lock = Lock()
+# Incremented each time cache is invalidated, so metadata read before invalidation is not cached
+port_infos_serial = 0
+
 # Processors sending control feedback (connected to zynmidirouter:ctrl_in)
 ctrl_fb_procs = []
 
 # Map of user friendly names indexed by device uid (alias[0])
 midi_port_names = {}
 
+# ------------------------------------------------------------------------------
+# Port snapshot class
+# ------------------------------------------------------------------------------
+
+
+class port_snapshot:
+
+    def __init__(self, **kwargs):
+        """Snapshot of JACK ports, used during a routing pass to resolve port name patterns
+        without querying JACK for each one.
+
+        kwargs : Port type filters passed to jclient.get_ports, e.g. is_midi=True
+        """
+
+        self.inputs = []
+        self.outputs = []
+        for port in jclient.get_ports(**kwargs):
+            if port.is_input:
+                self.inputs.append(port)
+            else:
+                self.outputs.append(port)
+        self.matches = {}
+
+    def get_ports(self, name_pattern='', is_input=False, is_output=False):
+        """Get ports matching a name pattern, like jclient.get_ports
+
+        name_pattern : Regular expression matched against port names
+        is_input : True to get input ports
+        is_output : True to get output ports
+        returns : List of JACK ports
+        """
+
+        key = (name_pattern, is_input, is_output)
+        try:
+            return self.matches[key]
+        except KeyError:
+            pass
+        if is_input and not is_output:
+            ports = self.inputs
+        elif is_output and not is_input:
+            ports = self.outputs
+        else:
+            ports = self.inputs + self.outputs
+        try:
+            regex = re.compile(name_pattern)
+            result = [port for port in ports if regex.search(port.name)]
+        except re.error:
+            result = []
+        self.matches[key] = result
+        return result
+
+
+# ------------------------------------------------------------------------------
+# Port metadata class
+# ------------------------------------------------------------------------------
+
+
+class port_info:
+
+    def __init__(self, port):
+        """Metadata of a JACK port, cached so that routing passes and GUI don't query JACK each time
+
+        port : JACK port object
+        """
+
+        self.name = port.name
+        try:
+            self.uuid = port.uuid
+        except:
+            self.uuid = None
+        self.is_input = port.is_input
+        self.is_midi = port.is_midi
+        self.set_aliases(port.aliases)
+        self.zmip = None  # Index of MIDI input device (devices_in) or None
+        self.zmop = None  # Index of MIDI output device (devices_out) or None
+        # False for ports never used as MIDI devices
+        self.enabled = not self.name.startswith("a2j:Midi Through")
+        # Order of hardware MIDI ports: 0 for physical ports, >0 for virtual ports treated as hardware, None for other ports
+        self.hw_order = None
+        if self.is_midi:
+            if port.is_physical:
+                self.hw_order = 0
+            else:
+                if self.is_input:
+                    patterns = HW_MIDI_DST_PORTS
+                else:
+                    patterns = HW_MIDI_SRC_PORTS
+                for i, pattern in enumerate(patterns):
+                    if re.search(pattern, self.name):
+                        self.hw_order = i + 1
+                        break
+
+    def set_aliases(self, aliases):
+        """Set aliases, uid (alias 1) and friendly name (alias 2)
+
+        aliases : List of port aliases
+        """
+
+        self.aliases = list(aliases)
+        if len(self.aliases) > 1:
+            self.uid = self.aliases[0]
+            self.friendly_name = self.aliases[1]
+        else:
+            self.uid = self.name
+            self.friendly_name = self.name
+
+
+# ------------------------------------------------------------------------------
+# Port metadata cache helpers
+
+def get_port_info(port):
+    """Get metadata of a JACK port from cache, querying JACK only if not cached
+
+    port : JACK port object
+    returns : port_info object
+    """
+
+    try:
+        return port_infos[port.name]
+    except KeyError:
+        pass
+    serial = port_infos_serial
+    info = port_info(port)
+    with port_infos_lock:
+        if serial == port_infos_serial:
+            port_infos[info.name] = info
+    return info
+
+
+def invalidate_port_info(name=None, client=None):
+    """Drop port metadata from cache
+
+    name : Port name (default: all ports)
+    client : Client name, to drop all its ports
+    """
+
+    global port_infos_serial
+    with port_infos_lock:
+        port_infos_serial += 1
+        if name is not None:
+            port_infos.pop(name, None)
+        elif client is not None:
+            prefix = f"{client}:"
+            for port_name in [port_name for port_name in port_infos if port_name.startswith(prefix)]:
+                port_infos.pop(port_name)
+        else:
+            port_infos.clear()
+
+
+# ------------------------------------------------------------------------------
+# Connection model helpers
+
+def update_jack_routes(force=False):
+    """Reload model of actual JACK connections if it may be out of sync
+
+    force : True to reload even if not flagged as out of sync
+    """
+
+    global jack_routes, jack_routes_dirty
+    if not jack_routes_dirty and not force:
+        return
+    jack_routes_dirty = False
+    routes = {}
+    for dst in jclient.get_ports(is_input=True):
+        try:
+            routes[dst.name] = {src.name for src in jclient.get_all_connections(dst)}
+        except:
+            pass
+    with jack_routes_lock:
+        jack_routes = routes
+
+
+def get_jack_routes(dst):
+    """Get sources connected to a destination port, from connection model
+
+    dst : Destination port name
+    returns : Set of source port names
+    """
+
+    with jack_routes_lock:
+        return set(jack_routes.get(dst, ()))
+
+
+def apply_routes(required_routes, zyn_routed, own_required=False):
+    """Connect missing required routes and disconnect routes not required anymore,
+    only changing routes made by zynautoconnect.
+
+    required_routes : Map of sets of source port names, indexed by destination port name
+    zyn_routed : Map of sets of sources routed by zynautoconnect, indexed by destination
+    own_required : True to take ownership of required routes already connected by others
+    """
+
+    global jack_routes_dirty
+    for dst, sources in required_routes.items():
+        routed = zyn_routed.setdefault(dst, set())
+        if own_required:
+            routed |= sources
+        current = get_jack_routes(dst)
+        disconnected = []
+        connected = []
+        for src in current - sources:
+            if src in routed:
+                try:
+                    jclient.disconnect(src, dst)
+                    disconnected.append(src)
+                except:
+                    # Model is out of sync
+                    jack_routes_dirty = True
+                routed.discard(src)
+        for src in sources - current:
+            try:
+                jclient.connect(src, dst)
+                routed.add(src)
+                connected.append(src)
+            except:
+                pass
+        if connected or disconnected:
+            # Don't wait for JACK notification to update model, so next pass doesn't repeat changes
+            with jack_routes_lock:
+                routes = jack_routes.setdefault(dst, set())
+                routes.difference_update(disconnected)
+                routes.update(connected)
+
 # ------------------------------------------------------------------------------
 
 # MIDI port helper functions
@@ -157,6 +415,7 @@ def set_port_friendly_name(port, friendly_name=None):
         port.set_alias(friendly_name)
     except:
         pass
+    invalidate_port_info(port.name)
 
 
 def get_ports(name, is_input=None):
@@ -171,9 +430,9 @@ def dev_in_2_dev_out(zmip):
     """
 
     try:
-        name = devices_in[zmip].aliases[0].replace("IN", "OUT")
+        name = get_port_info(devices_in[zmip]).uid.replace("IN", "OUT")
         for i, port in enumerate(devices_out):
-            if port.aliases[0] == name:
+            if port and get_port_info(port).uid == name:
                 return i
     except:
         return None
@@ -188,23 +447,23 @@ def set_midi_port_names(port_names):
     global midi_port_names
     midi_port_names = port_names.copy()
     for port in hw_midi_src_ports + hw_midi_dst_ports:
+        info = get_port_info(port)
         try:
-            port.aliases[1] = port_names[port.aliases[0]]
+            if info.friendly_name != port_names[info.uid]:
+                set_port_friendly_name(port, port_names[info.uid])
         except:
             pass
 
 
 def get_port_aliases(midi_port):
-    """Get port alias for a MIDI port
+    """Get port alias for a MIDI port, from port metadata cache
 
     midi_port : Jack MIDI port
-    returns : List of aliases or port name if alias not set
+    returns : Tuple (uid, friendly name) or port name if alias not set
     """
 
-    try:
-        return midi_port.aliases[0], midi_port.aliases[1]
-    except:
-        return midi_port.name, midi_port.name
+    info = get_port_info(midi_port)
+    return info.uid, info.friendly_name
 
 
 def get_port_from_name(name):
@@ -227,7 +486,7 @@ def get_midi_in_uid(idev):
     """
 
     try:
-        return devices_in[idev].aliases[0]
+        return get_port_info(devices_in[idev]).uid
     except:
         return None
 
@@ -240,7 +499,7 @@ def get_midi_in_devid(idev):
     """
 
     try:
-        return devices_in[idev].aliases[0].split('/', 1)[1]
+        return get_port_info(devices_in[idev]).uid.split('/', 1)[1]
     except:
         return None
 
@@ -265,17 +524,20 @@ def get_midi_in_devid_by_uid(uid, mapped=False):
     mapped : True to use physical port mapping
     """
 
+    uid_parts = uid.split('/', 1)
     for i, port in enumerate(devices_in):
+        if port is None:
+            continue
         try:
+            port_uid = get_port_info(port).uid
             if mapped:
-                if port.aliases[0] == uid:
+                if port_uid == uid:
                     return i
             else:
-                uid_parts = uid.split('/', 1)
                 if len(uid_parts) > 1:
-                    if uid_parts[1] == port.aliases[0].split('/', 1)[1]:
+                    if uid_parts[1] == port_uid.split('/', 1)[1]:
                         return i
-                elif port.aliases[0] == uid:
+                elif port_uid == uid:
                     return i
         except:
             pass
@@ -376,7 +638,7 @@ def get_sidechain_portnames(jackname=None):
 def request_audio_connect(fast=False):
     """Request audio connection graph refresh
 
-    fast : True for fast update (default=False to trigger on next 2s cycle
+    fast : True for fast update (default=False to trigger from autoconnect thread, coalescing requests)
     """
 
     # if paused_flag:
@@ -386,12 +648,13 @@ def request_audio_connect(fast=False):
     else:
         global deferred_audio_connect
         deferred_audio_connect = True
+        graph_event.set()
 
 
 def request_midi_connect(fast=False):
     """Request MIDI connection graph refresh
 
-    fast : True for fast update (default=False to trigger on next 2s cycle
+    fast : True for fast update (default=False to trigger from autoconnect thread, coalescing requests)
     """
 
     # if paused_flag:
@@ -402,6 +665,7 @@ def request_midi_connect(fast=False):
     else:
         global deferred_midi_connect
         deferred_midi_connect = True
+        graph_event.set()
 
 
 def find_usb_gadget_device():
@@ -485,44 +749,37 @@ def update_hw_midi_ports(force=False):
     #  - destinations including physical outputs are jack inputs
     # -----------------------------------------------------------
 
-    hw_port_fingerprint = hw_midi_src_ports + hw_midi_dst_ports
-
-    # List of physical MIDI source ports
-    hw_midi_src_ports = jclient.get_ports(
-        is_output=True, is_physical=True, is_midi=True)
-
-    # List of physical MIDI destination ports
-    hw_midi_dst_ports = jclient.get_ports(
-        is_input=True, is_physical=True, is_midi=True)
+    hw_port_fingerprint = {port.name for port in hw_midi_src_ports + hw_midi_dst_ports}
+
+    # Classify ports using metadata cache, so only new ports are queried
+    src_ports = []
+    dst_ports = []
+    for port in jclient.get_ports(is_midi=True):
+        info = get_port_info(port)
+        if info.hw_order is None or not info.enabled:
+            continue
+        if port.name not in hw_port_fingerprint or force:
+            if update_midi_port_aliases(port):
+                info = get_port_info(port)
+        if info.is_input:
+            dst_ports.append((info.hw_order, port))
+        else:
+            src_ports.append((info.hw_order, port))
 
-    # Treat some virtual MIDI ports as hardware
-    for port_name in ("QmidiNet:in", "jackrtpmidid:rtpmidi_in", "jacknetumpd:netump_in", "RtMidiIn Client:TouchOSC Bridge", "ZynMaster:midi_in", "ZynMidiRouter:seq_in"):
-        try:
-            ports = jclient.get_ports(port_name, is_midi=True, is_input=True)
-            hw_midi_dst_ports += ports
-        except:
-            pass
-    for port_name in ("QmidiNet:out", "jackrtpmidid:rtpmidi_out", "jacknetumpd:netump_out", "RtMidiOut Client:TouchOSC Bridge", "aubio"):
-        try:
-            ports = jclient.get_ports(port_name, is_midi=True, is_output=True)
-            hw_midi_src_ports += ports
-        except:
-            pass
+    # Physical ports first, then virtual ports treated as hardware
+    hw_midi_src_ports = [port for order, port in sorted(src_ports, key=lambda item: item[0])]
+    hw_midi_dst_ports = [port for order, port in sorted(dst_ports, key=lambda item: item[0])]
 
-    update = False
-    host_usb_connected = is_host_usb_connected()
-    fingerprint = hw_port_fingerprint.copy()
+    # USB host (gadget) ports are only available when connected to a host
+    host_usb_connected = None
     for port in hw_midi_src_ports + hw_midi_dst_ports:
-        if port.name.startswith("a2j:Midi Through"):
-            remove_hw_port(port)
-        elif len(port.aliases) > 0 and port.aliases[0].startswith("USB:f_midi") and not host_usb_connected:
-            remove_hw_port(port)
-        elif port not in hw_port_fingerprint or force:
-            update_midi_port_aliases(port)
-            update = True
-        else:
-            fingerprint.remove(port)
-    update |= len(fingerprint) != 0
+        if get_port_info(port).uid.startswith("USB:f_midi"):
+            if host_usb_connected is None:
+                host_usb_connected = is_host_usb_connected()
+            if not host_usb_connected:
+                remove_hw_port(port)
+
+    update = force or hw_port_fingerprint != {port.name for port in hw_midi_src_ports + hw_midi_dst_ports}
 
     release_lock()
     return update
@@ -541,10 +798,12 @@ def midi_autoconnect():
     # logger.info("ZynAutoConnect: MIDI ...")
     global zyn_routed_midi
 
+    update_jack_routes()
+    ports = port_snapshot(is_midi=True)
+
     # Create graph of required chain routes as sets of sources indexed by destination
     required_routes = {}
-    all_midi_dst = jclient.get_ports(is_input=True, is_midi=True)
-    for dst in all_midi_dst:
+    for dst in ports.inputs:
         required_routes[dst.name] = set()
 
     # Connect MIDI Input Devices to ZynMidiRouter ports (zmips)
@@ -565,6 +824,7 @@ def midi_autoconnect():
                         f"Connected MIDI-in device {devnum}: {hwsp.name}")
                     break
         if devnum is not None:
+            get_port_info(hwsp).zmip = devnum
             required_routes[f"ZynMidiRouter:dev{devnum}_in"].add(hwsp.name)
             busy_idevs.append(devnum)
 
@@ -573,6 +833,9 @@ def midi_autoconnect():
         if i not in busy_idevs and devices_in[i] is not None:
             logger.debug(
                 f"Disconnected MIDI-in device {i}: {devices_in[i].name}")
+            info = port_infos.get(devices_in[i].name)
+            if info and info.zmip == i:
+                info.zmip = None
             devices_in[i] = None
             state_manager.ctrldev_manager.unload_driver(i)
 
@@ -590,11 +853,12 @@ def midi_autoconnect():
                 if devices_out[i] is None:
                     devnum = i
                     devices_out[devnum] = hwdp
-                    devices_out_name[devnum] = hwdp.aliases[0]
+                    devices_out_name[devnum] = get_port_info(hwdp).uid
                     logger.debug(
                         f"Connected MIDI-out device {devnum}: {hwdp.name}")
                     break
         if devnum is not None:
+            get_port_info(hwdp).zmop = devnum
             required_routes[hwdp.name].add(f"ZynMidiRouter:dev{devnum}_out")
             busy_odevs.append(devnum)
 
@@ -603,6 +867,9 @@ def midi_autoconnect():
         if i not in busy_odevs and devices_out[i] is not None:
             logger.debug(
                 f"Disconnected MIDI-out device {i}: {devices_out[i].name}")
+            info = port_infos.get(devices_out[i].name)
+            if info and info.zmop == i:
+                info.zmop = None
             devices_out[i] = None
             devices_out_name[i] = None
 
@@ -625,8 +892,7 @@ def midi_autoconnect():
                         routes[proc.engine.get_jackname()] = route
 
         for dst_name in routes:
-            dst_ports = jclient.get_ports(
-                re.escape(dst_name), is_input=True, is_midi=True)
+            dst_ports = ports.get_ports(re.escape(dst_name), is_input=True)
             if not dst_ports:
                 # Try to get destiny port by alias
                 try:
@@ -635,8 +901,7 @@ def midi_autoconnect():
                     pass
             if dst_ports:
                 for src_name in routes[dst_name]:
-                    src_ports = jclient.get_ports(
-                        src_name, is_output=True, is_midi=True)
+                    src_ports = ports.get_ports(src_name, is_output=True)
                     if src_ports:
                         required_routes[dst_ports[0].name].add(
                             src_ports[0].name)
@@ -652,25 +917,23 @@ def midi_autoconnect():
                         chain_midi_first_procs = chain_manager.get_processors(
                             out, "Synth", 0)
                     for processor in chain_midi_first_procs:
-                        for dst in jclient.get_ports(processor.get_jackname(True), is_midi=True, is_input=True):
+                        for dst in ports.get_ports(processor.get_jackname(True), is_input=True):
                             dests.append(dst.name)
                 else:
                     pass
                     # dests.append(out)
             for processor in chain.midi_slots[-1]:
-                src_ports = jclient.get_ports(processor.get_jackname(True), is_midi=True, is_output=True)
+                src_ports = ports.get_ports(processor.get_jackname(True), is_output=True)
                 if src_ports:
                     for dst in dests:
                         required_routes[dst].add(src_ports[0].name)
 
         # Add MIDI router outputs
         if chain.is_midi():
-            src_ports = jclient.get_ports(
-                f"ZynMidiRouter:ch{chain.zmop_index}_out", is_midi=True, is_output=True)
+            src_ports = ports.get_ports(f"ZynMidiRouter:ch{chain.zmop_index}_out", is_output=True)
             if src_ports:
                 for dst_proc in chain.get_processors(slot=0):
-                    dst_ports = jclient.get_ports(
-                        dst_proc.get_jackname(True), is_midi=True, is_input=True)
+                    dst_ports = ports.get_ports(dst_proc.get_jackname(True), is_input=True)
                     if dst_ports:
                         src = src_ports[0]
                         dst = dst_ports[0]
@@ -679,8 +942,7 @@ def midi_autoconnect():
     # Add zynseq to MIDI input devices
     idev = state_manager.get_zmip_step_index()
     if devices_in[idev] is None:
-        src_ports = jclient.get_ports(
-            "zynseq:output", is_midi=True, is_output=True)
+        src_ports = ports.get_ports("zynseq:output", is_output=True)
         if src_ports:
             devices_in[idev] = src_ports[0]
             update_midi_port_aliases(src_ports[0])
@@ -690,8 +952,7 @@ def midi_autoconnect():
     # Add SMF player to MIDI input devices
     idev = state_manager.get_zmip_seq_index()
     if devices_in[idev] is None:
-        src_ports = jclient.get_ports(
-            "zynsmf:midi_out", is_midi=True, is_output=True)
+        src_ports = ports.get_ports("zynsmf:midi_out", is_output=True)
         if src_ports:
             devices_in[idev] = src_ports[0]
             update_midi_port_aliases(src_ports[0])
@@ -713,9 +974,8 @@ def midi_autoconnect():
     for proc in chain_manager.processors.values():
         if proc.engine.options["ctrl_fb"]:
             try:
-                ports = jclient.get_ports(proc.get_jackname(
-                    True), is_midi=True, is_output=True)
-                required_routes["ZynMidiRouter:ctrl_in"].add(ports[0].name)
+                src_ports = ports.get_ports(proc.get_jackname(True), is_output=True)
+                required_routes["ZynMidiRouter:ctrl_in"].add(src_ports[0].name)
                 ctrl_fb_procs.append(proc)
                 # logging.debug(f"Routed controller feedback from {proc.get_jackname(True)}")
             except Exception as e:
@@ -741,41 +1001,16 @@ def midi_autoconnect():
         if dst.startswith("effect_"):
             required_routes.pop(dst)
     # Workaround for mod-host auto routing
-    try:
-        port = jclient.get_port_by_name("mod-host:midi_in")
-        current_routes = jclient.get_all_connections(port)
-        for src in current_routes:
-            if not src.name.startswith("ZynMidiRouter"):
-                jclient.disconnect(src, port)
-    except:
-        pass
-
-    # Connect and disconnect routes
-    for dst, sources in required_routes.items():
-        if dst not in zyn_routed_midi:
-            zyn_routed_midi[dst] = []
-        try:
-            current_routes = jclient.get_all_connections(dst)
-        except Exception as e:
-            current_routes = []
-            logging.warning(e)
-        for src in current_routes:
-            if src.name in sources:
-                sources.remove(src.name)
-                continue
-            if src.name in zyn_routed_midi[dst]:
-                try:
-                    jclient.disconnect(src, dst)
-                except:
-                    pass
-                zyn_routed_midi[dst].remove(src.name)
-        for src in sources:
+    for src in get_jack_routes("mod-host:midi_in"):
+        if not src.startswith("ZynMidiRouter"):
             try:
-                jclient.connect(src, dst)
-                zyn_routed_midi[dst].append(src)
+                jclient.disconnect(src, "mod-host:midi_in")
             except:
                 pass
 
+    # Connect and disconnect routes
+    apply_routes(required_routes, zyn_routed_midi)
+
     # Load driver if driver has autoload flag set
     for i in range(0, max_num_devs):
         if i in busy_idevs and devices_in[i] is not None:
@@ -793,19 +1028,22 @@ def audio_autoconnect():
     global deferred_audio_connect
     deferred_audio_connect = False
 
+    update_jack_routes()
+    ports = port_snapshot(is_audio=True)
+
     # Workaround for mod-monitor auto routing
     for port in hw_audio_dst_ports:
-        for i in range(1, 3):
-            try:
-                jclient.disconnect(f"mod-monitor:out_{i}", port)
-            except:
-                pass
+        for src in get_jack_routes(port.name):
+            if src.startswith("mod-monitor:out_"):
+                try:
+                    jclient.disconnect(src, port)
+                except:
+                    pass
 
     # Create graph of required chain routes as sets of sources indexed by destination
     required_routes = {}
 
-    all_audio_dst = jclient.get_ports(is_input=True, is_audio=True)
-    for dst in all_audio_dst:
+    for dst in ports.inputs:
         required_routes[dst.name] = set()
 
     # Chain audio routing
@@ -838,21 +1076,16 @@ def audio_autoconnect():
         for dst in routes:
             if dst in sidechain_ports:
                 # This is an exact match so we do want to route exactly this
-                dst_ports = jclient.get_ports(
-                    f"^{dst}$", is_input=True, is_audio=True)
+                dst_ports = ports.get_ports(f"^{dst}$", is_input=True)
             else:
                 # This may be a client name that will return all input ports, including side-chain inputs
-                dst_ports = jclient.get_ports(
-                    dst, is_input=True, is_audio=True)
+                dst_ports = ports.get_ports(dst, is_input=True)
                 # Remove side-chain (no route) destinations
-                for port in list(dst_ports):
-                    if port.name in sidechain_ports:
-                        dst_ports.remove(port)
+                dst_ports = [port for port in dst_ports if port.name not in sidechain_ports]
             dst_count = len(dst_ports)
 
             for src_name in routes[dst]:
-                src_ports = jclient.get_ports(
-                    src_name, is_output=True, is_audio=True)
+                src_ports = ports.get_ports(src_name, is_output=True)
                 # Auto mono/stereo routing
                 source_count = len(src_ports)
                 if source_count and dst_count:
@@ -867,15 +1100,14 @@ def audio_autoconnect():
 
     # Connect global audio player to aux
     if state_manager.audio_player and state_manager.audio_player.jackname:
-        ports = jclient.get_ports(
-            state_manager.audio_player.jackname, is_output=True, is_audio=True)
-        required_routes[f"zynmixer:input_{MAIN_MIX_CHAN}a"].add(ports[0].name)
-        required_routes[f"zynmixer:input_{MAIN_MIX_CHAN}b"].add(ports[1].name)
+        src_ports = ports.get_ports(state_manager.audio_player.jackname, is_output=True)
+        required_routes[f"zynmixer:input_{MAIN_MIX_CHAN}a"].add(src_ports[0].name)
+        required_routes[f"zynmixer:input_{MAIN_MIX_CHAN}b"].add(src_ports[1].name)
 
     # Connect inputs to aubionotes
     if zynthian_gui_config.midi_aubionotes_enabled:
         capture_ports = get_audio_capture_ports()
-        for port in jclient.get_ports("aubio", is_input=True, is_audio=True):
+        for port in ports.get_ports("aubio", is_input=True):
             for i in state_manager.aubio_in:
                 try:
                     required_routes[port.name].add(capture_ports[i - 1].name)
@@ -888,38 +1120,13 @@ def audio_autoconnect():
             required_routes.pop(dst)
 
     # Replicate main output to headphones
-    hp_ports = jclient.get_ports(
-        "Headphones:playback", is_input=True, is_audio=True)
+    hp_ports = ports.get_ports("Headphones:playback", is_input=True)
     if len(hp_ports) >= 2:
         required_routes[hp_ports[0].name] = required_routes[hw_audio_dst_ports[0].name]
         required_routes[hp_ports[1].name] = required_routes[hw_audio_dst_ports[1].name]
 
     # Connect and disconnect routes
-    for dst, sources in required_routes.items():
-        if dst not in zyn_routed_audio:
-            zyn_routed_audio[dst] = sources
-        else:
-            zyn_routed_audio[dst] = zyn_routed_audio[dst].union(sources)
-        try:
-            current_routes = jclient.get_all_connections(dst)
-        except Exception as e:
-            current_routes = []
-            logging.warning(e)
-        for src in current_routes:
-            if src.name in sources:
-                continue
-            if src.name in zyn_routed_audio[dst]:
-                try:
-                    jclient.disconnect(src.name, dst)
-                except:
-                    pass
-                zyn_routed_audio[dst].remove(src.name)
-        for src in sources:
-            try:
-                jclient.connect(src, dst)
-                zyn_routed_audio[dst].append(src.name)
-            except:
-                pass
+    apply_routes(required_routes, zyn_routed_audio, True)
 
     # Release Mutex Lock
     release_lock()
@@ -1049,25 +1256,29 @@ def update_midi_port_aliases(port):
 
     try:
         alias1, alias2 = (build_midi_port_name(port))
-        if len(port.aliases) == 2 and port.aliases[0] == alias1 and port.aliases[1] == alias2:
+        aliases = port.aliases
+        if len(aliases) == 2 and aliases[0] == alias1 and aliases[1] == alias2:
             return False
 
         # Clear current aliases - blunt!
-        for alias in port.aliases:
+        for alias in aliases:
             port.unset_alias(alias)
 
         # Set aliases
-        port.set_alias(alias1)
         if alias1 in midi_port_names:  # User defined names
-            port.set_alias(midi_port_names[alias1])
-        else:
-            if alias2:
-                port.set_alias(alias2)
-            else:
-                port.set_alias(alias1)
+            alias2 = midi_port_names[alias1]
+        elif not alias2:
+            alias2 = alias1
+        port.set_alias(alias1)
+        port.set_alias(alias2)
     except:
         logging.warning(f"Unable to set alias for port {port.name}")
+        invalidate_port_info(port.name)
         return False
+    # Update port metadata cache
+    with port_infos_lock:
+        if port.name in port_infos:
+            port_infos[port.name].set_aliases([alias1, alias2])
     return True
 
 
@@ -1087,43 +1298,51 @@ def get_hw_dst_ports():
 
 
 def auto_connect_thread():
-    """Thread to run autoconnect, checking if physical (hardware) interfaces have changed, e.g. USB plug"""
+    """Thread to run autoconnect when JACK graph changes (e.g. USB plug) or when requested.
+    Hardware MIDI ports are also checked periodically as a fallback.
+    """
 
-    deferred_timeout = 2  # Period to run deferred connect (in seconds)
-    # Delay between loop cycles (in seconds) - allows faster exit from thread
-    deferred_inc = 0.1
-    deferred_count = 5  # Run at startup
-    do_audio = False
-    do_midi = False
+    global midi_ports_changed, audio_ports_changed
 
+    poll_ts = 0  # Run at startup
     while not exit_flag:
-        if not paused_flag:
-            try:
-                if deferred_count > deferred_timeout:
-                    deferred_count = 0
-                    # Check if hardware MIDI ports changed, e.g. USB inserted/removed
-                    if update_hw_midi_ports():
-                        do_midi = True
-                    # Check if requested to run midi connect (slow)
-                    if deferred_midi_connect:
-                        do_midi = True
-                    # Check if requested to run audio connect (slow)
-                    if deferred_audio_connect:
-                        do_audio = True
-
-                if do_midi:
-                    midi_autoconnect()
-                    do_midi = False
-
-                if do_audio:
-                    audio_autoconnect()
-                    do_audio = False
+        timeout = max(0, poll_ts + HW_PORTS_POLL_TIME - monotonic())
+        if graph_event.wait(timeout):
+            # Debounce => Wait until graph changes settle, e.g. all ports of a USB device are registered
+            ts = monotonic()
+            graph_event.clear()
+            while not exit_flag and monotonic() - ts < GRAPH_DEBOUNCE_MAX and graph_event.wait(GRAPH_DEBOUNCE_TIME):
+                graph_event.clear()
+        if exit_flag:
+            break
+        if paused_flag:
+            # Pending changes are processed on resume
+            poll_ts = monotonic()
+            continue
 
-            except Exception as err:
-                logger.error("ZynAutoConnect ERROR: {}".format(err))
-
-        sleep(deferred_inc)
-        deferred_count += deferred_inc
+        try:
+            # Swap flags atomically => changes flagged from now on are processed on next cycle
+            with ports_changed_lock:
+                midi_changed = midi_ports_changed
+                audio_changed = audio_ports_changed
+                midi_ports_changed = False
+                audio_ports_changed = False
+            do_midi = deferred_midi_connect
+            do_audio = deferred_audio_connect or audio_changed
+            if midi_changed or monotonic() >= poll_ts + HW_PORTS_POLL_TIME:
+                poll_ts = monotonic()
+                # Check if hardware MIDI ports changed, e.g. USB inserted/removed
+                if update_hw_midi_ports():
+                    do_midi = True
+
+            if do_midi:
+                midi_autoconnect()
+
+            if do_audio:
+                audio_autoconnect()
+
+        except Exception as err:
+            logger.error("ZynAutoConnect ERROR: {}".format(err))
 
 
 def acquire_lock():
@@ -1184,6 +1403,7 @@ def start(sm):
     """
 
     global exit_flag, jclient, thread, lock, chain_manager, state_manager, hw_audio_dst_ports, sidechain_map
+    global jack_routes_dirty
 
     if jclient:
         return  # Already started
@@ -1191,10 +1411,15 @@ def start(sm):
     exit_flag = False
     state_manager = sm
     chain_manager = sm.chain_manager
+    jack_routes_dirty = True
 
     try:
         jclient = jack.Client("Zynthian_autoconnect")
         jclient.set_xrun_callback(cb_jack_xrun)
+        jclient.set_port_registration_callback(cb_jack_port_registration, only_available=False)
+        jclient.set_port_rename_callback(cb_jack_port_rename, only_available=False)
+        jclient.set_client_registration_callback(cb_jack_client_registration)
+        jclient.set_port_connect_callback(cb_jack_port_connect)
         jclient.activate()
     except Exception as e:
         logger.error(
@@ -1227,6 +1452,7 @@ def stop():
 
     global exit_flag, jclient, thread, lock
     exit_flag = True
+    graph_event.set()
     if thread:
         thread.join()
         thread = None
@@ -1240,6 +1466,7 @@ def stop():
     if jclient:
         jclient.deactivate()
         jclient = None
+    invalidate_port_info()
 
 
 def pause():
@@ -1248,8 +1475,13 @@ def pause():
 
 
 def resume():
-    global paused_flag
+    global paused_flag, midi_ports_changed, audio_ports_changed
     paused_flag = False
+    # Process graph changes while paused
+    with ports_changed_lock:
+        midi_ports_changed = True
+        audio_ports_changed = True
+    graph_event.set()
 
 
 def is_running():
@@ -1277,6 +1509,109 @@ def cb_jack_xrun(delayed_usecs: float):
         state_manager.status_xrun = True
 
 
+def cb_jack_port_registration(port, register):
+    """Jack port registration callback, called from JACK notification thread
+
+    port : Jack port object or None if not available anymore
+    register : True if port was registered, False if unregistered
+    """
+
+    # JACK API can't be used from notification thread => just flag changes
+    cb_jack_port_changed(port)
+    if register:
+        if port is None:
+            invalidate_port_info()
+        else:
+            invalidate_port_info(port.name)
+    else:
+        forget_jack_port(port)
+
+
+def cb_jack_port_rename(port, old, new):
+    """Jack port rename callback, called from JACK notification thread
+
+    port : Jack port object or None if not available anymore
+    old : Old port name
+    new : New port name
+    """
+
+    cb_jack_port_changed(port)
+    forget_jack_port(port, old)
+    invalidate_port_info(new)
+
+
+def cb_jack_client_registration(name, register):
+    """Jack client registration callback, called from JACK notification thread
+
+    name : Jack client name
+    register : True if client was registered, False if unregistered
+    """
+
+    # Ports of new clients are notified when registered
+    if not register:
+        cb_jack_port_changed(None)
+        invalidate_port_info(client=name)
+        global jack_routes_dirty
+        jack_routes_dirty = True
+
+
+def cb_jack_port_changed(port):
+    """Flag JACK graph change and wake up autoconnect thread
+
+    port : Changed port or None if unknown
+    """
+
+    global midi_ports_changed, audio_ports_changed
+    with ports_changed_lock:
+        if port is None or port.is_midi:
+            midi_ports_changed = True
+        if port is None or port.is_audio:
+            audio_ports_changed = True
+    graph_event.set()
+
+
+def cb_jack_port_connect(a, b, connect):
+    """Jack port connect callback, called from JACK notification thread
+
+    a : One of the connected ports
+    b : The other connected port
+    connect : True if connected, False if disconnected
+    """
+
+    try:
+        if a.is_input:
+            a, b = b, a
+        with jack_routes_lock:
+            if connect:
+                jack_routes.setdefault(b.name, set()).add(a.name)
+            else:
+                jack_routes.get(b.name, set()).discard(a.name)
+    except:
+        global jack_routes_dirty
+        jack_routes_dirty = True
+
+
+def forget_jack_port(port, name=None):
+    """Remove a port from connection model and metadata cache
+
+    port : Jack port object or None if not available anymore
+    name : Port name (default: port.name)
+    """
+
+    global jack_routes_dirty
+    if name is None:
+        if port is None:
+            jack_routes_dirty = True
+            invalidate_port_info()
+            return
+        name = port.name
+    invalidate_port_info(name)
+    with jack_routes_lock:
+        jack_routes.pop(name, None)
+        for sources in jack_routes.values():
+            sources.discard(name)
+
+
 def get_jackd_cpu_load():
     """Get the JACK CPU load"""
 
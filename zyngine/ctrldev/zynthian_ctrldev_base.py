@@ -133,9 +133,9 @@ class zynthian_ctrldev_zynpad(zynthian_ctrldev_base):
         super().init()
         # Register for zynseq updates
         zynsigman.register_queued(
-            zynsigman.S_STEPSEQ, self.zynseq.SS_SEQ_PLAY_STATE, self.update_seq_state)
+            zynsigman.S_STEPSEQ, self.zynseq.SS_SEQ_PLAY_STATE, self.update_seq_state, coalesce=("bank", "seq"))
         zynsigman.register_queued(
-            zynsigman.S_STEPSEQ, self.zynseq.SS_SEQ_REFRESH, self.refresh)
+            zynsigman.S_STEPSEQ, self.zynseq.SS_SEQ_REFRESH, self.refresh, coalesce=())
 
     def end(self):
         # Unregister from zynseq updates
@@ -206,11 +206,11 @@ class zynthian_ctrldev_zynmixer(zynthian_ctrldev_base):
     def init(self):
         super().init()
         zynsigman.register_queued(
-            zynsigman.S_CHAIN_MAN, self.chain_manager.SS_SET_ACTIVE_CHAIN, self.update_mixer_active_chain)
+            zynsigman.S_CHAIN_MAN, self.chain_manager.SS_SET_ACTIVE_CHAIN, self.update_mixer_active_chain, coalesce=())
         zynsigman.register_queued(
-            zynsigman.S_CHAIN_MAN, self.chain_manager.SS_MOVE_CHAIN, self.refresh)
+            zynsigman.S_CHAIN_MAN, self.chain_manager.SS_MOVE_CHAIN, self.refresh, coalesce=())
         zynsigman.register_queued(
-            zynsigman.S_AUDIO_MIXER, self.zynmixer.SS_ZCTRL_SET_VALUE, self.update_mixer_strip)
+            zynsigman.S_AUDIO_MIXER, self.zynmixer.SS_ZCTRL_SET_VALUE, self.update_mixer_strip, coalesce=("chan", "symbol"))
 
     def end(self):
         zynsigman.unregister(
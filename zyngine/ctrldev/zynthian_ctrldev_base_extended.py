@@ -26,7 +26,9 @@
 import time
 import logging
 from bisect import bisect
-from threading import Thread, RLock, Event
+from threading import RLock
+
+from zyngine.zynthian_scheduler import zynsched
 
 
 class CONST:
@@ -47,69 +49,36 @@ class CONST:
 
 
 # --------------------------------------------------------------------------
-# A timer for running delayed actions
+# A timer for running delayed actions (timeouts in ms)
 # --------------------------------------------------------------------------
-class RunTimer(Thread):
-    RESOLUTION = 0.1
-
+class RunTimer:
     def __init__(self):
-        super().__init__()
         self._lock = RLock()
-        self._awake = Event()
         self._actions = {}
 
-        self.daemon = True
-        self.start()
-
     def __contains__(self, b):
         return b in self._actions
 
     def add(self, name, timeout, callback, *args, **kwargs):
         with self._lock:
-            self._actions[name] = [timeout, callback, name, args, kwargs]
-        self._awake.set()
+            zynsched.cancel(self._actions.get(name))
+            self._actions[name] = zynsched.add_oneshot(
+                timeout / 1000, self._run_action, name, callback, args, kwargs, name=f"timer {name}")
 
     def update(self, name, timeout):
         with self._lock:
-            action = self._actions.get(name)
-            if action is None:
+            task = self._actions.get(name)
+            if task is None:
                 return
-            action[0] = timeout
+            zynsched.reschedule(task, delay=timeout / 1000)
 
     def remove(self, name):
         with self._lock:
-            self._actions.pop(name, None)
+            zynsched.cancel(self._actions.pop(name, None))
 
-    def run(self):
-        while True:
-            if not self._actions:
-                self._awake.wait()
-            self._awake.clear()
-            for action in self._get_expired():
-                self._run_action(*action[1:])
-            time.sleep(self.RESOLUTION)
-            self._update_timeouts(-self.RESOLUTION)
-
-    def _update_timeouts(self, delta):
-        delta *= 1000
+    def _run_action(self, name, callback, args, kwargs):
         with self._lock:
-            for action in self._actions.values():
-                action[0] += delta
-
-    def _get_expired(self):
-        retval = []
-        with self._lock:
-            to_remove = []
-            for name, spec in self._actions.items():
-                if spec[0] > 0:
-                    continue
-                to_remove.append(name)
-                retval.append(spec)
-            for name in to_remove:
-                self._actions.pop(name, None)
-        return retval
-
-    def _run_action(self, callback, name, args, kwargs):
+            self._actions.pop(name, None)
         try:
             callback(name, *args, **kwargs)
         except Exception as ex:
@@ -117,95 +86,64 @@ class RunTimer(Thread):
 
 
 # --------------------------------------------------------------------------
-#  A timer for running repeated actions
+#  A timer for running repeated actions (intervals in ms)
 # --------------------------------------------------------------------------
 class IntervalTimer(RunTimer):
-    RESOLUTION = 0.05
 
     def add(self, name, timeout, callback, *args, **kwargs):
         with self._lock:
-            self._actions[name] = [timeout, timeout,
-                                   callback, name, args, kwargs]
-        self._awake.set()
+            zynsched.cancel(self._actions.get(name))
+            self._actions[name] = zynsched.add_periodic(
+                timeout / 1000, self._run_action, name, callback, args, kwargs,
+                name=f"interval {name}", delay=0, stretch=False)
 
     def update(self, name, timeout):
         with self._lock:
-            action = self._actions.get(name)
-            if action is None:
+            task = self._actions.get(name)
+            if task is None:
                 return
-            action[1] = timeout
-
-    def run(self):
-        while True:
-            if not self._actions:
-                self._awake.wait()
-            self._awake.clear()
-            for action in self._get_expired():
-                self._run_action(*action[2:])
-            time.sleep(self.RESOLUTION)
-            self._update_timeouts(self.RESOLUTION)
-
-    def _get_expired(self):
-        retval = []
-        with self._lock:
-            for spec in self._actions.values():
-                if spec[0] < spec[1]:
-                    continue
-                retval.append(spec)
-                spec[0] = 0
+            zynsched.reschedule(task, period=timeout / 1000)
 
-        return retval
+    def _run_action(self, name, callback, args, kwargs):
+        try:
+            callback(name, *args, **kwargs)
+        except Exception as ex:
+            logging.error(f" error in handler: {ex}")
 
 
 # --------------------------------------------------------------------------
 # A handy timer for triggering short/bold/long push actions
 # --------------------------------------------------------------------------
-class ButtonTimer(Thread):
+class ButtonTimer:
     def __init__(self, callback):
-        super().__init__()
         self._callback = callback
         self._lock = RLock()
-        self._awake = Event()
-        self._pressed = {}
-
-        self.daemon = True
-        self.start()
+        self._pressed = {}  # (press timestamp, long press task) indexed by button
 
     def is_pressed(self, btn, ts):
         with self._lock:
-            self._pressed[btn] = ts
-        self._awake.set()
+            self._cancel(btn)
+            delay = max(0, CONST.PT_LONG_TIME - (time.time() - ts))
+            self._pressed[btn] = (ts, zynsched.add_oneshot(
+                delay, self._on_long_press, btn, name="button timer"))
 
     def is_released(self, btn):
         with self._lock:
-            ts = self._pressed.pop(btn, None)
+            ts = self._cancel(btn)
         if ts is not None:
             elapsed = time.time() - ts
             self._run_callback(btn, elapsed)
 
-    def run(self):
-        while True:
-            with self._lock:
-                expired, elapsed = self._get_expired()
-            if expired is not None:
-                self._run_callback(expired, elapsed)
-
-            time.sleep(0.1)
-            if not self._pressed:
-                self._awake.wait()
-            self._awake.clear()
-
-    def _get_expired(self):
-        now = time.time()
-        retval = None
-        for btn, ts in self._pressed.items():
-            elapsed = now - ts
-            if elapsed > CONST.PT_LONG_TIME:
-                retval = btn
-                break
-        if retval:
-            self._pressed.pop(btn, None)
-        return retval, elapsed if retval else 0
+    def _cancel(self, btn):
+        ts, task = self._pressed.pop(btn, (None, None))
+        zynsched.cancel(task)
+        return ts
+
+    def _on_long_press(self, btn):
+        with self._lock:
+            ts, task = self._pressed.pop(btn, (None, None))
+        if ts is not None:
+            self._run_callback(btn, time.time() - ts)
 
     def _run_callback(self, note, elapsed):
         ptype = [CONST.PT_SHORT, CONST.PT_BOLD, CONST.PT_LONG][
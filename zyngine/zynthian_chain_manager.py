@@ -24,6 +24,9 @@
 # ****************************************************************************
 
 import logging
+from time import monotonic
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
 
 # Zynthian specific modules
 import zynautoconnect
@@ -35,6 +38,8 @@ from zyngine.zynthian_chain import *
 from zyngine.zynthian_engine_jalv import *
 from zyngine.zynthian_engine_pianoteq import *
 from zyngine.zynthian_signal_manager import zynsigman
+from zyngine.zynthian_load_profiler import zynloadprof
+from zyngine.zynthian_state_journal import zynjournal
 from zyngine.zynthian_processor import zynthian_processor
 from zyngui import zynthian_gui_config
 
@@ -89,6 +94,8 @@ class zynthian_chain_manager:
 
     engine_info = None
     single_processor_engines = ["BF", "MD", "PT", "PD", "AE", "SL", "IR"]
+    # Engines whose process can be started concurrently, before being added to a chain (plus all Jalv engines)
+    parallel_start_engines = ["ZY", "FS", "SF", "LS", "PT"]
 
     def __init__(self, state_manager):
         """ Create an instance of a chain manager
@@ -108,6 +115,9 @@ class zynthian_chain_manager:
         self.ordered_chain_ids = []  # List of chain IDs in display order
         self.zyngine_counter = 0  # Appended to engine names for uniqueness
         self.zyngines = {}  # List of instantiated engines
+        self.prestarted_engines = {}  # Map of engines started in parallel, indexed by processor UID
+        self.standby_engines = []  # List of (eng_code, engine) started in advance by preload_engines
+        self.standby_lock = Lock()
         self.processors = {}  # Dictionary of processor objects indexed by UID
         self.active_chain_id = None  # Active chain id
         self.midi_chan_2_chain_ids = [list() for _ in range(
@@ -118,6 +128,14 @@ class zynthian_chain_manager:
         self.chain_midi_cc_binding = {}  # Map of list of zctrls indexed by 16-bit CHAIN,CC
         self.chan_midi_cc_binding = {}  # Map of list of zctrls indexed by 16-bit CHAN,CC
 
+        # Compiled CC routing tables (built from CC binding maps by compile_midi_cc_routes)
+        self.midi_cc_binding_lock = Lock()  # Protects CC binding maps while changed or compiled from MIDI thread
+        self.midi_cc_routes_dirty = True
+        self.absolute_midi_cc_routes = [None] * 256  # Per ZMIP list of zctrl tuples indexed by CHAN,CC (None if ZMIP has no bindings)
+        self.chan_midi_cc_routes = [()] * (MAX_NUM_MIDI_CHANS << 7)  # Tuples of zctrls indexed by CHAN,CC
+        self.active_midi_cc_routes = [()] * 128  # Tuples of zctrls bound to active chain, indexed by CC
+        self.active_midi_cc_routes_chain_id = None  # Chain id used to build active_midi_cc_routes
+
         # Map of lists of currently held (sustained) zctrls, indexed by cc number - first element indicates pedal state
         self.held_zctrls = {
             64: [False],
@@ -276,6 +294,8 @@ class zynthian_chain_manager:
         # logging.debug(f"midi_chan_2_chain_ids = {self.midi_chan_2_chain_ids}")
 
         self.active_chain_id = chain_id
+        self.state_manager.invalidate_zs3_plans()
+        zynjournal.request_compaction()
         self.state_manager.end_busy("add_chain")
         return chain_id
 
@@ -385,6 +405,8 @@ class zynthian_chain_manager:
                 chain_pos -= 1
             self.set_active_chain_by_index(chain_pos)
         self.state_manager.purge_zs3()
+        self.state_manager.invalidate_zs3_plans()
+        zynjournal.request_compaction()
         self.state_manager.end_busy("remove_chain")
         return True
 
@@ -418,6 +440,7 @@ class zynthian_chain_manager:
             pos = max(pos, 0)
             self.ordered_chain_ids.insert(
                 pos, self.ordered_chain_ids.pop(index))
+            zynjournal.request_compaction()
             zynsigman.send(zynsigman.S_CHAIN_MAN, self.SS_MOVE_CHAIN)
 
     def get_chain_count(self):
@@ -505,6 +528,7 @@ class zynthian_chain_manager:
             else:
                 self.chains[chain_id].audio_in = ["SYSTEM"]
             self.chains[chain_id].rebuild_audio_graph()
+            zynjournal.request_compaction()
 
     def get_chain_audio_ouputs(self, chain_id):
         """Get list of audio outputs for a chain"""
@@ -525,6 +549,7 @@ class zynthian_chain_manager:
             else:
                 self.chains[chain_id].audio_out = [0]
             self.chains[chain_id].rebuild_audio_graph()
+            zynjournal.request_compaction()
 
     def enable_chain_audio_thru(self, chain_id, enable=True):
         """Enable/disable audio pass-through
@@ -534,6 +559,7 @@ class zynthian_chain_manager:
         if chain_id in self.chains and self.chains[chain_id].audio_thru != enable:
             self.chains[chain_id].audio_thru = enable
             self.chains[chain_id].rebuild_audio_graph()
+            zynjournal.request_compaction()
 
     def get_chain_audio_routing(self, chain_id):
         """Get dictionary of lists of destinations mapped by source"""
@@ -561,6 +587,7 @@ class zynthian_chain_manager:
             else:
                 self.chains[chain_id].midi_in = ["MIDI-IN"]
             self.chains[chain_id].rebuild_midi_graph()
+            zynjournal.request_compaction()
 
     def get_chain_midi_ouputs(self, chain_id):
         """Get list of MIDI outputs for a chain"""
@@ -581,6 +608,7 @@ class zynthian_chain_manager:
             else:
                 self.chains[chain_id].midi_out = ["MIDI-OUT", "NET-OUT"]
             self.chains[chain_id].rebuild_midi_graph()
+            zynjournal.request_compaction()
 
     def enable_chain_midi_thru(self, chain_id, enable=True):
         """Enable/disable MIDI pass-through
@@ -590,6 +618,7 @@ class zynthian_chain_manager:
         if chain_id in self.chains and self.chains[chain_id].midi_thru != enable:
             self.chains[chain_id].midi_thru = enable
             self.chains[chain_id].rebuild_midi_graph()
+            zynjournal.request_compaction()
 
     def get_chain_midi_routing(self, chain_id):
         """Get dictionary of lists of destinations mapped by source"""
@@ -847,6 +876,8 @@ class zynthian_chain_manager:
                         src_chain.rebuild_graph()
                 zynautoconnect.request_audio_connect(fast_refresh)
                 zynautoconnect.request_midi_connect(fast_refresh)
+                self.state_manager.invalidate_zs3_plans()
+                zynjournal.request_compaction()
                 # Success!! => Return processor
                 self.state_manager.end_busy("add_processor")
                 return processor
@@ -919,6 +950,8 @@ class zynthian_chain_manager:
                 self.processors.pop(id)
             except:
                 pass
+            self.state_manager.invalidate_zs3_plans()
+            zynjournal.request_compaction()
             if stop_engine:
                 self.stop_unused_engines()
 
@@ -1009,24 +1042,17 @@ class zynthian_chain_manager:
             logging.error(f"Engine '{eng_code}' not found!")
             return None
 
-        if eng_code in self.zyngines:
+        if processor.id in self.prestarted_engines:
+            # Engine already started by start_engines
+            zyngine = self.prestarted_engines.pop(processor.id)
+        elif eng_code in self.zyngines:
             # Engine already started
             zyngine = self.zyngines[eng_code]
         else:
             # Start new engine instance
-            info = self.engine_info[eng_code]
-            zynthian_engine_class = info["ENGINE"]
-            if eng_code[0:3] == "JV/":
-                eng_key = f"JV/{self.zyngine_counter}"
-                zyngine = zynthian_engine_class(
-                    eng_code, self.state_manager, False)
-            elif eng_code == "SF":
-                eng_key = f"{eng_code}/{self.zyngine_counter}"
-                zyngine = zynthian_engine_class(self.state_manager)
-            else:
-                eng_key = eng_code
-                zyngine = zynthian_engine_class(self.state_manager)
-
+            eng_key = self.get_engine_key(eng_code)
+            with zynloadprof.phase(zynloadprof.PH_ENGINE_START, f"{processor.id}:{eng_code}"):
+                zyngine = self.create_engine(eng_code)
             self.zyngines[eng_key] = zyngine
             self.zyngine_counter += 1
 
@@ -1037,6 +1063,209 @@ class zynthian_chain_manager:
         processor.set_engine(zyngine)
         return zyngine
 
+    def get_engine_key(self, eng_code):
+        """Get the key used to register a new engine instance
+
+        eng_code : Engine short code
+        Returns : Engine key
+        """
+
+        if eng_code[0:3] == "JV/":
+            return f"JV/{self.zyngine_counter}"
+        elif eng_code == "SF":
+            return f"{eng_code}/{self.zyngine_counter}"
+        else:
+            return eng_code
+
+    def create_engine(self, eng_code, jackname=None):
+        """Create a new engine instance, starting its process
+
+        eng_code : Engine short code
+        jackname : Jack client name for multi-instance engines (Default: next available)
+        Returns : engine object
+        """
+
+        zynthian_engine_class = self.engine_info[eng_code]["ENGINE"]
+        if eng_code[0:3] == "JV/":
+            return zynthian_engine_class(eng_code, self.state_manager, False, jackname)
+        elif eng_code == "SF":
+            return zynthian_engine_class(self.state_manager, jackname)
+        else:
+            return zynthian_engine_class(self.state_manager)
+
+    def get_engine_usage(self):
+        """Get a copy of the engines and jacknames in use, for code running outside the thread changing chains
+
+        Returns : Tuple (set of used jacknames, set of running engine keys)
+        """
+
+        jacknames = set()
+        for zyngine in list(self.zyngines.values()):
+            jacknames.add(zyngine.jackname)
+        for processor in self.get_processors():
+            jackname = processor.get_jackname()
+            if jackname is not None:
+                jacknames.add(jackname)
+        return jacknames, set(self.zyngines)
+
+    def get_engine_jobs(self, state, reserved=None, usage=None):
+        """Get list of engines that must be started for a chain state
+
+        state : Dictionary of chain states, indexed by chain id
+        reserved : Set of jacknames that can't be used (updated with allocated jacknames)
+        usage : Copy of engines in use, as returned by get_engine_usage (Default: check current chains & engines)
+        Returns : List of (eng_code, proc_id, jackname) tuples
+        """
+
+        if reserved is None:
+            reserved = set()
+        if usage is None:
+            running = self.zyngines
+            processors = None
+        else:
+            reserved |= usage[0]
+            running = usage[1]
+            processors = ()
+        jobs = []
+        eng_codes = set()
+        for chain_state in state.values():
+            for slot_state in chain_state.get("slots", []):
+                for proc_id, eng_code in slot_state.items():
+                    if eng_code not in self.engine_info:
+                        continue
+                    jackname = None
+                    if eng_code[0:3] == "JV/":
+                        jackname = self.get_next_jackname(self.engine_info[eng_code]["NAME"], reserved=reserved, processors=processors)
+                    elif eng_code == "SF":
+                        jackname = self.get_next_jackname("sfizz", reserved=reserved, processors=processors)
+                    elif eng_code not in self.parallel_start_engines or eng_code in running or eng_code in eng_codes:
+                        continue
+                    if jackname:
+                        reserved.add(jackname)
+                    eng_codes.add(eng_code)
+                    jobs.append((eng_code, int(proc_id), jackname))
+        return jobs
+
+    def create_engines(self, jobs, workers):
+        """Create engine instances concurrently
+
+        Engine processes (Jalv plugins, FluidSynth, LinuxSampler, ...) spend most of
+        their start time waiting for the process to be ready, so they are launched from
+        a bounded pool of worker threads.
+
+        jobs : List of (eng_code, proc_id, jackname) tuples, as returned by get_engine_jobs
+        workers : Max number of engines started at the same time
+        Returns : List of engine objects (None if failed), in the same order as jobs
+        """
+
+        def create_job_engine(job):
+            eng_code, proc_id, jackname = job
+            ts = monotonic()
+            try:
+                return self.create_engine(eng_code, jackname)
+            except Exception as e:
+                logging.error(f"Failed to start engine '{eng_code}' => {e}")
+                return None
+            finally:
+                # Engines start concurrently => attribute time to engine but not to phase total
+                zynloadprof.add(zynloadprof.PH_ENGINE_START, monotonic() - ts, f"{proc_id}:{eng_code}", total=False)
+
+        logging.info(f"Starting {len(jobs)} engines using {workers} workers ...")
+        with zynloadprof.phase(zynloadprof.PH_ENGINE_START):
+            with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="start_engine") as executor:
+                return list(executor.map(create_job_engine, jobs))
+
+    def register_prestarted_engine(self, eng_code, proc_id, zyngine):
+        """Register an engine started before its processor is added
+
+        eng_code : Engine short code
+        proc_id : UID of processor that will use the engine
+        zyngine : Engine object
+        """
+
+        if eng_code[0:3] == "JV/" or eng_code == "SF":
+            # Multi-instance engine => bound to its processor
+            self.zyngines[self.get_engine_key(eng_code)] = zyngine
+            self.zyngine_counter += 1
+            self.prestarted_engines[proc_id] = zyngine
+        else:
+            self.zyngines[eng_code] = zyngine
+
+    def start_engines(self, state):
+        """Start the engines required by a chain state concurrently
+
+        Engines are then consumed by start_engine when processors are added to chains.
+        Standby engines are used first. Engines that fail to start are left to start_engine.
+
+        state : Dictionary of chain states, indexed by chain id
+        """
+
+        # Use standby engines, started in advance by preload_engines
+        with self.standby_lock:
+            standby_engines = self.standby_engines
+            self.standby_engines = []
+        if standby_engines:
+            jobs = self.get_engine_jobs(state)
+            reserved = set()
+            for eng_code, proc_id, jackname in jobs:
+                for i, (standby_code, zyngine) in enumerate(standby_engines):
+                    if standby_code == eng_code:
+                        standby_engines.pop(i)
+                        self.register_prestarted_engine(eng_code, proc_id, zyngine)
+                        reserved.add(zyngine.jackname)
+                        break
+            for eng_code, zyngine in standby_engines:
+                logging.debug(f"Stopping unused standby engine '{eng_code}' ...")
+                zyngine.stop()
+        else:
+            reserved = None
+
+        workers = zynthian_gui_config.snapshot_engine_start_workers
+        if workers < 2:
+            return
+        jobs = [job for job in self.get_engine_jobs(state, reserved) if job[1] not in self.prestarted_engines]
+        if len(jobs) < 2:
+            return
+        self.state_manager.set_busy_details(f"starting {len(jobs)} engines")
+        for (eng_code, proc_id, jackname), zyngine in zip(jobs, self.create_engines(jobs, workers)):
+            if zyngine:
+                self.register_prestarted_engine(eng_code, proc_id, zyngine)
+
+    def preload_engines(self, state, usage):
+        """Start the engines required by a chain state in standby
+
+        Standby engines are not added to any chain, so they are not routed and produce
+        no sound. They are used by the next call to set_state. Previous standby engines
+        that are not required are stopped.
+
+        state : Dictionary of chain states, indexed by chain id
+        usage : Copy of engines in use, as returned by get_engine_usage, taken from the thread changing chains
+        """
+
+        self.stop_standby_engines()
+        # Avoid jacknames used by running engines
+        jobs = self.get_engine_jobs(state, set(), usage)
+        if not jobs:
+            return
+        workers = zynthian_gui_config.snapshot_engine_start_workers
+        standby_engines = []
+        for (eng_code, proc_id, jackname), zyngine in zip(jobs, self.create_engines(jobs, workers)):
+            if zyngine:
+                standby_engines.append((eng_code, zyngine))
+        with self.standby_lock:
+            self.standby_engines = standby_engines
+        logging.info(f"{len(standby_engines)} engines in standby")
+
+    def stop_standby_engines(self):
+        """Stop all engines in standby"""
+
+        with self.standby_lock:
+            standby_engines = self.standby_engines
+            self.standby_engines = []
+        for eng_code, zyngine in standby_engines:
+            logging.debug(f"Stopping standby engine '{eng_code}' ...")
+            zyngine.stop()
+
     def stop_unused_engines(self):
         """Stop engines that are not used by any processors"""
         for eng_key in list(self.zyngines.keys()):
@@ -1083,10 +1312,13 @@ class zynthian_chain_manager:
                     del result[eng_cat]
         return result
 
-    def get_next_jackname(self, jackname, sanitize=True):
+    def get_next_jackname(self, jackname, sanitize=True, reserved=(), processors=None):
         """Get the next available jackname
 
         jackname : stub of jackname
+        sanitize : True to replace regex characters
+        reserved : Set of jacknames already allocated to engines that are not running yet
+        processors : List of processors whose jacknames are used (Default: all processors)
         """
 
         try:
@@ -1095,8 +1327,10 @@ class zynthian_chain_manager:
             if sanitize:
                 jackname = re.sub("[\_]{2,}", "_", re.sub(
                     "[\s\'\*\(\)\[\]]", "_", jackname))
-            names = set()
-            for processor in self.get_processors():
+            names = set(reserved)
+            if processors is None:
+                processors = self.get_processors()
+            for processor in processors:
                 jn = processor.get_jackname()
                 if jn is not None and jn.startswith(jackname):
                     names.add(jn)
@@ -1135,12 +1369,16 @@ class zynthian_chain_manager:
     # State Management
     # ------------------------------------------------------------------------
 
-    def get_state(self):
-        """Get dictionary of chain slot states indexed by chain id"""
+    def get_state(self, chain_ids=None):
+        """Get dictionary of chain slot states indexed by chain id
+
+        chain_ids : List of chain ids to get (Default: all chains)
+        """
 
         state = {}
         for chain_id in self.ordered_chain_ids:
-            state[chain_id] = self.chains[chain_id].get_state()
+            if chain_ids is None or chain_id in chain_ids:
+                state[chain_id] = self.chains[chain_id].get_state()
         return state
 
     def get_zs3_processor_state(self):
@@ -1174,6 +1412,10 @@ class zynthian_chain_manager:
             # so we stop Jalv engines!
             self.stop_unused_jalv_engines()  # TODO: Can we factor this out? => Not yet!!
 
+        # Start engine processes concurrently before building chains
+        if not merge:
+            self.start_engines(state)
+
         for chain_id, chain_state in state.items():
             if merge:
                 chain_id = None
@@ -1199,6 +1441,11 @@ class zynthian_chain_manager:
             else:
                 self.chains[chain_id].fader_pos = 0
 
+        # Stop any engine started in parallel that was not used
+        if self.prestarted_engines:
+            self.prestarted_engines = {}
+            self.stop_unused_engines()
+
         self.state_manager.end_busy("set_chain_state")
 
     def restore_presets(self):
@@ -1225,28 +1472,30 @@ class zynthian_chain_manager:
 
         logging.debug(f"(chan={chan}, midi_cc={midi_cc}, zctrl={zctrl.symbol}, zmip={zmip})")
         self.remove_midi_learn(zctrl.processor, zctrl.symbol)
-        if zmip is None:
-            if zctrl.processor:
-                if zctrl.processor.midi_chan is not None:
-                    key = (chan << 16) | (midi_cc << 8)
-                    if key in self.chan_midi_cc_binding:
-                        self.chan_midi_cc_binding[key].append(zctrl)
-                    else:
-                        self.chan_midi_cc_binding[key] = [zctrl]
-                if zctrl.processor.chain_id is not None:
-                    key = (zctrl.processor.chain_id << 16) | (midi_cc << 8)
-                    if key in self.chain_midi_cc_binding:
-                        self.chain_midi_cc_binding[key].append(zctrl)
-                    else:
-                        self.chain_midi_cc_binding[key] = [zctrl]
-        else:
-            # Absolute mapping
-            key = (zmip << 24) | (chan << 16) | (midi_cc << 8)
-            if key in self.absolute_midi_cc_binding:
-                if zctrl not in self.absolute_midi_cc_binding[key]:
-                    self.absolute_midi_cc_binding[key].append(zctrl)
+        with self.midi_cc_binding_lock:
+            if zmip is None:
+                if zctrl.processor:
+                    if zctrl.processor.midi_chan is not None:
+                        key = (chan << 16) | (midi_cc << 8)
+                        if key in self.chan_midi_cc_binding:
+                            self.chan_midi_cc_binding[key].append(zctrl)
+                        else:
+                            self.chan_midi_cc_binding[key] = [zctrl]
+                    if zctrl.processor.chain_id is not None:
+                        key = (zctrl.processor.chain_id << 16) | (midi_cc << 8)
+                        if key in self.chain_midi_cc_binding:
+                            self.chain_midi_cc_binding[key].append(zctrl)
+                        else:
+                            self.chain_midi_cc_binding[key] = [zctrl]
             else:
-                self.absolute_midi_cc_binding[key] = [zctrl]
+                # Absolute mapping
+                key = (zmip << 24) | (chan << 16) | (midi_cc << 8)
+                if key in self.absolute_midi_cc_binding:
+                    if zctrl not in self.absolute_midi_cc_binding[key]:
+                        self.absolute_midi_cc_binding[key].append(zctrl)
+                else:
+                    self.absolute_midi_cc_binding[key] = [zctrl]
+            self.midi_cc_routes_dirty = True
 
         # Ensure pedals are always learnt in absolute mode.
         # TODO: This is not OK, just mitigates issue #1277 until a proper solution is implemented
@@ -1274,24 +1523,26 @@ class zynthian_chain_manager:
             return
         zctrl = proc.controllers_dict[symbol]
         logging.debug(f"(symbol={symbol} => zctrl={zctrl.symbol})")
-        for key in list(self.absolute_midi_cc_binding):
-            zctrls = self.absolute_midi_cc_binding[key]
-            if zctrl in zctrls:
-                zctrls.remove(zctrl)
-            if not zctrls:
-                self.absolute_midi_cc_binding.pop(key)
-        for key in list(self.chan_midi_cc_binding):
-            zctrls = self.chan_midi_cc_binding[key]
-            if zctrl in zctrls:
-                zctrls.remove(zctrl)
-            if not zctrls:
-                self.chan_midi_cc_binding.pop(key)
-        for key in list(self.chain_midi_cc_binding):
-            zctrls = self.chain_midi_cc_binding[key]
-            if zctrl in zctrls:
-                zctrls.remove(zctrl)
-            if not zctrls:
-                self.chain_midi_cc_binding.pop(key)
+        with self.midi_cc_binding_lock:
+            for key in list(self.absolute_midi_cc_binding):
+                zctrls = self.absolute_midi_cc_binding[key]
+                if zctrl in zctrls:
+                    zctrls.remove(zctrl)
+                if not zctrls:
+                    self.absolute_midi_cc_binding.pop(key)
+            for key in list(self.chan_midi_cc_binding):
+                zctrls = self.chan_midi_cc_binding[key]
+                if zctrl in zctrls:
+                    zctrls.remove(zctrl)
+                if not zctrls:
+                    self.chan_midi_cc_binding.pop(key)
+            for key in list(self.chain_midi_cc_binding):
+                zctrls = self.chain_midi_cc_binding[key]
+                if zctrl in zctrls:
+                    zctrls.remove(zctrl)
+                if not zctrls:
+                    self.chain_midi_cc_binding.pop(key)
+            self.midi_cc_routes_dirty = True
 
         """
         if proc.eng_code == "MD":
@@ -1311,6 +1562,48 @@ class zynthian_chain_manager:
             if zctrl in zctrls:
                 return [key, False]  # TODO: This isn't right!
 
+    def compile_midi_cc_routes(self):
+        """Build CC routing tables from CC binding maps
+
+        Routing tables are lists indexed by CHAN,CC (and ZMIP for absolute bindings), so routing a CC
+        is a single index lookup. They are rebuilt lazily, after MIDI learn or active chain changes.
+        Binding maps are read with midi_cc_binding_lock held, as they may be changed from other threads.
+        """
+
+        absolute_routes = [None] * 256
+        chan_routes = [()] * (MAX_NUM_MIDI_CHANS << 7)
+        with self.midi_cc_binding_lock:
+            self.midi_cc_routes_dirty = False
+            for key, zctrls in self.absolute_midi_cc_binding.items():
+                zmip = (key >> 24) & 0xff
+                chan = (key >> 16) & 0xff
+                if chan >= MAX_NUM_MIDI_CHANS:
+                    continue
+                if absolute_routes[zmip] is None:
+                    absolute_routes[zmip] = [()] * (MAX_NUM_MIDI_CHANS << 7)
+                absolute_routes[zmip][(chan << 7) | (key >> 8) & 0x7f] = tuple(zctrls)
+            for key, zctrls in self.chan_midi_cc_binding.items():
+                chan = (key >> 16) & 0xff
+                if chan < MAX_NUM_MIDI_CHANS:
+                    chan_routes[(chan << 7) | (key >> 8) & 0x7f] = tuple(zctrls)
+        self.absolute_midi_cc_routes = absolute_routes
+        self.chan_midi_cc_routes = chan_routes
+        self.compile_active_midi_cc_routes()
+
+    def compile_active_midi_cc_routes(self):
+        """Build CC routing table of active chain"""
+
+        chain_id = self.active_chain_id
+        active_routes = [()] * 128
+        if chain_id is not None:
+            with self.midi_cc_binding_lock:
+                for cc_num in range(128):
+                    zctrls = self.chain_midi_cc_binding.get((chain_id << 16) | (cc_num << 8))
+                    if zctrls:
+                        active_routes[cc_num] = tuple(zctrls)
+        self.active_midi_cc_routes = active_routes
+        self.active_midi_cc_routes_chain_id = chain_id
+
     def midi_control_change(self, zmip, midi_chan, cc_num, cc_val):
         """Send MIDI CC message to relevant chain
 
@@ -1320,21 +1613,17 @@ class zynthian_chain_manager:
         cc_val : CC value
         """
 
-        # Handle bank change (CC0/32)
-        # TODO: Validate and optimise bank change code
-        if zynthian_gui_config.midi_bank_change:
-            for chain_id in self.midi_chan_2_chain_ids[midi_chan]:
-                chain = self.chains[chain_id]
-                if cc_num == 0:
-                    for processor in chain.get_processors():
-                        processor.midi_bank_msb(cc_val)
-                        break
-                    return
-                elif cc_num == 32:
-                    for processor in chain.get_processors():
-                        processor.midi_bank_lsb(cc_val)
-                        break
-                    return
+        # Handle bank change (CC0/32) => first processor of first chain in MIDI channel
+        if (cc_num == 0 or cc_num == 32) and zynthian_gui_config.midi_bank_change:
+            chain_ids = self.midi_chan_2_chain_ids[midi_chan]
+            if chain_ids:
+                processors = self.chains[chain_ids[0]].get_processors()
+                if processors:
+                    if cc_num == 0:
+                        processors[0].midi_bank_msb(cc_val)
+                    else:
+                        processors[0].midi_bank_lsb(cc_val)
+                return
 
         # Handle controller feedback from setBfree engine => setBfree sends feedback in channel 0
         # Each engine sending feedback should use a separated zmip, currently only setBfree does.
@@ -1344,8 +1633,7 @@ class zynthian_chain_manager:
                 for proc in zynautoconnect.ctrl_fb_procs:
                     if proc.part_i == midi_chan:
                         key = (proc.chain_id << 16) | (cc_num << 8)
-                        zctrls = self.chain_midi_cc_binding[key]
-                        for zctrl in zctrls:
+                        for zctrl in self.chain_midi_cc_binding.get(key, ()):
                             # logging.debug(f"CONTROLLER FEEDBACK {zctrl.symbol} ({midi_chan}) => {cc_val}")
                             zctrl.midi_control_change(cc_val, send=False)
             except Exception as e:
@@ -1353,35 +1641,33 @@ class zynthian_chain_manager:
                     f"Can't manage control feedback for CH{midi_chan}:CC{cc_num} => {e}")
             return
 
+        if self.midi_cc_routes_dirty:
+            self.compile_midi_cc_routes()
+        elif self.active_midi_cc_routes_chain_id != self.active_chain_id:
+            self.compile_active_midi_cc_routes()
+        index = (midi_chan << 7) | cc_num
+
         # Handle absolute CC binding
-        try:
-            key = (zmip << 24) | (midi_chan << 16) | (cc_num << 8)
-            zctrls = self.absolute_midi_cc_binding[key]
-            for zctrl in zctrls:
-                zctrl.midi_control_change(cc_val)
-        except:
-            pass
+        routes = self.absolute_midi_cc_routes[zmip]
+        if routes is not None:
+            for zctrl in routes[index]:
+                try:
+                    zctrl.midi_control_change(cc_val)
+                except Exception as e:
+                    logging.warning(f"Can't send CH{midi_chan}:CC{cc_num} to {zctrl.symbol} => {e}")
 
         # Handle active chain CC binding
         if zynautoconnect.get_midi_in_dev_mode(zmip):
-            try:
-                key = (self.active_chain_id << 16) | (cc_num << 8)
-                zctrls = self.chain_midi_cc_binding[key]
-                for zctrl in zctrls:
-                    zctrl.midi_control_change(cc_val)
-                    self.handle_pedals(cc_num, cc_val, zctrl)
-            except:
-                pass
+            zctrls = self.active_midi_cc_routes[cc_num]
         # Handle channel CC binding
         else:
+            zctrls = self.chan_midi_cc_routes[index]
+        for zctrl in zctrls:
             try:
-                key = (midi_chan << 16) | (cc_num << 8)
-                zctrls = self.chan_midi_cc_binding[key]
-                for zctrl in zctrls:
-                    zctrl.midi_control_change(cc_val)
-                    self.handle_pedals(cc_num, cc_val, zctrl)
-            except:
-                pass
+                zctrl.midi_control_change(cc_val)
+                self.handle_pedals(cc_num, cc_val, zctrl)
+            except Exception as e:
+                logging.warning(f"Can't send CH{midi_chan}:CC{cc_num} to {zctrl.symbol} => {e}")
 
     def handle_pedals(self, cc_num, cc_val, zctrl):
         """Handle pedal CC
@@ -1495,6 +1781,7 @@ class zynthian_chain_manager:
                     pass
 
         chain.set_midi_chan(midi_chan)
+        zynjournal.request_compaction()
 
     def get_free_midi_chans(self):
         """Get list of unused MIDI channels"""
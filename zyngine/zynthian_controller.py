@@ -29,6 +29,7 @@ from time import monotonic
 
 # Zynthian specific modules
 from zyncoder.zyncore import lib_zyncore
+from zyngine.zynthian_state_journal import zynjournal
 
 
 MIDI_CC_MODE_DETECT_TIMEOUT = 0.2
@@ -377,29 +378,37 @@ class zynthian_controller:
 
         mval = None
         if self.engine and send:
-            # Send value using engine method...
-            try:
-                self.engine.send_controller_value(self)
-            # Send value using OSC/MIDI ...
-            except:
+            sender = getattr(self.engine, "controller_sender", None)
+            # Queue value to be sent by engine's worker, so caller doesn't block on engine IPC
+            if sender:
+                sender.send(self)
+            else:
+                # Send value using engine method...
                 try:
-                    if self.osc_path:
-                        # logging.debug("Sending OSC Controller '{}', {} => {}".format(self.symbol, self.osc_path, self.get_ctrl_osc_val()))
-                        liblo.send(self.engine.osc_target,
-                                   self.osc_path, self.get_ctrl_osc_val())
-                    elif self.midi_cc:
-                        mval = self.get_ctrl_midi_val()
-                        # logging.debug("Sending MIDI Controller '{}', CH{}#CC{}={}".format(self.symbol, self.midi_chan, self.midi_cc, mval))
-                        self.send_midi_cc(mval)
-                except Exception as e:
-                    logging.warning(
-                        "Can't send controller '{}' => {}".format(self.symbol, e))
+                    self.engine.send_controller_value(self)
+                # Send value using OSC/MIDI ...
+                except:
+                    try:
+                        if self.osc_path:
+                            # logging.debug("Sending OSC Controller '{}', {} => {}".format(self.symbol, self.osc_path, self.get_ctrl_osc_val()))
+                            liblo.send(self.engine.osc_target,
+                                       self.osc_path, self.get_ctrl_osc_val())
+                        elif self.midi_cc:
+                            mval = self.get_ctrl_midi_val()
+                            # logging.debug("Sending MIDI Controller '{}', CH{}#CC{}={}".format(self.symbol, self.midi_chan, self.midi_cc, mval))
+                            self.send_midi_cc(mval)
+                    except Exception as e:
+                        logging.warning(
+                            "Can't send controller '{}' => {}".format(self.symbol, e))
 
         # Send feedback to MIDI controllers => What MIDI controllers? Those selected as MIDI-out?
         # TODO: Set midi_feeback to MIDI learn
         if self.midi_feedback:
             self.send_midi_feedback(mval)
 
+        if zynjournal.enabled:
+            zynjournal.record_zctrl(self)
+
         self.is_dirty = True
 
     def send_midi_cc(self, mval=None):
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# ****************************************************************************
+# ZYNTHIAN PROJECT: Zynthian Controller Sender (zynthian_controller_sender)
+#
+# Asynchronous, coalescing controller value sender
+#
+# Copyright (C) 2015-2024 Fernando Moyano <jofemodo@zynthian.org>
+#                         Brian Walton <riban@zynthian.org>
+#
+# ****************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+# ****************************************************************************
+
+import logging
+from time import monotonic
+from threading import Thread, Condition
+
+# ----------------------------------------------------------------------------
+# Zynthian Controller Sender Class
+# ----------------------------------------------------------------------------
+
+
+class zynthian_controller_sender:
+
+    def __init__(self, engine, max_rate=200):
+        """ Create an instance of a controller sender
+
+        Sends controller values to an engine from a worker thread, so threads changing
+        controllers (MIDI, UI) never block on engine IPC. Only the latest value of each
+        controller is sent: the value is read when it is sent, not when it is queued.
+        Rate is limited per controller, so different controllers (e.g. ZS3 restore) are
+        sent back to back, while fast changes of a controller are coalesced.
+
+        engine : Engine object, whose send_controller_value is called by the worker
+        max_rate : Max number of values sent per second for each controller
+        """
+
+        self.engine = engine
+        self.min_interval = 1 / max_rate
+        self.cond = Condition()
+        self.pending = {}  # Controllers waiting to be sent, in request order (dict used as ordered set)
+        self.last_sent = {}  # Time of last send, indexed by controller
+        self.exit_flag = False
+        self.thread = None
+
+    def start(self):
+        """Start worker thread"""
+
+        if self.thread and self.thread.is_alive():
+            return
+        self.exit_flag = False
+        self.thread = Thread(target=self.thread_task, args=())
+        self.thread.name = f"Controller Sender {self.engine.name}"
+        self.thread.daemon = True  # thread dies with the program
+        self.thread.start()
+
+    def stop(self):
+        """Stop worker thread, discarding pending values"""
+
+        with self.cond:
+            self.exit_flag = True
+            self.pending = {}
+            self.last_sent = {}
+            self.cond.notify_all()
+        if self.thread and self.thread.is_alive():
+            self.thread.join()
+        self.thread = None
+
+    def send(self, zctrl):
+        """Request sending controller value
+
+        Ignored after stop, so a stopped engine is not sent values and the worker is not restarted.
+        zctrl : Controller object
+        """
+
+        with self.cond:
+            if self.exit_flag:
+                return
+            if self.thread is None:
+                self.start()
+            self.pending[zctrl] = None
+            self.cond.notify_all()
+
+    def flush(self):
+        """Send pending values from the calling thread"""
+
+        while True:
+            with self.cond:
+                if not self.pending:
+                    return
+                zctrl = next(iter(self.pending))
+                del self.pending[zctrl]
+            self.send_now(zctrl)
+
+    def send_now(self, zctrl):
+        try:
+            self.engine.send_controller_value(zctrl)
+        except Exception as e:
+            logging.warning(f"Can't send controller '{zctrl.symbol}' => {e}")
+
+    def get_next(self):
+        """Wait for next controller to send, i.e. first pending controller not sent in last min_interval
+
+        Returns : Controller object or None if exiting
+        """
+
+        with self.cond:
+            while not self.exit_flag:
+                now = monotonic()
+                timeout = None
+                for zctrl in self.pending:
+                    wait = self.last_sent.get(zctrl, 0) + self.min_interval - now
+                    if wait <= 0:
+                        del self.pending[zctrl]
+                        self.last_sent[zctrl] = now
+                        return zctrl
+                    if timeout is None or wait < timeout:
+                        timeout = wait
+                # Rate limit => values changing meanwhile are coalesced
+                self.cond.wait(timeout)
+        return None
+
+    def thread_task(self):
+        while True:
+            zctrl = self.get_next()
+            if zctrl is None:
+                return
+            self.send_now(zctrl)
+            # Forget controllers not sent recently
+            if len(self.last_sent) > 256:
+                with self.cond:
+                    now = monotonic()
+                    self.last_sent = {zctrl: ts for zctrl, ts in self.last_sent.items() if now - ts < self.min_interval}
+
+# -----------------------------------------------------------------------------
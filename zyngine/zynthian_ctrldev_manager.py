@@ -31,6 +31,7 @@ import sys
 # Zynthian specific modules
 import zynautoconnect
 from zyngine.ctrldev import *
+from zyngine.zynthian_midi_profiler import zynmidiprof
 from zyngui import zynthian_gui_config
 from zyncoder.zyncore import lib_zyncore
 
@@ -218,6 +219,10 @@ class zynthian_ctrldev_manager():
 
         # Try device driver ...
         if idev in self.drivers:
+            if zynmidiprof.enabled:
+                driver = self.drivers[idev]
+                with zynmidiprof.handler(f"ctrldev:{type(driver).__name__}", idev):
+                    return driver.midi_event(ev)
             return self.drivers[idev].midi_event(ev)
 
         return False
@@ -32,6 +32,7 @@ import pexpect
 import fnmatch
 from time import sleep
 from string import Template
+from threading import RLock
 from os.path import isfile, isdir, ismount, join
 
 import zynautoconnect
@@ -70,6 +71,8 @@ class zynthian_basic_engine:
         self.command_prompt = prompt
         self.command_cwd = cwd
         self.ignore_not_on_gui = False
+        self.proc_lock = RLock()  # Serializes IPC with engine process
+        self.controller_sender = None  # Asynchronous controller sender (None to send synchronously)
 
     # ---------------------------------------------------------------------------
     # Subprocess Management & IPC
@@ -104,6 +107,8 @@ class zynthian_basic_engine:
                     "Can't start engine {} => {}".format(self.name, err))
 
     def stop(self):
+        if self.controller_sender:
+            self.controller_sender.stop()
         if self.proc:
             try:
                 logging.info("Stopping Engine " + self.name)
@@ -123,15 +128,16 @@ class zynthian_basic_engine:
 
     def proc_cmd(self, cmd):
         if self.proc:
-            try:
-                # logging.debug("proc command: "+cmd)
-                self.proc.sendline(cmd)
-                out = self.proc_get_output()
-                # logging.debug("proc output:\n{}".format(out))
-            except Exception as err:
-                out = ""
-                logging.error(
-                    "Can't exec engine command: {} => {}".format(cmd, err))
+            with self.proc_lock:
+                try:
+                    # logging.debug("proc command: "+cmd)
+                    self.proc.sendline(cmd)
+                    out = self.proc_get_output()
+                    # logging.debug("proc output:\n{}".format(out))
+                except Exception as err:
+                    out = ""
+                    logging.error(
+                        "Can't exec engine command: {} => {}".format(cmd, err))
             return out
 
 
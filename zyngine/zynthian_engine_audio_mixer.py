@@ -585,14 +585,20 @@ class zynmixer(zynthian_engine):
         for channel in range(self.MAX_NUM_CHANNELS):
             self.reset(channel)
 
-    def get_state(self, full=True):
+    def get_state(self, full=True, chans=None):
         """Get mixer state as list of controller state dictionaries
 
         full : True to get state of all parameters or false for off-default values
+        chans : List of mixer channels to get (Default: all channels & MIDI learn)
         Returns : List of dictionaries describing parameter states
         """
         state = {}
-        for chan in range(self.MAX_NUM_CHANNELS):
+        if chans is None:
+            chans = range(self.MAX_NUM_CHANNELS)
+            midi_learn = True
+        else:
+            midi_learn = False
+        for chan in chans:
             key = 'chan_{:02d}'.format(chan)
             chan_state = {}
             for symbol in self.zctrls[chan]:
@@ -604,6 +610,7 @@ class zynmixer(zynthian_engine):
                     chan_state[zctrl.symbol] = value
             if chan_state:
                 state[key] = chan_state
+        if midi_learn:
             state["midi_learn"] = {}
             for chan in range(16):
                 for cc, zctrl in self.learned_cc[chan].items():
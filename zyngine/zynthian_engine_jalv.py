@@ -35,6 +35,8 @@ from . import zynthian_engine
 from . import zynthian_controller
 from zyncoder.zyncore import lib_zyncore
 from zyngine.ctrlinfo import *
+from zyngui import zynthian_gui_config
+from zyngine.zynthian_controller_sender import zynthian_controller_sender
 
 # ------------------------------------------------------------------------------
 # Jalv Engine Class => Engine for LV2 plugins
@@ -207,6 +209,10 @@ class zynthian_engine_jalv(zynthian_engine):
 
             output = self.start()
 
+            # Jalv "set" commands are blocking round-trips => send controller values from a worker
+            if zynthian_gui_config.controller_send_rate > 0:
+                self.controller_sender = zynthian_controller_sender(self, zynthian_gui_config.controller_send_rate)
+
             # Get Plugin & Jack names from Jalv starting text ...
             if output:
                 for line in output.split("\n"):
@@ -395,6 +401,9 @@ class zynthian_engine_jalv(zynthian_engine):
     def set_preset(self, processor, preset, preload=False):
         if not preset[0]:
             return
+        # Values changed before loading the preset must not override it
+        if self.controller_sender:
+            self.controller_sender.flush()
         output = self.proc_cmd("preset {}".format(preset[0]))
 
         # Parse new controller values
@@ -443,6 +452,9 @@ class zynthian_engine_jalv(zynthian_engine):
         # Save preset (jalv)
         if not bank:
             bank = ["", None, "None", None]
+        # Pending controller values must be saved in preset
+        if self.controller_sender:
+            self.controller_sender.flush()
         res = self.proc_cmd("save preset %s,%s" %
                             (bank[0], preset_name)).split("\n")
 
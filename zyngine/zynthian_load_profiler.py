@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+# ****************************************************************************
+# ZYNTHIAN PROJECT: Zynthian Load Profiler (zynthian_load_profiler)
+#
+# Timing profile of snapshot & ZS3 loading
+#
+# Copyright (C) 2015-2024 Fernando Moyano <jofemodo@zynthian.org>
+#                         Brian Walton <riban@zynthian.org>
+#
+# ****************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+# ****************************************************************************
+
+import os
+import logging
+from time import monotonic
+from threading import Lock, local
+from datetime import datetime
+from json import JSONEncoder
+from contextlib import contextmanager
+
+# ----------------------------------------------------------------------------
+# Zynthian Load Profiler Class
+# ----------------------------------------------------------------------------
+
+
+class zynthian_load_profiler:
+
+    # Load phases
+    PH_JSON_DECODE = "json decode"
+    PH_LEGACY_FIX = "legacy fix"
+    PH_ENGINE_START = "engine start"
+    PH_CHAINS = "chains"
+    PH_BANK_SCAN = "bank scan"
+    PH_PRESET_LOAD = "preset load"
+    PH_CONTROLLER_RESTORE = "controller restore"
+    PH_MIXER_RESTORE = "mixer restore"
+    PH_AUTOCONNECT = "autoconnect"
+    PH_SEQUENCER_RESTORE = "sequencer restore"
+
+    def __init__(self, log_fpath=None, log_min_time=0.2):
+        """ Create an instance of a load profiler
+
+        Records monotonic timings per phase and per engine while loading snapshots & ZS3s.
+        Phases may be nested (e.g. engine start within chains) and may run in several threads.
+        Nothing is recorded unless a load is being profiled. Only one load is profiled at a time:
+        loads begun from other threads while a report is being recorded are ignored.
+
+        log_fpath : Path of file where reports are appended, one JSON line per load (Default: no log file)
+        log_min_time : Min load time (seconds) for a report to be written to log file
+        """
+
+        self.log_fpath = log_fpath
+        self.log_min_time = log_min_time
+        self.lock = Lock()
+        self.thread_state = local()  # Per thread nesting level of loads ("depth") & "ignored" flag
+        self.report = None  # Report being recorded
+        self.last_report = None  # Last completed report
+        self.ts0 = 0
+
+    # ----------------------------------------------------------------------------
+    # Recording
+    # ----------------------------------------------------------------------------
+
+    def begin(self, kind, **info):
+        """Begin profiling a load
+
+        Nested loads (e.g. ZS3 loaded by snapshot) are recorded into the outer report.
+        Each call must be paired with a call to end from the same thread.
+        kind : Type of load, e.g. "snapshot", "zs3"
+        info : Extra info to add to report (e.g. fpath)
+        """
+
+        thread_state = self.thread_state
+        depth = getattr(thread_state, "depth", 0) + 1
+        thread_state.depth = depth
+        if depth > 1:
+            return
+        with self.lock:
+            # Load from another thread is being recorded => don't nest into its report
+            thread_state.ignored = self.report is not None
+            if thread_state.ignored:
+                return
+            self.ts0 = monotonic()
+            self.report = {
+                "kind": kind,
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "total": 0.0,
+                "phases": {},
+                "engines": {},
+                **info
+            }
+
+    def end(self):
+        """End profiling a load
+
+        Returns : Report dictionary if the outer load ended, None otherwise
+        """
+
+        thread_state = self.thread_state
+        depth = getattr(thread_state, "depth", 0)
+        if depth == 0:
+            return None
+        thread_state.depth = depth - 1
+        if depth > 1 or thread_state.ignored:
+            return None
+        with self.lock:
+            report = self.report
+            self.report = None
+            report["total"] = monotonic() - self.ts0
+            self.last_report = report
+        logging.debug(self.format_report(report))
+        self.write_log(report)
+        return report
+
+    def add(self, phase, elapsed, engine=None, total=True):
+        """Add time to a phase
+
+        phase : Phase name
+        elapsed : Elapsed time in seconds
+        engine : Name of engine or processor the time is attributed to (optional)
+        total : False to not add time to phase total, e.g. when phase total is measured by the caller
+        """
+
+        with self.lock:
+            if self.report is None:
+                return
+            if total:
+                try:
+                    stats = self.report["phases"][phase]
+                    stats["time"] += elapsed
+                    stats["count"] += 1
+                except KeyError:
+                    self.report["phases"][phase] = {"time": elapsed, "count": 1}
+            if engine:
+                engine_phases = self.report["engines"].setdefault(engine, {})
+                engine_phases[phase] = engine_phases.get(phase, 0.0) + elapsed
+
+    @contextmanager
+    def phase(self, phase, engine=None):
+        """Context manager that times a phase
+
+        phase : Phase name
+        engine : Name of engine or processor the time is attributed to (optional)
+        """
+
+        if self.report is None:
+            yield
+            return
+        ts = monotonic()
+        try:
+            yield
+        finally:
+            self.add(phase, monotonic() - ts, engine)
+
+    # ----------------------------------------------------------------------------
+    # Reporting
+    # ----------------------------------------------------------------------------
+
+    def get_report(self):
+        """Get last completed report"""
+
+        return self.last_report
+
+    @staticmethod
+    def format_report(report, max_engines=10):
+        """Format a report as human readable text
+
+        report : Report dictionary
+        max_engines : Max number of engines to list, slowest first
+        Returns : Report text
+        """
+
+        if not report:
+            return "No load profile available"
+        title = report["kind"]
+        if "fpath" in report:
+            title += f" '{report['fpath']}'"
+        elif "zs3_id" in report:
+            title += f" '{report['zs3_id']}'"
+        lines = [f"Load profile of {title}: {report['total']:.3f}s"]
+        for phase, stats in sorted(report["phases"].items(), key=lambda item: item[1]["time"], reverse=True):
+            lines.append(f"  {phase}: {stats['time']:.3f}s ({stats['count']})")
+        engines = sorted(report["engines"].items(), key=lambda item: sum(item[1].values()), reverse=True)
+        if engines:
+            lines.append("  Slowest engines:")
+            for engine, phases in engines[:max_engines]:
+                details = ", ".join(f"{phase} {t:.3f}s" for phase, t in phases.items())
+                lines.append(f"    {engine}: {sum(phases.values()):.3f}s => {details}")
+        return "\n".join(lines)
+
+    def write_log(self, report):
+        """Append report to log file as a JSON line
+
+        report : Report dictionary
+        """
+
+        if not self.log_fpath or report["total"] < self.log_min_time:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.log_fpath), exist_ok=True)
+            with open(self.log_fpath, "a") as fh:
+                fh.write(JSONEncoder().encode(report) + "\n")
+        except Exception as e:
+            logging.warning(f"Can't write load profile log => {e}")
+
+# ---------------------------------------------------------------------------
+
+
+global zynloadprof
+zynloadprof = zynthian_load_profiler(os.environ.get(
+    'ZYNTHIAN_MY_DATA_DIR', "/zynthian/zynthian-my-data") + "/capture/load_profile.log")
+
+# ---------------------------------------------------------------------------
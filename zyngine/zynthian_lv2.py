@@ -36,6 +36,7 @@ import logging
 import urllib.parse
 from enum import Enum
 from random import randrange
+from threading import RLock
 
 # ------------------------------------------------------------------------------
 # Some variables & definitions
@@ -179,10 +180,13 @@ ENGINE_CONFIG_FILE = "{}/engine_config.json".format(
     os.environ.get('ZYNTHIAN_CONFIG_DIR'))
 JALV_LV2_CONFIG_FILE = "{}/jalv/plugins.json".format(
     os.environ.get('ZYNTHIAN_CONFIG_DIR'))
+LV2_SCAN_CACHE_FILE = "{}/jalv/lv2_scan.json".format(
+    os.environ.get('ZYNTHIAN_CONFIG_DIR'))
 
 engines = None
 engines_by_type = None
 engines_mtime = None
+world_lock = RLock()  # Lilv world is not thread safe and engines may be started concurrently
 
 # ------------------------------------------------------------------------------
 # Lilv LV2 library initialization
@@ -334,7 +338,14 @@ def get_engine_description(key):
     return description[randrange(4)]
 
 
-def generate_engines_config_file(refresh=True, reset_rankings=None):
+def generate_engines_config_file(refresh=True, reset_rankings=None, full_scan=False):
+    """Generate engine config file from standalone engines and installed LV2 plugins
+
+    refresh : True to reload LV2 world
+    reset_rankings : 1 to reset quality & complexity, 2 to randomize them
+    full_scan : True to query all LV2 plugins, False to query only plugins in new or modified bundles
+    """
+
     global engines, engines_mtime
     genengines = {}
 
@@ -404,13 +415,37 @@ def generate_engines_config_file(refresh=True, reset_rankings=None):
                 key, genengines[key]))
             i += 1
 
-        # Add LV2 plugins
+        # Add LV2 plugins. Plugin info is only queried for new or modified bundles.
+        if full_scan:
+            scan_cache = {}
+        else:
+            scan_cache = load_lv2_scan_cache()
+        new_scan_cache = {}
+        n_queried = 0
         for plugin in world.get_all_plugins():
-            engine_name = str(plugin.get_name())
             engine_uri = str(plugin.get_uri())
             # Skip plugins that doesn't work in the detected RBPi version
             if rbpi_version_number < 5 and engine_uri in rpi5_plugins:
                 continue
+            bundle_path = urllib.parse.unquote(str(plugin.get_bundle_uri())[7:])
+            try:
+                bundle = new_scan_cache[bundle_path]
+            except KeyError:
+                bundle = new_scan_cache[bundle_path] = {
+                    'MTIME': get_bundle_mtime(bundle_path),
+                    'PLUGINS': {}
+                }
+            try:
+                cached_bundle = scan_cache[bundle_path]
+                if bundle['MTIME'] is None or cached_bundle['MTIME'] != bundle['MTIME']:
+                    raise KeyError(bundle_path)
+                plugin_info = cached_bundle['PLUGINS'][engine_uri]
+            except KeyError:
+                plugin_info = get_plugin_info(plugin)
+                n_queried += 1
+            bundle['PLUGINS'][engine_uri] = plugin_info
+
+            engine_name = plugin_info['NAME']
             key = f"JV/{engine_name}"
             try:
                 engine_id = engines[key]['ID']
@@ -421,7 +456,7 @@ def generate_engines_config_file(refresh=True, reset_rankings=None):
                     try:
                         engine_cat = lv2class2engcat[engine_cat]
                     except:
-                        engine_cat = get_plugin_cat(plugin)
+                        engine_cat = plugin_info['CAT']
                 engine_index = engines[key]['INDEX']
                 engine_descr = engines[key]['DESCR']
                 engine_quality = engines[key]['QUALITY']
@@ -434,8 +469,8 @@ def generate_engines_config_file(refresh=True, reset_rankings=None):
                 hash.update(key.encode())
                 engine_id = hash.hexdigest()[:10]
                 engine_title = engine_name
-                engine_type = get_plugin_type(plugin).value
-                engine_cat = get_plugin_cat(plugin)
+                engine_type = plugin_info['TYPE']
+                engine_cat = plugin_info['CAT']
                 engine_index = 9999
                 engine_descr = get_engine_description(key)
                 engine_quality = 0
@@ -457,7 +492,7 @@ def generate_engines_config_file(refresh=True, reset_rankings=None):
                 'ENABLED': is_engine_enabled(key, False),
                 'INDEX': engine_index,
                 'URL': engine_uri,
-                'UI': is_plugin_ui(plugin),
+                'UI': plugin_info['UI'],
                 'DESCR': engine_descr,
                 "QUALITY": engine_quality,
                 "COMPLEX": engine_complex,
@@ -474,6 +509,11 @@ def generate_engines_config_file(refresh=True, reset_rankings=None):
             json.dump(engines, f)
         engines_mtime = os.stat(ENGINE_CONFIG_FILE).st_mtime
 
+        # Removed bundles are dropped from scan cache
+        save_lv2_scan_cache(new_scan_cache)
+        n_plugins = sum(len(bundle['PLUGINS']) for bundle in new_scan_cache.values())
+        logging.info(f"Scanned {n_plugins} LV2 plugins in {len(new_scan_cache)} bundles => queried {n_queried}")
+
     except Exception as e:
         logging.error(e)
 
@@ -481,6 +521,54 @@ def generate_engines_config_file(refresh=True, reset_rankings=None):
     logging.debug('Generating engine config file took {}s'.format(dt))
 
 
+def get_bundle_mtime(bundle_path):
+    """Get modification time of a LV2 bundle
+
+    bundle_path : Path of bundle directory
+    returns : Latest mtime of bundle directory and its turtle files (manifest, plugin data) or None on error
+    """
+
+    try:
+        # Directory mtime changes when files are added or removed
+        mtime = os.stat(bundle_path).st_mtime
+        with os.scandir(bundle_path) as entries:
+            for entry in entries:
+                if entry.name.endswith(".ttl"):
+                    mtime = max(mtime, entry.stat().st_mtime)
+        return mtime
+    except Exception as e:
+        logging.warning(f"Can't get mtime of LV2 bundle '{bundle_path}' => {e}")
+        return None
+
+
+def load_lv2_scan_cache():
+    """Load LV2 scan cache
+
+    returns : Map of bundle info (mtime & map of plugin info indexed by URI), indexed by bundle path
+    """
+
+    try:
+        with open(LV2_SCAN_CACHE_FILE) as f:
+            return json.load(f)
+    except Exception as e:
+        logging.info(f"Can't load LV2 scan cache => {e}")
+        return {}
+
+
+def save_lv2_scan_cache(scan_cache):
+    """Save LV2 scan cache
+
+    scan_cache : Map of bundle info, indexed by bundle path
+    """
+
+    try:
+        os.makedirs(os.path.dirname(LV2_SCAN_CACHE_FILE), exist_ok=True)
+        with open(LV2_SCAN_CACHE_FILE, 'w') as f:
+            json.dump(scan_cache, f)
+    except Exception as e:
+        logging.error(f"Saving LV2 scan cache failed: {e}")
+
+
 def get_engines_by_type():
     global engines_by_type
     engines_by_type = {}
@@ -498,6 +586,21 @@ def get_engines_by_type():
 # ------------------------------------------------------------------------------
 
 
+def get_plugin_info(plugin):
+    """Query LV2 plugin info used in engine config, loading plugin data
+
+    plugin : Lilv plugin object
+    returns : Dictionary with plugin name, engine type, engine category & UI type
+    """
+
+    return {
+        'NAME': str(plugin.get_name()),
+        'TYPE': get_plugin_type(plugin).value,
+        'CAT': get_plugin_cat(plugin),
+        'UI': is_plugin_ui(plugin)
+    }
+
+
 def is_plugin_ui(plugin):
     for uri in plugin.get_data_uris():
         try:
@@ -596,11 +699,12 @@ def generate_all_presets_cache(refresh=True):
 
 
 def generate_plugin_presets_cache(plugin_url, refresh=True):
-    if refresh:
-        init_lilv()
+    with world_lock:
+        if refresh:
+            init_lilv()
 
-    wplugins = world.get_all_plugins()
-    return _generate_plugin_presets_cache(wplugins[plugin_url])
+        wplugins = world.get_all_plugins()
+        return _generate_plugin_presets_cache(wplugins[plugin_url])
 
 
 def _get_plugin_preset_cache_fpath(plugin_name):
@@ -749,112 +853,113 @@ def sanitize_fname(s):
 
 
 def get_plugin_ports(plugin_url):
-    wplugins = world.get_all_plugins()
-    plugin = wplugins[plugin_url]
-
-    ports_info = {}
-    for i in range(plugin.get_num_ports()):
-        port = plugin.get_port_by_index(i)
-        if port.is_a(lilv.LILV_URI_INPUT_PORT) and port.is_a(lilv.LILV_URI_CONTROL_PORT):
-            port_name = str(port.get_name())
-            port_symbol = str(port.get_symbol())
-
-            is_toggled = port.has_property(world.ns.lv2.toggled)
-            is_integer = port.has_property(world.ns.lv2.integer)
-            is_enumeration = port.has_property(world.ns.lv2.enumeration)
-            is_logarithmic = port.has_property(world.ns.portprops.logarithmic)
-            envelope = None
-            for env_type in ["delay", "attack", "hold", "decay", "sustain", "fade", "release"]:
-                if str(port.get("http://lv2plug.in/ns/lv2core#designation")) == f"http://lv2plug.in/ns/ext/parameters#{env_type}":
-                    envelope = env_type
-            not_on_gui = port.has_property(world.ns.portprops.notOnGUI)
-            display_priority = port.get(world.ns.lv2.displayPriority)
-            if display_priority is None:
-                display_priority = 0
-            else:
-                display_priority = int(display_priority)
-
-            # logging.debug("PORT {} properties =>".format(port.get_symbol()))
-            # for node in port.get_properties():
-            # logging.debug("    => {}".format(get_node_value(node)))
-
-            pgroup_index = None
-            pgroup_name = None
-            pgroup_symbol = None
-            pgroup = port.get(world.ns.portgroups.group)
-            if pgroup is not None:
-                # pgroup_key = str(pgroup).split("#")[-1]
-                pgroup_index = world.get(pgroup, world.ns.lv2.index, None)
-                if pgroup_index is not None:
-                    pgroup_index = int(pgroup_index)
-                    # logging.warning("Port group <{}> has no index.".format(pgroup_key))
-                pgroup_name = world.get(pgroup, world.ns.lv2.name, None)
-                if pgroup_name is None:
-                    pgroup_name = world.get(pgroup, world.ns.rdfs.label, None)
-                if pgroup_name is not None:
-                    pgroup_name = str(pgroup_name)
-                    # logging.warning("Port group <{}> has no name.".format(pgroup_key))
-                pgroup_symbol = world.get(pgroup, world.ns.lv2.symbol, None)
-                if pgroup_symbol is not None:
-                    pgroup_symbol = str(pgroup_symbol)
-                    # logging.warning("Port group <{}> has no symbol.".format(pgroup_key))
-            # else:
-                # logging.debug("Port <{}> has no group.".format(port_symbol))
-
-            sp = []
-            for p in port.get_scale_points():
-                sp.append({
-                    'label': str(p.get_label()),
-                    'value': get_node_value(p.get_value())
-                })
-            sp = sorted(sp, key=lambda k: k['value'])
-
-            r = port.get_range()
-            try:
-                vmin = get_node_value(r[1])
-            except:
-                if sp:
-                    vmin = min(sp, key=lambda x: x['value'])
-                else:
-                    vmin = 0.0
-            try:
-                vmax = get_node_value(r[2])
-            except:
-                if sp:
-                    vmax = max(sp, key=lambda x: x['value'])
+    with world_lock:
+        wplugins = world.get_all_plugins()
+        plugin = wplugins[plugin_url]
+
+        ports_info = {}
+        for i in range(plugin.get_num_ports()):
+            port = plugin.get_port_by_index(i)
+            if port.is_a(lilv.LILV_URI_INPUT_PORT) and port.is_a(lilv.LILV_URI_CONTROL_PORT):
+                port_name = str(port.get_name())
+                port_symbol = str(port.get_symbol())
+
+                is_toggled = port.has_property(world.ns.lv2.toggled)
+                is_integer = port.has_property(world.ns.lv2.integer)
+                is_enumeration = port.has_property(world.ns.lv2.enumeration)
+                is_logarithmic = port.has_property(world.ns.portprops.logarithmic)
+                envelope = None
+                for env_type in ["delay", "attack", "hold", "decay", "sustain", "fade", "release"]:
+                    if str(port.get("http://lv2plug.in/ns/lv2core#designation")) == f"http://lv2plug.in/ns/ext/parameters#{env_type}":
+                        envelope = env_type
+                not_on_gui = port.has_property(world.ns.portprops.notOnGUI)
+                display_priority = port.get(world.ns.lv2.displayPriority)
+                if display_priority is None:
+                    display_priority = 0
                 else:
-                    vmax = 1.0
-            try:
-                vdef = get_node_value(r[0])
-            except:
-                vdef = vmin
-
-            info = {
-                'index': i,
-                'symbol': port_symbol,
-                'name': port_name,
-                'group_index': pgroup_index,
-                'group_name': pgroup_name,
-                'group_symbol': pgroup_symbol,
-                'value': vdef,
-                'range': {
-                    'default': vdef,
-                    'min': vmin,
-                    'max': vmax
-                },
-                'is_toggled': is_toggled,
-                'is_integer': is_integer,
-                'is_enumeration': is_enumeration,
-                'is_logarithmic': is_logarithmic,
-                'envelope': envelope,
-                'not_on_gui': not_on_gui,
-                'display_priority': display_priority,
-                'scale_points': sp
-            }
-            ports_info[i] = info
-            # logging.debug("PORT {} => {}".format(i, info))
+                    display_priority = int(display_priority)
+
+                # logging.debug("PORT {} properties =>".format(port.get_symbol()))
+                # for node in port.get_properties():
+                # logging.debug("    => {}".format(get_node_value(node)))
+
+                pgroup_index = None
+                pgroup_name = None
+                pgroup_symbol = None
+                pgroup = port.get(world.ns.portgroups.group)
+                if pgroup is not None:
+                    # pgroup_key = str(pgroup).split("#")[-1]
+                    pgroup_index = world.get(pgroup, world.ns.lv2.index, None)
+                    if pgroup_index is not None:
+                        pgroup_index = int(pgroup_index)
+                        # logging.warning("Port group <{}> has no index.".format(pgroup_key))
+                    pgroup_name = world.get(pgroup, world.ns.lv2.name, None)
+                    if pgroup_name is None:
+                        pgroup_name = world.get(pgroup, world.ns.rdfs.label, None)
+                    if pgroup_name is not None:
+                        pgroup_name = str(pgroup_name)
+                        # logging.warning("Port group <{}> has no name.".format(pgroup_key))
+                    pgroup_symbol = world.get(pgroup, world.ns.lv2.symbol, None)
+                    if pgroup_symbol is not None:
+                        pgroup_symbol = str(pgroup_symbol)
+                        # logging.warning("Port group <{}> has no symbol.".format(pgroup_key))
+                # else:
+                    # logging.debug("Port <{}> has no group.".format(port_symbol))
+
+                sp = []
+                for p in port.get_scale_points():
+                    sp.append({
+                        'label': str(p.get_label()),
+                        'value': get_node_value(p.get_value())
+                    })
+                sp = sorted(sp, key=lambda k: k['value'])
+
+                r = port.get_range()
+                try:
+                    vmin = get_node_value(r[1])
+                except:
+                    if sp:
+                        vmin = min(sp, key=lambda x: x['value'])
+                    else:
+                        vmin = 0.0
+                try:
+                    vmax = get_node_value(r[2])
+                except:
+                    if sp:
+                        vmax = max(sp, key=lambda x: x['value'])
+                    else:
+                        vmax = 1.0
+                try:
+                    vdef = get_node_value(r[0])
+                except:
+                    vdef = vmin
+
+                info = {
+                    'index': i,
+                    'symbol': port_symbol,
+                    'name': port_name,
+                    'group_index': pgroup_index,
+                    'group_name': pgroup_name,
+                    'group_symbol': pgroup_symbol,
+                    'value': vdef,
+                    'range': {
+                        'default': vdef,
+                        'min': vmin,
+                        'max': vmax
+                    },
+                    'is_toggled': is_toggled,
+                    'is_integer': is_integer,
+                    'is_enumeration': is_enumeration,
+                    'is_logarithmic': is_logarithmic,
+                    'envelope': envelope,
+                    'not_on_gui': not_on_gui,
+                    'display_priority': display_priority,
+                    'scale_points': sp
+                }
+                ports_info[i] = info
+                # logging.debug("PORT {} => {}".format(i, info))
 
-    return ports_info
+        return ports_info
 
 
 def get_node_value(node):
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+# ****************************************************************************
+# ZYNTHIAN PROJECT: Zynthian MIDI Profiler (zynthian_midi_profiler)
+#
+# Instrumentation of MIDI event dispatching
+#
+# Copyright (C) 2015-2024 Fernando Moyano <jofemodo@zynthian.org>
+#                         Brian Walton <riban@zynthian.org>
+#
+# ****************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+# ****************************************************************************
+
+import os
+import logging
+from time import monotonic
+from threading import Lock
+from datetime import datetime
+from json import JSONEncoder
+from collections import deque
+from contextlib import contextmanager
+
+# ----------------------------------------------------------------------------
+# Zynthian MIDI Profiler Class
+# ----------------------------------------------------------------------------
+
+# Upper limits of latency histogram buckets, in seconds. Last bucket has no limit.
+HISTOGRAM_LIMITS = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1)
+HISTOGRAM_LABELS = ("<0.1ms", "<0.2ms", "<0.5ms", "<1ms", "<2ms", "<5ms", "<10ms", "<20ms", "<50ms", "<100ms", ">=100ms")
+
+EVENT_TYPE_NAMES = {
+    0x8: "note off",
+    0x9: "note on",
+    0xA: "poly pressure",
+    0xB: "control change",
+    0xC: "program change",
+    0xD: "channel pressure",
+    0xE: "pitch bend",
+    0xF: "system"
+}
+
+
+class zynthian_midi_profiler:
+
+    def __init__(self, dump_fpath=None, slow_time=0.005, max_slow_events=50):
+        """ Create an instance of a MIDI profiler
+
+        Counts MIDI events per input device (zmip) and type and records latency histograms per handler,
+        from the zynmidi buffer read to handler completion. Handlers slower than slow_time are flagged.
+        Nothing is recorded unless enabled.
+
+        dump_fpath : Path of file where reports are dumped as JSON
+        slow_time : Min handler duration (seconds) flagged as slow
+        max_slow_events : Number of slow handler events kept
+        """
+
+        self.dump_fpath = dump_fpath
+        self.slow_time = slow_time
+        self.lock = Lock()
+        self.enabled = False
+        self.max_slow_events = max_slow_events
+        self.reset()
+
+    def enable(self, enabled=True):
+        """Enable/disable recording
+
+        enabled : True to enable, False to disable
+        """
+
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+        logging.info(f"MIDI profiler {'enabled' if enabled else 'disabled'}")
+
+    def reset(self):
+        """Discard recorded data"""
+
+        with self.lock:
+            self.ts0 = monotonic()
+            self.event_counts = {}  # Event count indexed by (zmip, event type)
+            self.latency = {}  # Latency histograms indexed by handler name
+            self.duration = {}  # (count, total time, max time) indexed by handler name
+            self.slow_events = deque(maxlen=self.max_slow_events)
+
+    # ----------------------------------------------------------------------------
+    # Recording
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def get_bucket(elapsed):
+        """Get histogram bucket index for a time
+
+        elapsed : Time in seconds
+        Returns : Bucket index
+        """
+
+        for i, limit in enumerate(HISTOGRAM_LIMITS):
+            if elapsed < limit:
+                return i
+        return len(HISTOGRAM_LIMITS)
+
+    def add_event(self, zmip, status, handler, read_ts, handler_ts):
+        """Record a dispatched MIDI event
+
+        zmip : Index of MIDI input device
+        status : MIDI status byte
+        handler : Name of handler that processed the event
+        read_ts : Monotonic time when zynmidi buffer was read
+        handler_ts : Monotonic time when handler was called
+        """
+
+        now = monotonic()
+        key = (zmip, status >> 4)
+        with self.lock:
+            self.event_counts[key] = self.event_counts.get(key, 0) + 1
+        self.add_time(handler, now - handler_ts, now - read_ts, zmip)
+
+    def add_time(self, handler, duration, latency=None, zmip=None):
+        """Record handler duration and latency
+
+        handler : Handler name
+        duration : Time spent in handler (seconds)
+        latency : Time from buffer read to handler completion (seconds) or None
+        zmip : Index of MIDI input device (optional)
+        """
+
+        with self.lock:
+            try:
+                count, total, max_time = self.duration[handler]
+                self.duration[handler] = (count + 1, total + duration, max(max_time, duration))
+            except KeyError:
+                self.duration[handler] = (1, duration, duration)
+            if latency is not None:
+                histogram = self.latency.get(handler)
+                if histogram is None:
+                    histogram = self.latency[handler] = [0] * len(HISTOGRAM_LABELS)
+                histogram[self.get_bucket(latency)] += 1
+            if duration >= self.slow_time:
+                self.slow_events.append({
+                    "date": datetime.now().isoformat(timespec="milliseconds"),
+                    "handler": handler,
+                    "zmip": zmip,
+                    "duration": duration
+                })
+        if duration >= self.slow_time:
+            logging.debug(f"Slow MIDI handler '{handler}' => {duration * 1000:.1f}ms")
+
+    @contextmanager
+    def handler(self, name, zmip=None):
+        """Context manager that times a handler (or a slow part of it)
+
+        name : Handler name, e.g. "ctrldev:<driver>", "load_zs3"
+        zmip : Index of MIDI input device (optional)
+        """
+
+        if not self.enabled:
+            yield
+            return
+        ts = monotonic()
+        try:
+            yield
+        finally:
+            self.add_time(name, monotonic() - ts, None, zmip)
+
+    # ----------------------------------------------------------------------------
+    # Reporting
+    # ----------------------------------------------------------------------------
+
+    def get_report(self):
+        """Get report of recorded data
+
+        Returns : Report dictionary
+        """
+
+        with self.lock:
+            elapsed = max(monotonic() - self.ts0, 0.001)
+            devices = {}
+            for (zmip, evtype), count in sorted(self.event_counts.items()):
+                device = devices.setdefault(str(zmip), {"events": 0, "rate": 0.0, "types": {}})
+                device["events"] += count
+                device["rate"] = device["events"] / elapsed
+                device["types"][EVENT_TYPE_NAMES.get(evtype, hex(evtype))] = count
+            handlers = {}
+            for name, (count, total, max_time) in self.duration.items():
+                handlers[name] = {
+                    "count": count,
+                    "mean": total / count,
+                    "max": max_time
+                }
+                if name in self.latency:
+                    handlers[name]["latency"] = dict(zip(HISTOGRAM_LABELS, self.latency[name]))
+            return {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "elapsed": elapsed,
+                "devices": devices,
+                "handlers": handlers,
+                "slow_events": list(self.slow_events)
+            }
+
+    @staticmethod
+    def format_report(report, max_slow_events=5):
+        """Format a report as human readable text
+
+        report : Report dictionary
+        max_slow_events : Max number of slow events to list, newest first
+        Returns : Report text
+        """
+
+        lines = [f"MIDI profile of {report['elapsed']:.1f}s"]
+        if not report["devices"]:
+            lines.append("  No MIDI events")
+        for zmip, device in report["devices"].items():
+            types = ", ".join(f"{evtype} {count}" for evtype, count in device["types"].items())
+            lines.append(f"  zmip {zmip}: {device['events']} events ({device['rate']:.1f}/s) => {types}")
+        for name, stats in sorted(report["handlers"].items(), key=lambda item: item[1]["max"], reverse=True):
+            lines.append(f"  {name}: {stats['count']} calls, mean {stats['mean'] * 1000:.2f}ms, max {stats['max'] * 1000:.2f}ms")
+            if "latency" in stats:
+                histogram = ", ".join(f"{label} {count}" for label, count in stats["latency"].items() if count)
+                lines.append(f"    latency => {histogram}")
+        slow_events = report["slow_events"][-max_slow_events:]
+        if slow_events:
+            lines.append("  Slow handlers:")
+            for event in reversed(slow_events):
+                lines.append(f"    {event['date']} {event['handler']} (zmip {event['zmip']}): {event['duration'] * 1000:.1f}ms")
+        return "\n".join(lines)
+
+    def dump(self, report=None):
+        """Write report to dump file as JSON
+
+        report : Report dictionary (Default: get current report)
+        Returns : Path of dump file or None on failure
+        """
+
+        if not self.dump_fpath:
+            return None
+        if report is None:
+            report = self.get_report()
+        try:
+            os.makedirs(os.path.dirname(self.dump_fpath), exist_ok=True)
+            with open(self.dump_fpath, "w") as fh:
+                fh.write(JSONEncoder(indent=2).encode(report))
+            return self.dump_fpath
+        except Exception as e:
+            logging.warning(f"Can't write MIDI profile dump => {e}")
+            return None
+
+# ---------------------------------------------------------------------------
+
+
+global zynmidiprof
+zynmidiprof = zynthian_midi_profiler(os.environ.get(
+    'ZYNTHIAN_MY_DATA_DIR', "/zynthian/zynthian-my-data") + "/capture/midi_profile.json")
+
+# ---------------------------------------------------------------------------
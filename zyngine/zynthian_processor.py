@@ -30,6 +30,8 @@ import traceback
 
 # Zynthian specific modules
 from zyncoder.zyncore import lib_zyncore
+from zyngine.zynthian_load_profiler import zynloadprof
+from zyngine.zynthian_state_journal import zynjournal
 
 
 class zynthian_processor:
@@ -237,6 +239,8 @@ class zynthian_processor:
             self.bank_index = bank_index
             self.bank_name = bank_name
             self.bank_info = copy.deepcopy(self.bank_list[bank_index])
+            if zynjournal.enabled:
+                zynjournal.record_preset(self)
 
             if set_engine and set_engine_needed:
                 return self.engine.set_bank(self, self.bank_info)
@@ -254,6 +258,8 @@ class zynthian_processor:
                     break
         except:
             pass
+        if zynjournal.enabled:
+            zynjournal.record_preset(self)
         if set_engine:
             return self.engine.set_bank(self, self.bank_info)
 
@@ -373,6 +379,8 @@ class zynthian_processor:
         self.preset_name = preset_name
         self.preset_info = preset_info
         self.preset_bank_index = self.bank_index
+        if zynjournal.enabled:
+            zynjournal.record_preset(self)
 
         # Clean preload info
         self.preload_index = None
@@ -717,30 +725,56 @@ class zynthian_processor:
         state : Processor state
         """
 
-        try:
-            self.get_bank_list()
-        except:
-            pass
-        if "bank_info" in state and state["bank_info"]:
+        self.set_bank_preset_state(state)
+        # Set controller values
+        if "controllers" in state:
+            self.set_controllers_state(state["controllers"])
+
+    def set_bank_preset_state(self, state):
+        """Set bank & preset from state model dictionary
+
+        state : Processor state
+        """
+
+        with zynloadprof.phase(zynloadprof.PH_BANK_SCAN, self.get_profile_name()):
+            try:
+                self.get_bank_list()
+            except:
+                pass
+            if "bank_info" in state and state["bank_info"]:
+                try:
+                    self.set_bank_by_info(state["bank_info"])
+                except:
+                    logging.exception(traceback.format_exc())
+        with zynloadprof.phase(zynloadprof.PH_PRESET_LOAD, self.get_profile_name()):
             try:
-                self.set_bank_by_info(state["bank_info"])
+                self.load_preset_list()
             except:
-                logging.exception(traceback.format_exc())
+                pass
+
+            if "preset_info" in state:
+                self.set_preset_by_info(state["preset_info"])
+
+    def set_preset_by_info(self, preset_info):
+        """Set processor's engine preset from preset info stored in a state model
+
+        preset_info : Preset info (list) or preset index for legacy snapshots
+        """
+
         try:
-            self.load_preset_list()
+            self.set_preset_by_id(preset_info[0], force_set_engine=False)
         except:
-            pass
+            # Legacy snapshots without preset_info
+            self.set_preset(preset_info, force_set_engine=False)
 
-        if "preset_info" in state:
-            try:
-                self.set_preset_by_id(
-                    state["preset_info"][0], force_set_engine=False)
-            except:
-                # Legacy snapshots without preset_info
-                self.set_preset(state["preset_info"], force_set_engine=False)
-        # Set controller values
-        if "controllers" in state:
-            for symbol, ctrl_state in state["controllers"].items():
+    def set_controllers_state(self, controllers_state):
+        """Set controller values from state model
+
+        controllers_state : Dictionary of controller states indexed by symbol
+        """
+
+        with zynloadprof.phase(zynloadprof.PH_CONTROLLER_RESTORE, self.get_profile_name()):
+            for symbol, ctrl_state in controllers_state.items():
                 try:
                     zctrl = self.controllers_dict[symbol]
                     if "value" in ctrl_state:
@@ -751,6 +785,80 @@ class zynthian_processor:
                     logging.warning("Invalid controller for processor {}: {}".format(
                         self.get_basepath(), e))
 
+    def get_state_diff(self, state):
+        """Get the parts of a state model that differ from current processor state
+
+        state : Processor state
+        Returns : Dictionary with bank, preset & controller entries that need restoring
+        """
+
+        diff = {}
+        if "bank_info" in state and state["bank_info"] and state["bank_info"] != self.bank_info:
+            diff["bank_info"] = state["bank_info"]
+        if "preset_info" in state:
+            try:
+                if "bank_info" in diff or self.preload_info or state["preset_info"][0] != self.preset_info[0]:
+                    diff["preset_info"] = state["preset_info"]
+            except:
+                diff["preset_info"] = state["preset_info"]
+        if "controllers" in state:
+            controllers_diff = {}
+            for symbol, ctrl_state in state["controllers"].items():
+                try:
+                    zctrl = self.controllers_dict[symbol]
+                except KeyError:
+                    continue
+                if "value" in ctrl_state and ctrl_state["value"] != zctrl.value:
+                    controllers_diff[symbol] = ctrl_state
+                elif "midi_cc_momentary_switch" in ctrl_state and ctrl_state["midi_cc_momentary_switch"] != zctrl.midi_cc_momentary_switch:
+                    controllers_diff[symbol] = ctrl_state
+            if controllers_diff:
+                diff["controllers"] = controllers_diff
+        return diff
+
+    def set_bank_preset_state_diff(self, state):
+        """Set bank & preset from state model only if they differ from current ones
+
+        Bank & preset lists are only rescanned if the bank changes.
+        state : Processor state
+        Returns : True if bank or preset was changed
+        """
+
+        diff = {}
+        for key in ("bank_info", "preset_info"):
+            if key in state:
+                diff[key] = state[key]
+        diff = self.get_state_diff(diff)
+        if "bank_info" in diff:
+            self.set_bank_preset_state(state)
+            return True
+        if "preset_info" in diff:
+            with zynloadprof.phase(zynloadprof.PH_PRESET_LOAD, self.get_profile_name()):
+                if not self.preset_list:
+                    try:
+                        self.load_preset_list()
+                    except:
+                        pass
+                self.set_preset_by_info(diff["preset_info"])
+            return True
+        return False
+
+    def set_state_diff(self, state):
+        """Configure processor from state model, restoring only what differs from current state
+
+        state : Processor state
+        Returns : True if processor state was changed
+        """
+
+        changed = self.set_bank_preset_state_diff(state)
+        # Diff controllers after preset change, as loading a preset may change their values
+        if "controllers" in state:
+            diff = self.get_state_diff({"controllers": state["controllers"]})
+            if diff:
+                self.set_controllers_state(diff["controllers"])
+                changed = True
+        return changed
+
     def restore_state_legacy(self, state):
         """Restore legacy states from state
 
@@ -780,6 +888,11 @@ class zynthian_processor:
             path = self.bank_name
         return path
 
+    def get_profile_name(self):
+        """Get name used to attribute load profile timings to this processor"""
+
+        return f"{self.id}:{self.eng_code}"
+
     def get_basepath(self):
         """Get base path string"""
         # TODO: UI
@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+# ****************************************************************************
+# ZYNTHIAN PROJECT: Zynthian Scheduler (zynthian_scheduler)
+#
+# Hierarchical timer wheel running periodic and one-shot tasks
+#
+# Copyright (C) 2015-2024 Fernando Moyano <jofemodo@zynthian.org>
+#                         Brian Walton <riban@zynthian.org>
+#
+# ****************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+# ****************************************************************************
+
+import logging
+from time import monotonic
+from threading import Thread, Condition, current_thread
+
+# ----------------------------------------------------------------------------
+# Zynthian Scheduler Classes
+# ----------------------------------------------------------------------------
+
+TICK = 0.01  # Wheel resolution in seconds
+ROOT_BITS = 8  # Slots in first level wheel = 256 ticks (2.56s)
+LEVEL_BITS = 6  # Slots in upper level wheels = 64
+NUM_LEVELS = 4  # Wheels => 2.56s, 164s, 2.9h, 7.8 days
+ROOT_SIZE = 1 << ROOT_BITS
+ROOT_MASK = ROOT_SIZE - 1
+LEVEL_SIZE = 1 << LEVEL_BITS
+LEVEL_MASK = LEVEL_SIZE - 1
+MAX_TICKS = 1 << (ROOT_BITS + (NUM_LEVELS - 1) * LEVEL_BITS)
+
+
+class zynthian_scheduler_task:
+
+    def __init__(self, callback, args, kwargs, period, name, stretch, blocking):
+        """ Create a scheduler task. Use zynthian_scheduler.add_periodic/add_oneshot instead.
+
+        callback : Function to call
+        args : Positional arguments passed to callback
+        kwargs : Keyword arguments passed to callback
+        period : Time between calls in seconds or None for one-shot tasks
+        name : Task name, used in log messages
+        stretch : True to stretch period in power save mode
+        blocking : True to run callback in its own thread
+        """
+
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs
+        self.period = period
+        self.name = name
+        self.stretch = stretch
+        self.blocking = blocking
+        self.expiry = 0  # Tick when task is due
+        self.slot = None  # Wheel slot holding task or None if not scheduled
+        self.thread = None  # Thread running a blocking callback
+
+    def is_scheduled(self):
+        return self.slot is not None
+
+
+class zynthian_scheduler:
+
+    def __init__(self, power_save_stretch=4, slow_time=0.1):
+        """ Create an instance of a scheduler
+
+        Subsystems register periodic and one-shot tasks, all run from a single thread.
+        Tasks are kept in a hierarchical timer wheel: a root wheel of 10ms ticks and upper
+        wheels of coarser granularity, cascaded down as time advances, so adding, cancelling
+        and running tasks doesn't depend on the number of tasks. Periodic tasks are aligned
+        to multiples of their period, so tasks with related periods fire in the same wakeup,
+        and the thread sleeps until the next due slot instead of ticking.
+
+        Callbacks must be short. Callbacks that may block (file or network I/O, subprocesses)
+        must be added with blocking=True, so they run in their own thread.
+
+        power_save_stretch : Factor applied to period of stretchable tasks in power save mode
+        slow_time : Min callback duration (seconds) logged as slow
+        """
+
+        self.power_save_stretch = power_save_stretch
+        self.slow_time = slow_time
+        self.power_save = False
+        self.cond = Condition()
+        self.wheels = [[{} for i in range(ROOT_SIZE)]]
+        for i in range(1, NUM_LEVELS):
+            self.wheels.append([{} for j in range(LEVEL_SIZE)])
+        self.ts0 = monotonic()
+        self.tick = 0  # Next tick to process
+        self.wakeup = None  # Tick the thread is sleeping until
+        self.exit_flag = False
+        self.thread = None
+
+    def start(self):
+        """Start scheduler thread"""
+
+        with self.cond:
+            if self.thread and self.thread.is_alive():
+                return
+            self.exit_flag = False
+            self.thread = Thread(target=self.thread_task, args=())
+            self.thread.name = "Scheduler"
+            self.thread.daemon = True  # thread dies with the program
+            self.thread.start()
+
+    def stop(self):
+        """Stop scheduler thread. Scheduled tasks are kept."""
+
+        with self.cond:
+            self.exit_flag = True
+            self.cond.notify_all()
+        if self.thread and self.thread.is_alive() and self.thread != current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    # ----------------------------------------------------------------------------
+    # Task management
+    # ----------------------------------------------------------------------------
+
+    def add_periodic(self, period, callback, *args, name=None, delay=None, stretch=True, blocking=False, **kwargs):
+        """Add a task called every "period" seconds
+
+        period : Time between calls in seconds
+        callback : Function to call
+        args : Positional arguments passed to callback
+        name : Task name (default: callback name)
+        delay : Time before first call in seconds (default: next multiple of period)
+        stretch : True to stretch period in power save mode
+        blocking : True to run callback in its own thread
+        kwargs : Keyword arguments passed to callback
+        Returns : Task object
+        """
+
+        task = zynthian_scheduler_task(callback, args, kwargs, period,
+                                       name or callback.__name__, stretch, blocking)
+        with self.cond:
+            if delay is None:
+                task.expiry = self.get_aligned_expiry(task, self.get_tick())
+            else:
+                task.expiry = self.get_tick() + self.get_ticks(delay)
+            self.insert(task)
+        self.start()
+        return task
+
+    def add_oneshot(self, delay, callback, *args, name=None, blocking=False, **kwargs):
+        """Add a task called once after "delay" seconds
+
+        delay : Time before call in seconds
+        callback : Function to call
+        args : Positional arguments passed to callback
+        name : Task name (default: callback name)
+        blocking : True to run callback in its own thread
+        kwargs : Keyword arguments passed to callback
+        Returns : Task object
+        """
+
+        task = zynthian_scheduler_task(callback, args, kwargs, None,
+                                       name or callback.__name__, False, blocking)
+        with self.cond:
+            task.expiry = self.get_tick() + self.get_ticks(delay)
+            self.insert(task)
+        self.start()
+        return task
+
+    def cancel(self, task):
+        """Remove a task from scheduler
+
+        task : Task object. None is ignored.
+        """
+
+        if task is None:
+            return
+        with self.cond:
+            self.unlink(task)
+            task.period = None
+
+    def reschedule(self, task, delay=None, period=None):
+        """Change when a task is next called and/or its period
+
+        task : Task object
+        delay : Time before next call in seconds (default: keep, or realign if period changes)
+        period : New period in seconds (default: keep)
+        """
+
+        with self.cond:
+            if period is not None:
+                task.period = period
+            if delay is not None:
+                expiry = self.get_tick() + self.get_ticks(delay)
+            elif period is not None:
+                expiry = self.get_aligned_expiry(task, self.get_tick())
+            else:
+                return
+            self.unlink(task)
+            task.expiry = expiry
+            self.insert(task)
+
+    def set_power_save(self, enabled=True):
+        """Enable/disable power save mode, stretching period of stretchable tasks
+
+        enabled : True to enable, False to disable
+        """
+
+        with self.cond:
+            if self.power_save == enabled:
+                return
+            self.power_save = enabled
+            # Realign stretchable tasks to the new period
+            now = self.get_tick()
+            for task in self.get_tasks():
+                if task.stretch and task.period:
+                    self.unlink(task)
+                    task.expiry = self.get_aligned_expiry(task, now)
+                    self.insert(task)
+
+    def get_tasks(self):
+        """Get list of scheduled tasks"""
+
+        with self.cond:
+            return [task for wheel in self.wheels for slot in wheel for task in slot]
+
+    # ----------------------------------------------------------------------------
+    # Timer wheel
+    # ----------------------------------------------------------------------------
+
+    def get_tick(self):
+        return int((monotonic() - self.ts0) / TICK)
+
+    @staticmethod
+    def get_ticks(seconds):
+        return max(1, int(round(seconds / TICK)))
+
+    def get_period_ticks(self, task):
+        period = task.period
+        if task.stretch and self.power_save:
+            period *= self.power_save_stretch
+        return self.get_ticks(period)
+
+    def get_aligned_expiry(self, task, now):
+        period = self.get_period_ticks(task)
+        return (now // period + 1) * period
+
+    def insert(self, task):
+        """Insert task into wheel slot for its expiry. Must be called with lock held."""
+
+        delta = task.expiry - self.tick
+        if delta < ROOT_SIZE:
+            if delta < 0:
+                task.expiry = self.tick
+            slot = self.wheels[0][task.expiry & ROOT_MASK]
+        else:
+            if delta >= MAX_TICKS:
+                task.expiry = self.tick + MAX_TICKS - 1
+            level = 1
+            shift = ROOT_BITS
+            while delta >= 1 << (shift + LEVEL_BITS) and level < NUM_LEVELS - 1:
+                level += 1
+                shift += LEVEL_BITS
+            slot = self.wheels[level][(task.expiry >> shift) & LEVEL_MASK]
+        slot[task] = None
+        task.slot = slot
+        # Wake up thread if task is due before its current wakeup
+        if self.wakeup is not None and task.expiry < self.wakeup:
+            self.cond.notify_all()
+
+    def unlink(self, task):
+        if task.slot is not None:
+            task.slot.pop(task, None)
+            task.slot = None
+
+    def cascade(self):
+        """Move tasks from upper wheels down as root wheel wraps. Must be called with lock held."""
+
+        shift = ROOT_BITS
+        for level in range(1, NUM_LEVELS):
+            index = (self.tick >> shift) & LEVEL_MASK
+            slot = self.wheels[level][index]
+            tasks = list(slot)
+            slot.clear()
+            for task in tasks:
+                task.slot = None
+                self.insert(task)
+            # Only cascade next level when this one wraps too
+            if index:
+                break
+            shift += LEVEL_BITS
+
+    def get_next_wakeup(self):
+        """Get tick of next non-empty root slot, or next root wheel wrap. Must be called with lock held."""
+
+        # Upper wheels must be cascaded at root wheel wrap before scanning next rotation
+        if self.tick & ROOT_MASK == 0:
+            return self.tick
+        for tick in range(self.tick, (self.tick | ROOT_MASK) + 1):
+            if self.wheels[0][tick & ROOT_MASK]:
+                return tick
+        return (self.tick | ROOT_MASK) + 1
+
+    def pop_due_tasks(self, now):
+        """Advance wheel up to tick "now", returning due tasks. Must be called with lock held."""
+
+        due = []
+        while self.tick <= now:
+            if self.tick & ROOT_MASK == 0:
+                self.cascade()
+            slot = self.wheels[0][self.tick & ROOT_MASK]
+            if slot:
+                for task in slot:
+                    task.slot = None
+                due += slot
+                slot.clear()
+            self.tick += 1
+            # Skip empty slots up to the next cascade
+            if self.tick <= now and not due:
+                next_tick = min(self.get_next_wakeup(), now + 1)
+                if next_tick > self.tick:
+                    self.tick = next_tick
+        return due
+
+    def thread_task(self):
+        while True:
+            with self.cond:
+                while not self.exit_flag:
+                    now = self.get_tick()
+                    self.wakeup = self.get_next_wakeup()
+                    if self.wakeup <= now:
+                        break
+                    self.cond.wait((self.wakeup - now) * TICK)
+                self.wakeup = None
+                if self.exit_flag:
+                    return
+                due = self.pop_due_tasks(self.get_tick())
+            for task in due:
+                self.run_task(task)
+
+    def run_task(self, task):
+        if task.blocking:
+            # Don't overlap runs of the same task
+            if task.thread and task.thread.is_alive():
+                self.requeue(task)
+                return
+            task.thread = Thread(target=self.call_task, args=(task,))
+            task.thread.name = f"Scheduler {task.name}"
+            task.thread.daemon = True  # thread dies with the program
+            task.thread.start()
+        else:
+            self.call_task(task)
+        self.requeue(task)
+
+    def requeue(self, task):
+        with self.cond:
+            if task.period and task.slot is None:
+                task.expiry += self.get_period_ticks(task)
+                now = self.get_tick()
+                if task.expiry <= now:
+                    # Overrun => skip missed calls
+                    task.expiry = self.get_aligned_expiry(task, now)
+                self.insert(task)
+
+    def call_task(self, task):
+        ts = monotonic()
+        try:
+            task.callback(*task.args, **task.kwargs)
+        except Exception as e:
+            logging.exception(f"Scheduled task '{task.name}' failed => {e}")
+        duration = monotonic() - ts
+        if duration > self.slow_time and not task.blocking:
+            logging.warning(f"Slow scheduled task '{task.name}' => {duration * 1000:.1f}ms")
+
+# ---------------------------------------------------------------------------
+
+
+global zynsched
+zynsched = zynthian_scheduler()
+
+# ---------------------------------------------------------------------------
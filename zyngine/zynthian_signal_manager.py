@@ -24,8 +24,10 @@
 
 import logging
 import traceback
-from queue import SimpleQueue
-from threading import Thread
+from math import ceil
+from time import monotonic
+from collections import deque
+from threading import Thread, Condition, Lock
 
 # ----------------------------------------------------------------------------
 # Zynthian Signal Manager Class
@@ -63,10 +65,31 @@ class zynthian_signal_manager:
     last_signal = 13
     last_subsignal = 10
 
-    def __init__(self):
+    # Priority classes of queued callbacks. Lower value is processed first.
+    PRIO_HIGH = 0  # Transport & MIDI
+    PRIO_NORMAL = 1
+    PRIO_LOW = 2  # GUI refresh
+    NUM_PRIOS = 3
+
+    # Default priority of queued callbacks by signal
+    signal_prio = {
+        S_AUDIO_RECORDER: PRIO_HIGH,
+        S_AUDIO_PLAYER: PRIO_HIGH,
+        S_SMF_RECORDER: PRIO_HIGH,
+        S_STEPSEQ: PRIO_HIGH,
+        S_MIDI: PRIO_HIGH,
+        S_GUI: PRIO_LOW
+    }
+
+    def __init__(self, max_queue_size=2048):
         """ Create an instance of a signal manager
 
         Manages signaling. Clients register callbacks that are triggered when a given signal is received.
+        Queued callbacks are processed by a pool of worker threads, by priority class. The queue is bounded:
+        when full, the oldest droppable item (coalescing call or GUI refresh) with the lowest priority is dropped.
+        Other calls are never dropped, they are queued beyond the bound and logged.
+
+        max_queue_size : Max number of pending queued callbacks
         """
 
         self.exit_flag = False
@@ -76,12 +99,28 @@ class zynthian_signal_manager:
         self.signal_register = None
         self.reset_register()
 
-        self.queue = SimpleQueue()
-        self.queue_thread = None
+        self.max_queue_size = max_queue_size
+        self.queue_cond = Condition()
+        self.queues = [deque() for i in range(self.NUM_PRIOS)]  # Pending items [signal, subsignal, callback, kwargs, key], by priority
+        self.coalesced = {}  # Pending coalescing items, indexed by key
+        self.running = set()  # Subscribers (bound object or function) whose callbacks are being run by workers
+        self.dropped = 0  # Number of items dropped because the queue was full
+        self.overflowed = 0  # Number of items queued beyond max_queue_size because they can't be dropped
+        self.dropped_log_ts = 0
+        self.queue_threads = []
         self.start_queue_thread()
 
+        # Callback profiling
+        self.profile = False
+        self.callback_budget = 0.05  # Callbacks taking longer (seconds) are logged
+        self.callback_stats = {}  # [count, total time, max time, last times] indexed by (signal, subsignal, qualname)
+        self.peak_queue_size = 0
+        self.stats_lock = Lock()
+
     def stop(self):
         self.exit_flag = True
+        with self.queue_cond:
+            self.queue_cond.notify_all()
 
     # ----------------------------------------------------------------------------
     # Signal register handling
@@ -95,15 +134,27 @@ class zynthian_signal_manager:
             for j in range(self.last_subsignal):
                 self.signal_register[i].append([])
 
-    def register(self, signal, subsignal, callback, queued=False):
+    def register(self, signal, subsignal, callback, queued=False, priority=None, coalesce=None):
+        """Register a callback for a signal
+
+        signal : Signal number
+        subsignal : Subsignal number
+        callback : Callback function, called with signal's keyword arguments
+        queued : True to always call from signal queue
+        priority : Priority class of queued calls (Default: signal's priority class)
+        coalesce : Tuple of keyword argument names. A queued call replaces any pending call to the same callback
+            with the same values for these arguments, so only the latest is processed. () coalesces all pending calls.
+            None disables coalescing.
+        """
+
         if 0 <= signal <= self.last_signal and 0 <= subsignal <= self.last_subsignal:
             # logging.debug(f"Registering callback '{callback.__name__}()' for signal({signal},{subsignal})")
-            self.signal_register[signal][subsignal].append((callback, queued))
+            if priority is None:
+                priority = self.signal_prio.get(signal, self.PRIO_NORMAL)
+            self.signal_register[signal][subsignal].append((callback, queued, priority, coalesce))
 
-    def register_queued(self, signal, subsignal, callback):
-        if 0 <= signal <= self.last_signal and 0 <= subsignal <= self.last_subsignal:
-            # logging.debug(f"Registering queued callback '{callback.__name__}()' for signal({signal},{subsignal})")
-            self.signal_register[signal][subsignal].append((callback, True))
+    def register_queued(self, signal, subsignal, callback, priority=None, coalesce=None):
+        self.register(signal, subsignal, callback, True, priority, coalesce)
 
     def unregister(self, signal, subsignal, callback):
         if 0 <= signal <= self.last_signal and 0 <= subsignal <= self.last_subsignal:
@@ -133,9 +184,12 @@ class zynthian_signal_manager:
             # logging.debug(f"Signal({signal},{subsignal}): {kwargs}")
             for rdata in self.signal_register[signal][subsignal]:
                 if force_queued == 1 or rdata[1]:
-                    self.queue.put_nowait(
-                        (signal, subsignal, rdata[0], kwargs))
+                    self.put_queued(signal, subsignal, rdata, kwargs)
                 else:
+                    # Read flag once, as profiling may be enabled while callback runs
+                    profile = self.profile
+                    if profile:
+                        ts = monotonic()
                     try:
                         # logging.debug(f"  => calling {rdata[0].__name__}(...)")
                         rdata[0](**kwargs)
@@ -143,6 +197,8 @@ class zynthian_signal_manager:
                         logging.error(
                             f"Callback '{rdata[0].__name__}(...)' for signal({signal},{subsignal}): {e}")
                         logging.exception(traceback.format_exc())
+                    if profile:
+                        self.add_callback_time(signal, subsignal, rdata[0], monotonic() - ts)
 
     def send(self, signal, subsignal, **kwargs):
         """ Send direct call signal
@@ -159,17 +215,129 @@ class zynthian_signal_manager:
     # ----------------------------------------------------------------------------
 
     def start_queue_thread(self):
-        self.queue_thread = Thread(target=self.queue_thread_task, args=())
-        self.queue_thread.name = "SIGNAL_QUEUE"
-        self.queue_thread.daemon = True  # thread dies with the program
-        self.queue_thread.start()
+        thread = Thread(target=self.queue_thread_task, args=())
+        thread.name = f"SIGNAL_QUEUE_{len(self.queue_threads)}" if self.queue_threads else "SIGNAL_QUEUE"
+        thread.daemon = True  # thread dies with the program
+        thread.start()
+        self.queue_threads.append(thread)
+
+    def set_num_workers(self, n):
+        """Set number of queue worker threads
+
+        Callbacks of the same subscriber (object whose methods are registered, or function) are never run
+        concurrently, so each subscriber still gets its signals in order. Workers can't be removed once started.
+        n : Number of worker threads
+        """
+
+        while len(self.queue_threads) < n:
+            self.start_queue_thread()
+
+    def get_queue_size(self):
+        """Get number of pending queued callbacks"""
+
+        return sum(len(q) for q in self.queues)
+
+    def put_queued(self, signal, subsignal, rdata, kwargs):
+        """Add a callback call to signal queue
+
+        signal : Signal number
+        subsignal : Subsignal number
+        rdata : Register data (callback, queued, priority, coalesce)
+        kwargs : Keyword arguments of the call
+        """
+
+        callback, queued, priority, coalesce = rdata
+        if coalesce is None:
+            key = None
+        else:
+            key = (signal, subsignal, callback, tuple(kwargs.get(arg) for arg in coalesce))
+        with self.queue_cond:
+            if key is not None:
+                item = self.coalesced.get(key)
+                if item is not None:
+                    # Replace arguments of pending call, keeping its position
+                    item[3] = kwargs
+                    return
+            if self.get_queue_size() >= self.max_queue_size and not self.drop_queued(priority):
+                if key is not None or priority == self.PRIO_LOW:
+                    self.dropped += 1
+                    self.log_dropped()
+                    return
+                # State notifications can't be lost => exceed queue bound
+                self.overflowed += 1
+                self.log_dropped()
+            item = [signal, subsignal, callback, kwargs, key]
+            self.queues[priority].append(item)
+            if key is not None:
+                self.coalesced[key] = item
+            if self.profile:
+                self.peak_queue_size = max(self.peak_queue_size, self.get_queue_size())
+            self.queue_cond.notify()
+
+    def drop_queued(self, priority):
+        """Drop oldest droppable pending call with lowest priority, not higher than a given priority
+
+        Only coalescing calls (that carry the latest state) and GUI refreshes (low priority) can be dropped.
+        priority : Priority class of the call that needs room in queue
+        Returns : True if a call was dropped
+        """
+
+        for prio in range(self.NUM_PRIOS - 1, priority - 1, -1):
+            q = self.queues[prio]
+            for i, item in enumerate(q):
+                if item[4] is not None or prio == self.PRIO_LOW:
+                    del q[i]
+                    if item[4] is not None:
+                        del self.coalesced[item[4]]
+                    self.dropped += 1
+                    self.log_dropped()
+                    return True
+        return False
+
+    def log_dropped(self):
+        now = monotonic()
+        if now - self.dropped_log_ts > 1:
+            self.dropped_log_ts = now
+            logging.warning(f"Signal queue is full! {self.dropped} queued callbacks dropped, {self.overflowed} queued beyond limit")
+
+    def get_queued(self):
+        """Wait for next pending call whose subscriber is not being run by another worker
+
+        Returns : Item [signal, subsignal, callback, kwargs, key] or None if exiting
+        """
+
+        with self.queue_cond:
+            while not self.exit_flag:
+                for q in self.queues:
+                    for i, item in enumerate(q):
+                        subscriber = self.get_subscriber(item[2])
+                        if subscriber not in self.running:
+                            del q[i]
+                            if item[4] is not None:
+                                del self.coalesced[item[4]]
+                            self.running.add(subscriber)
+                            return item
+                self.queue_cond.wait(1)
+        return None
+
+    @staticmethod
+    def get_subscriber(callback):
+        """Get subscriber of a callback, i.e. object of a bound method or the callback itself
+
+        callback : Callback function
+        """
+
+        return getattr(callback, "__self__", callback)
 
     def queue_thread_task(self):
         while not self.exit_flag:
-            try:
-                data = self.queue.get(True, 1)
-            except:
+            data = self.get_queued()
+            if data is None:
                 continue
+            # Read flag once, as profiling may be enabled while callback runs
+            profile = self.profile
+            if profile:
+                ts = monotonic()
             try:
                 # logging.debug(f"  => calling {data[2].__name__}(...)")
                 data[2](**data[3])
@@ -177,6 +345,105 @@ class zynthian_signal_manager:
                 logging.error(
                     f"Queued callback '{data[2].__name__}(...)' for signal({data[0]},{data[1]}): {e}")
                 logging.exception(traceback.format_exc())
+            if profile:
+                self.add_callback_time(data[0], data[1], data[2], monotonic() - ts)
+            with self.queue_cond:
+                self.running.discard(self.get_subscriber(data[2]))
+                if len(self.queue_threads) > 1:
+                    # Calls to this subscriber may be waiting for it
+                    self.queue_cond.notify_all()
+
+    # ----------------------------------------------------------------------------
+    # Callback profiling
+    # ----------------------------------------------------------------------------
+
+    def enable_profile(self, enabled=True, budget=None):
+        """Enable/disable callback profiling
+
+        Stats are reset when profiling is enabled.
+        enabled : True to enable, False to disable
+        budget : Callback time (seconds) that triggers a warning (Default: keep current)
+        """
+
+        if budget is not None:
+            self.callback_budget = budget
+        if enabled and not self.profile:
+            self.reset_profile()
+        self.profile = enabled
+
+    def reset_profile(self):
+        """Discard callback stats"""
+
+        with self.stats_lock:
+            self.callback_stats = {}
+            self.peak_queue_size = self.get_queue_size()
+
+    def add_callback_time(self, signal, subsignal, callback, elapsed):
+        """Record a callback call time
+
+        signal : Signal number
+        subsignal : Subsignal number
+        callback : Callback function
+        elapsed : Time spent in callback (seconds)
+        """
+
+        name = getattr(callback, "__qualname__", repr(callback))
+        key = (signal, subsignal, name)
+        with self.stats_lock:
+            stats = self.callback_stats.get(key)
+            if stats is None:
+                stats = self.callback_stats[key] = [0, 0.0, 0.0, deque(maxlen=500)]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+            stats[3].append(elapsed)
+        if elapsed > self.callback_budget:
+            logging.warning(f"Callback '{name}(...)' for signal({signal},{subsignal}) took {elapsed * 1000:.1f}ms")
+
+    def get_profile(self):
+        """Get callback profiling stats
+
+        p99 is calculated from the last 500 calls of each callback.
+        Returns : Dictionary with queue stats and list of callback stats, slowest (max) first
+        """
+
+        callbacks = []
+        with self.stats_lock:
+            for (signal, subsignal, name), (count, total, max_time, times) in self.callback_stats.items():
+                times = sorted(times)
+                callbacks.append({
+                    "signal": signal,
+                    "subsignal": subsignal,
+                    "callback": name,
+                    "count": count,
+                    "mean": total / count,
+                    "p99": times[ceil(0.99 * len(times)) - 1],
+                    "max": max_time
+                })
+            peak_queue_size = self.peak_queue_size
+        callbacks.sort(key=lambda item: item["max"], reverse=True)
+        return {
+            "queue_size": self.get_queue_size(),
+            "peak_queue_size": peak_queue_size,
+            "dropped": self.dropped,
+            "overflowed": self.overflowed,
+            "callbacks": callbacks
+        }
+
+    @staticmethod
+    def format_profile(profile, max_callbacks=10):
+        """Format callback profiling stats as human readable text
+
+        profile : Dictionary returned by get_profile
+        max_callbacks : Max number of callbacks to list, slowest first
+        Returns : Profile text
+        """
+
+        lines = [f"Signal queue: {profile['queue_size']} pending, peak {profile['peak_queue_size']}, {profile['dropped']} dropped, {profile['overflowed']} overflowed"]
+        for stats in profile["callbacks"][:max_callbacks]:
+            lines.append(f"  {stats['callback']} ({stats['signal']},{stats['subsignal']}): {stats['count']} calls, "
+                         f"mean {stats['mean'] * 1000:.2f}ms, p99 {stats['p99'] * 1000:.2f}ms, max {stats['max'] * 1000:.2f}ms")
+        return "\n".join(lines)
 
 # ---------------------------------------------------------------------------
 
@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+# ****************************************************************************
+# ZYNTHIAN PROJECT: Zynthian Snapshot Catalog (zynthian_snapshot_catalog)
+#
+# zynthian snapshot catalog
+#
+# Copyright (C) 2015-2024 Fernando Moyano <jofemodo@zynthian.org>
+#                         Brian Walton <riban@zynthian.org>
+#
+# ****************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+# ****************************************************************************
+
+import os
+import logging
+from time import time
+from threading import RLock
+from json import JSONEncoder, JSONDecoder
+from os.path import basename, dirname, isdir, join
+
+from zyngine import zynthian_snapshot_file
+from zyngine.zynthian_scheduler import zynsched
+
+# ----------------------------------------------------------------------------
+# Zynthian Snapshot Catalog Class
+# ----------------------------------------------------------------------------
+
+CATALOG_VERSION = 1
+CATALOG_FNAME = ".catalog.json"
+CATALOG_SAVE_DELAY = 10  # Seconds after a change before saving the catalog file
+
+
+class zynthian_snapshot_catalog:
+
+    def __init__(self, snapshot_dir):
+        """ Create an instance of a snapshot catalog
+
+        Keeps a persistent index of snapshot banks and the snapshots they contain,
+        so browsing and program change loading don't need to scan the filesystem.
+        Entries are refreshed when the mtime of a bank directory or snapshot file changes.
+        Changes are saved to file in the background after CATALOG_SAVE_DELAY, so loading snapshots doesn't
+        wait for catalog writes. save must be called on shutdown to write pending changes.
+        snapshot_dir : Path of snapshots directory
+        """
+
+        self.snapshot_dir = snapshot_dir
+        self.catalog_fpath = join(snapshot_dir, CATALOG_FNAME)
+        self.lock = RLock()
+        self.dirty = False
+        self.save_task = None  # Scheduled save task
+        self.root_mtime = None  # mtime of snapshot dir when bank list was refreshed
+        self.bank_names = []  # Sorted list of bank names
+        self.banks = {}  # Map of bank catalogs indexed by bank name
+        self.load()
+
+    # ----------------------------------------------------------------------------
+    # Catalog file
+    # ----------------------------------------------------------------------------
+
+    def load(self):
+        """Load catalog index from file"""
+
+        with self.lock:
+            self.banks = {}
+            try:
+                with open(self.catalog_fpath, "r") as fh:
+                    catalog = JSONDecoder().decode(fh.read())
+                if catalog["version"] == CATALOG_VERSION:
+                    self.banks = catalog["banks"]
+                    for bank in self.banks.values():
+                        bank["programs"] = self.build_program_map(bank["snapshots"])
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logging.warning(f"Can't load snapshot catalog => {e}")
+            self.root_mtime = None
+
+    def set_dirty(self):
+        """Flag catalog as changed and schedule saving it to file"""
+
+        with self.lock:
+            self.dirty = True
+            if self.save_task is None:
+                self.save_task = zynsched.add_oneshot(CATALOG_SAVE_DELAY, self.save, name="snapshot catalog", blocking=True)
+
+    def save(self):
+        """Save catalog index to file, if changed"""
+
+        with self.lock:
+            zynsched.cancel(self.save_task)
+            self.save_task = None
+            if not self.dirty:
+                return
+            banks = {}
+            for bank_name, bank in self.banks.items():
+                banks[bank_name] = {
+                    "mtime": bank["mtime"],
+                    "snapshots": bank["snapshots"]
+                }
+            try:
+                tmp_fpath = self.catalog_fpath + ".tmp"
+                with open(tmp_fpath, "w") as fh:
+                    fh.write(JSONEncoder().encode({"version": CATALOG_VERSION, "banks": banks}))
+                os.replace(tmp_fpath, self.catalog_fpath)
+                self.dirty = False
+                # Writing the catalog changes the snapshot dir mtime, but not the bank list
+                if self.root_mtime is not None:
+                    self.root_mtime = os.stat(self.snapshot_dir).st_mtime_ns
+            except Exception as e:
+                logging.warning(f"Can't save snapshot catalog => {e}")
+
+    # ----------------------------------------------------------------------------
+    # Catalog refresh
+    # ----------------------------------------------------------------------------
+
+    @staticmethod
+    def get_program(fname):
+        """Get MIDI program number from snapshot or bank filename
+
+        fname : Filename (without path)
+        Returns : Program number or None if filename has not program prefix
+        """
+
+        try:
+            return int(fname.split('-')[0])
+        except:
+            return None
+
+    @staticmethod
+    def build_program_map(snapshots):
+        """Build a map of snapshot filenames indexed by program number
+
+        snapshots : Dictionary of snapshot entries indexed by filename
+        Returns : Dictionary of filenames indexed by program number
+        """
+
+        programs = {}
+        for fname in sorted(snapshots, reverse=True):
+            program = snapshots[fname]["program"]
+            if program is not None:
+                programs[program] = fname
+        return programs
+
+    @staticmethod
+    def get_state_info(state):
+        """Get catalog info from snapshot state
+
+        state : Snapshot state dictionary
+        Returns : Dictionary with chain count & list of engines
+        """
+
+        chains = 0
+        engines = set()
+        try:
+            if "chains" in state:
+                chains = len(state["chains"])
+                for chain_state in state["chains"].values():
+                    for slot_state in chain_state.get("slots", []):
+                        engines.update(slot_state.values())
+            # Legacy snapshots
+            elif "layers" in state:
+                for layer_state in state["layers"]:
+                    engines.add(layer_state["engine_nick"])
+                chains = len(state["layers"])
+        except Exception as e:
+            logging.debug(f"Can't get catalog info from snapshot state => {e}")
+        return {
+            "chains": chains,
+            "engines": sorted(engines)
+        }
+
+    def read_snapshot_info(self, fpath):
+        """Read catalog info from snapshot file
+
+        fpath : Full path and filename of snapshot
+        Returns : Dictionary with chain count & list of engines
+        """
+
+        try:
+            state, riff_data = zynthian_snapshot_file.read_snapshot(fpath, False)
+            return self.get_state_info(state)
+        except Exception as e:
+            logging.warning(f"Can't read snapshot '{fpath}' => {e}")
+            return self.get_state_info({})
+
+    def refresh_bank_list(self):
+        """Refresh list of banks if snapshot dir changed"""
+
+        with self.lock:
+            try:
+                mtime = os.stat(self.snapshot_dir).st_mtime_ns
+            except FileNotFoundError:
+                self.bank_names = []
+                return
+            if mtime == self.root_mtime:
+                return
+            self.root_mtime = mtime
+            bank_names = []
+            for fname in os.listdir(self.snapshot_dir):
+                if fname[:3].isdigit() and isdir(join(self.snapshot_dir, fname)):
+                    bank_names.append(fname)
+            bank_names.sort()
+            self.bank_names = bank_names
+            for bank_name in list(self.banks):
+                if bank_name not in bank_names:
+                    del self.banks[bank_name]
+                    self.set_dirty()
+
+    def refresh_bank(self, bank_name):
+        """Refresh bank catalog if bank dir changed
+
+        bank_name : Bank name (directory name without path)
+        Returns : Bank catalog or None if bank doesn't exist
+        """
+
+        with self.lock:
+            dpath = join(self.snapshot_dir, bank_name)
+            try:
+                mtime = os.stat(dpath).st_mtime_ns
+            except FileNotFoundError:
+                if bank_name in self.banks:
+                    del self.banks[bank_name]
+                    self.set_dirty()
+                return None
+            try:
+                bank = self.banks[bank_name]
+                if bank["mtime"] == mtime:
+                    return bank
+                snapshots = bank["snapshots"]
+            except KeyError:
+                snapshots = {}
+
+            # Bank changed => only re-read added or modified snapshots
+            fresh_snapshots = {}
+            for fname in os.listdir(dpath):
+                if fname[-4:].lower() != ".zss":
+                    continue
+                try:
+                    st = os.stat(join(dpath, fname))
+                except FileNotFoundError:
+                    continue
+                entry = snapshots.get(fname)
+                if entry is None or entry["mtime"] != st.st_mtime_ns or entry["size"] != st.st_size:
+                    entry = self.build_entry(bank_name, fname, st)
+                fresh_snapshots[fname] = entry
+            bank = {
+                "mtime": mtime,
+                "snapshots": fresh_snapshots,
+                "programs": self.build_program_map(fresh_snapshots)
+            }
+            self.banks[bank_name] = bank
+            self.set_dirty()
+            return bank
+
+    def build_entry(self, bank_name, fname, st, state=None):
+        """Build catalog entry for a snapshot file
+
+        bank_name : Bank name
+        fname : Snapshot filename (without path)
+        st : os.stat result of snapshot file
+        state : Snapshot state dictionary (Default: read from file)
+        Returns : Catalog entry dictionary
+        """
+
+        if state is None:
+            info = self.read_snapshot_info(join(self.snapshot_dir, bank_name, fname))
+        else:
+            info = self.get_state_info(state)
+        program = self.get_program(fname)
+        title = fname[:-4]
+        if program is not None:
+            title = title.split('-', 1)[-1]
+        return {
+            "program": program,
+            "bank": bank_name,
+            "title": title.replace(';', '>', 1).replace(';', '/'),
+            "chains": info["chains"],
+            "engines": info["engines"],
+            "size": st.st_size,
+            "mtime": st.st_mtime_ns,
+            "last_load": None
+        }
+
+    # ----------------------------------------------------------------------------
+    # Catalog queries
+    # ----------------------------------------------------------------------------
+
+    def get_banks(self):
+        """Get sorted list of bank names"""
+
+        with self.lock:
+            self.refresh_bank_list()
+            return self.bank_names.copy()
+
+    def get_bank_by_number(self, bank_num):
+        """Get bank name from MIDI bank number
+
+        bank_num : MIDI bank number (0..127)
+        Returns : Bank name or None if not found
+        """
+
+        for bank_name in self.get_banks():
+            if self.get_program(bank_name) == bank_num:
+                return bank_name
+        return None
+
+    def get_snapshots(self, bank_name):
+        """Get sorted list of snapshots in a bank
+
+        bank_name : Bank name
+        Returns : List of (fpath, entry) tuples sorted by filename
+        """
+
+        with self.lock:
+            bank = self.refresh_bank(bank_name)
+            if bank is None:
+                return []
+            dpath = join(self.snapshot_dir, bank_name)
+            return [(join(dpath, fname), bank["snapshots"][fname]) for fname in sorted(bank["snapshots"])]
+
+    def get_snapshot_by_prog(self, bank_name, program):
+        """Get snapshot path from MIDI program number
+
+        bank_name : Bank name
+        program : MIDI program number
+        Returns : Full path of snapshot or None if not found
+        """
+
+        with self.lock:
+            bank = self.refresh_bank(bank_name)
+            try:
+                return join(self.snapshot_dir, bank_name, bank["programs"][program])
+            except (KeyError, TypeError):
+                return None
+
+    # ----------------------------------------------------------------------------
+    # Catalog updates
+    # ----------------------------------------------------------------------------
+
+    def get_bank_name(self, fpath):
+        """Get name of the bank containing a snapshot or None if not in a bank"""
+
+        dpath = dirname(fpath)
+        if dirname(dpath) == self.snapshot_dir:
+            return basename(dpath)
+        return None
+
+    def update_snapshot(self, fpath, state=None, loaded=False):
+        """Update catalog entry of a snapshot that has been saved or loaded
+
+        fpath : Full path and filename of snapshot
+        state : Snapshot state dictionary (Default: read from file if changed)
+        loaded : True to update last load time
+        """
+
+        bank_name = self.get_bank_name(fpath)
+        if bank_name is None:
+            return
+        fname = basename(fpath)
+        with self.lock:
+            try:
+                st = os.stat(fpath)
+            except FileNotFoundError:
+                return
+            # Update entry before refreshing bank, so the snapshot file is not read again
+            if bank_name in self.banks:
+                snapshots = self.banks[bank_name]["snapshots"]
+                entry = snapshots.get(fname)
+                if entry is None or entry["mtime"] != st.st_mtime_ns or entry["size"] != st.st_size:
+                    last_load = entry["last_load"] if entry else None
+                    entry = self.build_entry(bank_name, fname, st, state)
+                    entry["last_load"] = last_load
+                    snapshots[fname] = entry
+                    self.banks[bank_name]["programs"] = self.build_program_map(snapshots)
+                    self.set_dirty()
+            bank = self.refresh_bank(bank_name)
+            if bank is None or fname not in bank["snapshots"]:
+                return
+            if loaded:
+                bank["snapshots"][fname]["last_load"] = time()
+                self.set_dirty()
+
+# -----------------------------------------------------------------------------
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# ****************************************************************************
+# ZYNTHIAN PROJECT: Zynthian Snapshot File (zynthian_snapshot_file)
+#
+# Read & write snapshot files
+#
+# Copyright (C) 2015-2024 Fernando Moyano <jofemodo@zynthian.org>
+#                         Brian Walton <riban@zynthian.org>
+#
+# ****************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+# ****************************************************************************
+
+import struct
+from json import JSONEncoder, JSONDecoder
+
+# ----------------------------------------------------------------------------
+# Snapshot file formats
+# ----------------------------------------------------------------------------
+#
+# Legacy snapshots are plain JSON text, with the zynseq RIFF data base64
+# encoded into the "zynseq_riff_b64" field.
+#
+# Binary snapshots are a container with the same ".zss" extension:
+#   header : magic (4 bytes), version (uint16), reserved (uint16),
+#            JSON section length (uint32), RIFF section length (uint32)
+#   JSON section : UTF-8 encoded JSON state, without "zynseq_riff_b64"
+#   RIFF section : raw zynseq RIFF data
+#
+# All integers are little endian.
+# ----------------------------------------------------------------------------
+
+CONTAINER_MAGIC = b"ZSS\x00"
+CONTAINER_VERSION = 1
+CONTAINER_HEADER = struct.Struct("<4sHHII")
+
+
+def is_container(data):
+    """Check if snapshot data is a binary container
+
+    data : Snapshot file content (bytes) or first bytes of it
+    Returns : True if binary container, False if JSON text
+    """
+
+    return data[:len(CONTAINER_MAGIC)] == CONTAINER_MAGIC
+
+
+def decode_header(data):
+    """Decode binary container header
+
+    data : Snapshot file content (bytes)
+    Returns : Tuple (JSON section length, RIFF section length)
+    """
+
+    magic, version, reserved, json_len, riff_len = CONTAINER_HEADER.unpack_from(data)
+    if version > CONTAINER_VERSION:
+        raise ValueError(f"Unsupported snapshot container version {version}")
+    if CONTAINER_HEADER.size + json_len + riff_len > len(data):
+        raise ValueError("Truncated snapshot container")
+    return json_len, riff_len
+
+
+def read_snapshot(fpath, load_riff=True):
+    """Read a snapshot file, in legacy JSON or binary container format
+
+    fpath : Full path and filename of snapshot file
+    load_riff : False to skip the zynseq RIFF section
+    Returns : Tuple (state dictionary, RIFF data as memoryview or None)
+    """
+
+    with open(fpath, "rb") as fh:
+        if not load_riff:
+            # Read just the header and JSON section
+            data = fh.read(CONTAINER_HEADER.size)
+            if is_container(data):
+                magic, version, reserved, json_len, riff_len = CONTAINER_HEADER.unpack(data)
+                state = JSONDecoder().decode(fh.read(json_len).decode("utf-8"))
+                return state, None
+            data += fh.read()
+        else:
+            data = fh.read()
+
+    if not is_container(data):
+        return JSONDecoder().decode(data.decode("utf-8")), None
+
+    json_len, riff_len = decode_header(data)
+    mv = memoryview(data)
+    json_start = CONTAINER_HEADER.size
+    riff_start = json_start + json_len
+    state = JSONDecoder().decode(str(mv[json_start:riff_start], "utf-8"))
+    if riff_len and load_riff:
+        # Zero-copy view of RIFF section
+        riff_data = mv[riff_start:riff_start + riff_len]
+    else:
+        riff_data = None
+    return state, riff_data
+
+
+def encode_snapshot(state, riff_data=None):
+    """Encode a snapshot to file content
+
+    If RIFF data is passed, the snapshot is encoded in binary container format.
+    Otherwise it is encoded as JSON text.
+
+    state : State dictionary
+    riff_data : zynseq RIFF data (bytes) or None for JSON format
+    Returns : File content (bytes)
+    """
+
+    json_data = JSONEncoder().encode(state).encode("utf-8")
+    if riff_data is None:
+        return json_data
+    header = CONTAINER_HEADER.pack(CONTAINER_MAGIC, CONTAINER_VERSION, 0, len(json_data), len(riff_data))
+    return b"".join((header, json_data, riff_data))
+
+# -----------------------------------------------------------------------------
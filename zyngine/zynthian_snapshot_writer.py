@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# ****************************************************************************
+# ZYNTHIAN PROJECT: Zynthian Snapshot Writer (zynthian_snapshot_writer)
+#
+# Asynchronous snapshot file writer
+#
+# Copyright (C) 2015-2024 Fernando Moyano <jofemodo@zynthian.org>
+#                         Brian Walton <riban@zynthian.org>
+#
+# ****************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+# ****************************************************************************
+
+import os
+import logging
+from threading import Thread, Condition
+from os.path import dirname
+
+# ----------------------------------------------------------------------------
+# Zynthian Snapshot Writer Class
+# ----------------------------------------------------------------------------
+
+
+class zynthian_snapshot_writer:
+
+    def __init__(self, on_complete=None):
+        """ Create an instance of a snapshot writer
+
+        Writes snapshot files from a background thread, so callers never block on storage I/O.
+        Pending writes to the same file are coalesced, so only the newest data is written.
+        Files are written to a temporary file that replaces the target when complete.
+
+        on_complete : Function called from the writer thread when a file is written: on_complete(fpath, success)
+        """
+
+        self.on_complete = on_complete
+        self.cond = Condition()
+        self.pending = {}  # Map of data to write, indexed by file path, in request order
+        self.writing = None  # Path of file being written
+        self.exit_flag = False
+        self.thread = None
+
+    def start(self):
+        """Start writer thread"""
+
+        if self.thread and self.thread.is_alive():
+            return
+        self.exit_flag = False
+        self.thread = Thread(target=self.thread_task, args=())
+        self.thread.name = "Snapshot Writer"
+        self.thread.daemon = True  # thread dies with the program
+        self.thread.start()
+
+    def stop(self):
+        """Write pending files and stop writer thread"""
+
+        with self.cond:
+            self.exit_flag = True
+            self.cond.notify_all()
+        if self.thread and self.thread.is_alive():
+            self.thread.join()
+        self.thread = None
+
+    def write(self, fpath, data):
+        """Request a file write
+
+        fpath : Full path and filename
+        data : File content (bytes)
+        """
+
+        with self.cond:
+            # Coalesce => replace pending data and move to the end of the queue
+            self.pending.pop(fpath, None)
+            self.pending[fpath] = data
+            self.cond.notify_all()
+        if self.thread is None:
+            # Writer not running => write synchronously
+            self.flush()
+
+    @staticmethod
+    def match_path(path, fpath):
+        """Check if a path matches a file or directory path
+
+        path : Path of written file
+        fpath : Full path and filename, directory path or None to match any file
+        """
+
+        return fpath is None or path == fpath or path.startswith(fpath.rstrip("/") + "/")
+
+    def is_pending(self, fpath=None):
+        """Check if a file write is pending
+
+        fpath : Full path and filename or directory path (Default: any file)
+        """
+
+        with self.cond:
+            if self.writing is not None and self.match_path(self.writing, fpath):
+                return True
+            return any(self.match_path(path, fpath) for path in self.pending)
+
+    def wait(self, fpath=None):
+        """Block until pending writes are completed, e.g. before renaming a file
+
+        fpath : Full path and filename or directory path (Default: all files)
+        """
+
+        if self.thread is None:
+            self.flush()
+            return
+        with self.cond:
+            while self.writing is not None and self.match_path(self.writing, fpath) or any(self.match_path(path, fpath) for path in self.pending):
+                self.cond.wait()
+
+    def cancel(self, fpath):
+        """Discard pending writes and block until file is not being written, e.g. before deleting a file
+
+        fpath : Full path and filename or directory path
+        """
+
+        with self.cond:
+            for path in [path for path in self.pending if self.match_path(path, fpath)]:
+                del self.pending[path]
+            while self.writing is not None and self.match_path(self.writing, fpath):
+                self.cond.wait()
+
+    def flush(self):
+        """Write all pending files from the calling thread"""
+
+        while self.write_next():
+            pass
+
+    def write_next(self):
+        """Write oldest pending file
+
+        Returns : True if a file was written, False if there are no pending files
+        """
+
+        with self.cond:
+            if not self.pending or self.writing:
+                return False
+            fpath = next(iter(self.pending))
+            data = self.pending.pop(fpath)
+            self.writing = fpath
+        success = self.write_file(fpath, data)
+        with self.cond:
+            self.writing = None
+            self.cond.notify_all()
+        if self.on_complete:
+            try:
+                self.on_complete(fpath, success)
+            except Exception as e:
+                logging.error(f"Snapshot writer callback failed => {e}")
+        return True
+
+    @staticmethod
+    def write_file(fpath, data):
+        """Write a file atomically
+
+        fpath : Full path and filename
+        data : File content (bytes)
+        Returns : True on success
+        """
+
+        tmp_fpath = fpath + ".tmp"
+        try:
+            with open(tmp_fpath, "wb") as fh:
+                fh.write(data)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_fpath, fpath)
+            # Make the rename persistent
+            dfd = os.open(dirname(fpath) or ".", os.O_RDONLY)
+            try:
+                os.fsync(dfd)
+            finally:
+                os.close(dfd)
+            logging.info(f"Saved snapshot {fpath}")
+            return True
+        except Exception as e:
+            logging.error(f"Can't save snapshot file '{fpath}' => {e}")
+            try:
+                os.remove(tmp_fpath)
+            except:
+                pass
+            return False
+
+    def thread_task(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.exit_flag:
+                    self.cond.wait()
+                if not self.pending and self.exit_flag:
+                    return
+            self.write_next()
+
+# -----------------------------------------------------------------------------
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+# ****************************************************************************
+# ZYNTHIAN PROJECT: Zynthian State Journal (zynthian_state_journal)
+#
+# Append-only journal of state changes
+#
+# Copyright (C) 2015-2024 Fernando Moyano <jofemodo@zynthian.org>
+#                         Brian Walton <riban@zynthian.org>
+#
+# ****************************************************************************
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the LICENSE.txt file.
+#
+# ****************************************************************************
+
+import os
+import logging
+from time import monotonic
+from threading import Thread, Condition
+from json import JSONEncoder, JSONDecoder
+
+# ----------------------------------------------------------------------------
+# Zynthian State Journal Class
+# ----------------------------------------------------------------------------
+#
+# Each journal record is a JSON line with a sequence number ("n"), a record
+# type ("t"), and the record data:
+#   processor controller : {"n": 12, "t": "p", "i": proc_id, "s": symbol, "v": value}
+#   mixer controller     : {"n": 13, "t": "m", "i": mixer_chan, "s": symbol, "v": value}
+#   processor preset     : {"n": 14, "t": "r", "i": proc_id, "s": "preset", "v": {"bank_info": ..., "preset_info": ...}}
+#
+# The journal is compacted by saving a full snapshot that includes the
+# sequence number of the last record it covers ("journal_seq"). Replaying
+# applies only the records newer than the snapshot.
+# ----------------------------------------------------------------------------
+
+REC_PROCESSOR = "p"
+REC_MIXER = "m"
+REC_PRESET = "r"
+
+
+class zynthian_state_journal:
+
+    def __init__(self, fpath, flush_interval=1.0):
+        """ Create an instance of a state journal
+
+        Records controller changes in a compact append-only log file, so the state can be
+        restored after a power loss without rewriting a full snapshot for each change.
+        Changes are coalesced in memory (latest value wins) and appended by a background
+        thread every flush_interval seconds.
+
+        fpath : Full path and filename of journal file
+        flush_interval : Seconds between journal writes
+        """
+
+        self.fpath = fpath
+        self.enabled = False
+        self.mixer = None  # Audio mixer engine, whose controllers are recorded as mixer records
+        self.flush_interval = flush_interval
+        self.cond = Condition()
+        self.pending = {}  # Map of records to write, indexed by (type, id, symbol)
+        self.seq = 0  # Sequence number of last record
+        self.last_change_ts = 0  # Time of last recorded change
+        self.compact_flag = False  # True if state changed in a way that can't be journaled
+        self.paused = False
+        self.exit_flag = False
+        self.thread = None
+
+    # ----------------------------------------------------------------------------
+    # Thread management
+    # ----------------------------------------------------------------------------
+
+    def start(self, mixer=None):
+        """Enable journal and start writer thread
+
+        mixer : Audio mixer engine
+        """
+
+        self.mixer = mixer
+        self.enabled = True
+        if self.thread and self.thread.is_alive():
+            return
+        self.exit_flag = False
+        self.thread = Thread(target=self.thread_task, args=())
+        self.thread.name = "State Journal"
+        self.thread.daemon = True  # thread dies with the program
+        self.thread.start()
+
+    def stop(self):
+        """Write pending records, stop writer thread and disable journal"""
+
+        self.enabled = False
+        with self.cond:
+            self.exit_flag = True
+            self.cond.notify_all()
+        if self.thread and self.thread.is_alive():
+            self.thread.join()
+        self.thread = None
+
+    def thread_task(self):
+        while True:
+            with self.cond:
+                if not self.exit_flag:
+                    self.cond.wait(self.flush_interval)
+                exit_flag = self.exit_flag
+            self.flush()
+            if exit_flag:
+                return
+
+    # ----------------------------------------------------------------------------
+    # Recording
+    # ----------------------------------------------------------------------------
+
+    def pause(self):
+        """Stop recording changes, e.g. while loading a snapshot"""
+
+        self.paused = True
+
+    def resume(self):
+        """Resume recording changes"""
+
+        self.paused = False
+
+    def record(self, rec_type, id, symbol, value):
+        """Record a controller change
+
+        rec_type : Record type (REC_PROCESSOR, REC_MIXER)
+        id : Processor id or mixer channel
+        symbol : Controller symbol
+        value : Controller value
+        """
+
+        if self.paused:
+            return
+        with self.cond:
+            self.seq += 1
+            self.pending[(rec_type, id, symbol)] = (self.seq, value)
+            self.last_change_ts = monotonic()
+
+    def record_zctrl(self, zctrl):
+        """Record a controller value change
+
+        Controllers that are not in a chain processor or the audio mixer can't be replayed,
+        so they request a compaction instead.
+        zctrl : Controller object
+        """
+
+        if zctrl.processor and zctrl.processor.chain_id is not None:
+            self.record(REC_PROCESSOR, zctrl.processor.id, zctrl.symbol, zctrl.value)
+        elif zctrl.engine is not None and zctrl.engine is self.mixer:
+            self.record(REC_MIXER, zctrl.graph_path[0], zctrl.graph_path[1], zctrl.value)
+        elif not self.paused:
+            self.request_compaction()
+
+    def record_preset(self, processor):
+        """Record a processor bank or preset change
+
+        Controller records older than the preset record are replayed before it, so they are
+        overridden by the preset, as they were when recorded.
+        processor : Processor object
+        """
+
+        if processor.chain_id is not None:
+            self.record(REC_PRESET, processor.id, "preset", {
+                "bank_info": processor.bank_info,
+                "preset_info": processor.preset_info
+            })
+        elif not self.paused:
+            self.request_compaction()
+
+    def request_compaction(self):
+        """Flag a state change that can't be journaled (e.g. chain edit), so journal must be compacted"""
+
+        with self.cond:
+            self.compact_flag = True
+            self.last_change_ts = monotonic()
+
+    def flush(self):
+        """Append pending records to journal file"""
+
+        with self.cond:
+            if not self.pending:
+                return
+            records = sorted(self.pending.items(), key=lambda item: item[1][0])
+            self.pending = {}
+            lines = []
+            encoder = JSONEncoder()
+            for (rec_type, id, symbol), (n, value) in records:
+                lines.append(encoder.encode({"n": n, "t": rec_type, "i": id, "s": symbol, "v": value}))
+            try:
+                with open(self.fpath, "a") as fh:
+                    fh.write("\n".join(lines) + "\n")
+                    fh.flush()
+                    os.fsync(fh.fileno())
+            except Exception as e:
+                logging.error(f"Can't write state journal => {e}")
+
+    # ----------------------------------------------------------------------------
+    # Compaction
+    # ----------------------------------------------------------------------------
+
+    def needs_compaction(self, idle_time, max_size=65536):
+        """Check if journal should be compacted
+
+        idle_time : Min seconds without changes
+        max_size : Journal file size (bytes) that triggers compaction
+        Returns : True if journal should be compacted now
+        """
+
+        with self.cond:
+            if self.paused or monotonic() - self.last_change_ts < idle_time:
+                return False
+            if self.compact_flag:
+                return True
+        try:
+            return os.path.getsize(self.fpath) > max_size
+        except OSError:
+            return False
+
+    def begin_compaction(self):
+        """Begin journal compaction
+
+        Must be called just before capturing the full state.
+        Returns : Sequence number of last record covered by the full state
+        """
+
+        with self.cond:
+            self.compact_flag = False
+            return self.seq
+
+    def end_compaction(self, seq):
+        """Remove records covered by a saved full state
+
+        seq : Sequence number returned by begin_compaction
+        """
+
+        self.flush()
+        with self.cond:
+            records = [rec for rec in self.read_records() if rec["n"] > seq]
+            try:
+                if records:
+                    tmp_fpath = self.fpath + ".tmp"
+                    encoder = JSONEncoder()
+                    with open(tmp_fpath, "w") as fh:
+                        for rec in records:
+                            fh.write(encoder.encode(rec) + "\n")
+                        fh.flush()
+                        os.fsync(fh.fileno())
+                    os.replace(tmp_fpath, self.fpath)
+                elif os.path.isfile(self.fpath):
+                    os.remove(self.fpath)
+            except Exception as e:
+                logging.error(f"Can't compact state journal => {e}")
+
+    def reset(self):
+        """Discard all records"""
+
+        with self.cond:
+            self.pending = {}
+            self.compact_flag = False
+            try:
+                os.remove(self.fpath)
+            except FileNotFoundError:
+                pass
+
+    # ----------------------------------------------------------------------------
+    # Replay
+    # ----------------------------------------------------------------------------
+
+    def read_records(self, after_seq=0):
+        """Read journal records from file
+
+        Truncated records (e.g. written during a power loss) are ignored.
+        after_seq : Sequence number of last record covered by full state
+        Returns : List of record dictionaries, ordered by sequence number
+        """
+
+        records = []
+        try:
+            with open(self.fpath, "r") as fh:
+                decoder = JSONDecoder()
+                for line in fh:
+                    try:
+                        rec = decoder.decode(line)
+                    except ValueError:
+                        continue
+                    if rec["n"] > after_seq:
+                        records.append(rec)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"Can't read state journal => {e}")
+        records.sort(key=lambda rec: rec["n"])
+        return records
+
+    def get_replay_records(self, after_seq=0):
+        """Get records to replay over a full state and continue sequence after them
+
+        after_seq : Sequence number of last record covered by full state
+        Returns : List of record dictionaries, ordered by sequence number
+        """
+
+        records = self.read_records(after_seq)
+        with self.cond:
+            self.seq = max(self.seq, after_seq)
+            if records:
+                self.seq = max(self.seq, records[-1]["n"])
+        return records
+
+# ---------------------------------------------------------------------------
+
+
+global zynjournal
+zynjournal = zynthian_state_journal(os.environ.get(
+    'ZYNTHIAN_MY_DATA_DIR', "/zynthian/zynthian-my-data") + "/snapshots/last_state.journal")
+
+# ---------------------------------------------------------------------------
@@ -23,16 +23,18 @@
 #
 # ****************************************************************************
 
+import sys
 import base64
 import ctypes
 import logging
 import traceback
 from glob import glob
+from array import array
 from threading import Thread
 from queue import SimpleQueue
 from datetime import datetime
 from time import sleep, monotonic
-from json import JSONEncoder, JSONDecoder
+from json import JSONEncoder
 from subprocess import check_output, Popen, STDOUT, PIPE
 from os.path import basename, isdir, isfile, join, dirname, splitext
 
@@ -50,7 +52,14 @@ from zynlibs.zynsmf.zynsmf import libsmf  # Direct access to shared library
 from zyngine.zynthian_chain_manager import *
 from zyngine.zynthian_processor import zynthian_processor
 from zyngine.zynthian_audio_recorder import zynthian_audio_recorder
+from zyngine.zynthian_snapshot_catalog import zynthian_snapshot_catalog
+from zyngine import zynthian_snapshot_file
+from zyngine.zynthian_snapshot_writer import zynthian_snapshot_writer
 from zyngine.zynthian_signal_manager import zynsigman
+from zyngine.zynthian_load_profiler import zynloadprof
+from zyngine.zynthian_scheduler import zynsched
+from zyngine.zynthian_midi_profiler import zynmidiprof
+from zyngine.zynthian_state_journal import zynjournal, REC_PROCESSOR, REC_MIXER, REC_PRESET
 from zyngine import zynthian_legacy_snapshot
 from zyngine import zynthian_engine_audio_mixer
 from zyngine import zynthian_midi_filter
@@ -63,6 +72,13 @@ from zyngine.zynthian_ctrldev_manager import zynthian_ctrldev_manager
 # ----------------------------------------------------------------------------
 
 SNAPSHOT_SCHEMA_VERSION = 1
+# State parts that can be captured separately by get_state
+STATE_SCOPE_CHAINS = "chains"
+STATE_SCOPE_MIXER = "mixer"
+STATE_SCOPE_SEQUENCER = "sequencer"
+STATE_SCOPE_ZS3 = "zs3"
+STATE_SCOPE_ALL = (STATE_SCOPE_CHAINS, STATE_SCOPE_MIXER, STATE_SCOPE_SEQUENCER, STATE_SCOPE_ZS3)
+STATE_JOURNAL_IDLE_TIME = 30  # Seconds without changes before compacting state journal
 capture_dir_sdc = os.environ.get(
     'ZYNTHIAN_MY_DATA_DIR', "/zynthian/zynthian-my-data") + "/capture"
 ex_data_dir = os.environ.get('ZYNTHIAN_EX_DATA_DIR', "/media/root")
@@ -76,6 +92,7 @@ class zynthian_state_manager:
     SS_MIDI_RECORDER_STATE = 3
     SS_LOAD_ZS3 = 4
     SS_SAVE_ZS3 = 5
+    SS_SAVE_SNAPSHOT = 6
 
     # Subsignals from other modules. Just to simplify access.
     # From S_AUDIO_PLAYER
@@ -105,12 +122,17 @@ class zynthian_state_manager:
         self.default_snapshot_fpath = join(self.snapshot_dir, "default.zss")
         self.last_state_snapshot_fpath = join(
             self.snapshot_dir, "last_state.zss")
+        self.snapshot_catalog = zynthian_snapshot_catalog(self.snapshot_dir)
+        self.snapshot_writer = zynthian_snapshot_writer(self.cb_snapshot_saved)
         # Increments each time a snapshot is loaded - modules may use to update if required
         self.last_snapshot_count = 0
         self.last_snapshot_fpath = ""
+        self.last_state_journal_seq = 0  # Sequence number of last state journal record saved in last state snapshot
+        self.preload_thread = None  # Thread starting engines for next snapshot
         self.snapshot_bank = None  # Name of snapshot bank (without path)
         self.snapshot_program = 0
         self.zs3 = {}  # Dictionary or zs3 configs indexed by "ch/pc"
+        self.zs3_plans = {}  # Dictionary of precompiled zs3 recall plans indexed by zs3 id
         self.last_zs3_id = None
 
         # Power saving
@@ -143,6 +165,7 @@ class zynthian_state_manager:
         self.zctrl_y = None
 
         self.cuia_queue = SimpleQueue()  # Queue for CUIA calls
+        self.build_zynmidi_handlers()  # MIDI event handlers indexed by status byte
 
         self.get_throttled_file = None
         self.hwmon_thermal_file = None
@@ -164,8 +187,8 @@ class zynthian_state_manager:
         self.audio_player = None
         self.aubio_in = [1, 2]  # List of aubio inputs
 
-        # List of lists [rate, cb, schedule] for registered regularly repeating callbacks
-        self.slow_update_callbacks = []
+        # Scheduler tasks for registered regularly repeating callbacks, indexed by callback
+        self.slow_update_callbacks = {}
 
         # Initialize SMF MIDI recorder and player
         try:
@@ -184,7 +207,7 @@ class zynthian_state_manager:
         self.zynmidi = zynthian_zcmidi()
 
         self.exit_flag = False
-        self.slow_thread = None
+        self.status_sched_task = None
         self.fast_thread = None
         self.start()
 
@@ -194,6 +217,12 @@ class zynthian_state_manager:
         """Start state manager"""
 
         self.start_busy("start state")
+        if zynthian_gui_config.midi_profile:
+            zynmidiprof.enable()
+        zynsigman.set_num_workers(zynthian_gui_config.signal_queue_workers)
+        if zynthian_gui_config.signal_profile:
+            zynsigman.enable_profile(True, zynthian_gui_config.signal_callback_budget / 1000)
+        zynsched.power_save_stretch = max(1, zynthian_gui_config.scheduler_power_save_stretch)
         # Initialize SOC sensors monitoring
 
         # Sysfs->hwmon monitoring interface
@@ -239,10 +268,14 @@ class zynthian_state_manager:
         self.chain_manager.add_chain(0)
 
         self.exit_flag = False
-        self.slow_thread = Thread(target=self.slow_thread_task)
-        self.slow_thread.name = "Status Manager Slow"
-        self.slow_thread.daemon = True  # thread dies with the program
-        self.slow_thread.start()
+        self.snapshot_writer.start()
+        self.status_counter = 0
+        self.xruns_status = self.status_xrun
+        self.midi_status = self.status_midi
+        self.midi_clock_status = self.status_midi_clock
+        self.status_sched_task = zynsched.add_periodic(0.2, self.status_task, name="status")
+        self.add_slow_update_callback(3600, self.check_for_updates, True)
+        self.add_slow_update_callback(5, self.check_state_journal, True)
 
         self.fast_thread = Thread(target=self.fast_thread_task)
         self.fast_thread.name = "Status Manager Fast"
@@ -251,6 +284,7 @@ class zynthian_state_manager:
 
         zynsigman.register(zynsigman.S_AUDIO_PLAYER,
                            self.SS_AUDIO_PLAYER_STATE, self.cb_status_audio_player)
+        zynsmf.set_state_cb(self.cb_status_smf)
 
         self.end_busy("start state")
 
@@ -261,24 +295,31 @@ class zynthian_state_manager:
 
         zynsigman.unregister(zynsigman.S_AUDIO_PLAYER,
                              self.SS_AUDIO_PLAYER_STATE, self.cb_status_audio_player)
+        zynsmf.set_state_cb(None)
 
         self.exit_flag = True
         if self.fast_thread and self.fast_thread.is_alive():
             self.fast_thread.join()
         self.fast_thread = None
-        if self.slow_thread and self.slow_thread.is_alive():
-            self.slow_thread.join()
-        self.slow_thread = None
+        zynsched.cancel(self.status_sched_task)
+        self.status_sched_task = None
+        self.remove_slow_update_callback(self.check_for_updates)
+        self.remove_slow_update_callback(self.check_state_journal)
 
         self.last_snapshot_fpath = ""
         self.zynseq.transport_stop("ALL")
         zynautoconnect.pause()
+        self.wait_preload_snapshot()
+        self.chain_manager.stop_standby_engines()
         self.chain_manager.remove_all_chains(True)
         self.reset_zs3()
         self.zynseq.load("")
         self.ctrldev_manager.unload_all_drivers()
         self.destroy_audio_player()
         zynautoconnect.stop()
+        self.snapshot_writer.stop()
+        self.snapshot_catalog.save()
+        zynjournal.stop()
 
         if self.hwmon_thermal_file:
             self.hwmon_thermal_file.close()
@@ -549,131 +590,108 @@ class zynthian_state_manager:
     # Background task threads
     # ------------------------------------------------------------------
 
-    def slow_thread_task(self):
-        """Perform slow / low priority background tasks"""
+    def status_task(self):
+        """Refresh status flags & sensors. Called periodically by scheduler."""
 
-        status_counter = 0
-        xruns_status = self.status_xrun
-        midi_status = self.status_midi
-        midi_clock_status = self.status_midi_clock
-        # Short delay after startup before first slow update
-        next_second_check = monotonic() + 2
-        self.add_slow_update_callback(3600, self.check_for_updates)
-
-        while not self.exit_flag:
-            # Get CPU Load
-            # self.status_cpu_load = max(psutil.cpu_percent(None, True))
-            self.status_cpu_load = zynautoconnect.get_jackd_cpu_load()
-            now = monotonic()
-
-            try:
-                # Get SOC sensors (once each 5 refreshes)
-                if status_counter > 5:
-                    status_counter = 0
+        # Get CPU Load
+        # self.status_cpu_load = max(psutil.cpu_percent(None, True))
+        self.status_cpu_load = zynautoconnect.get_jackd_cpu_load()
 
-                    self.status_overtemp = False
-                    self.status_undervoltage = False
+        # Get SOC sensors (once each 5 refreshes)
+        if self.status_counter > 5:
+            self.status_counter = 0
 
-                    # RBPi native sensors interface
-                    if self.get_throttled_file:
-                        try:
-                            self.get_throttled_file.seek(0)
-                            thr = int('0x%s' %
-                                      self.get_throttled_file.read(), 16)
-                            if thr & 0x1:
-                                self.status_undervoltage = True
-                            elif thr & (0x4 | 0x2):
-                                self.status_overtemp = True
-                        except Exception as e:
-                            logging.error(e)
-
-                    # Alternate sensor interface
-                    elif self.hwmon_thermal_file and self.hwmon_undervolt_file:
-                        try:
-                            self.hwmon_thermal_file.seek(0)
-                            res = int(self.hwmon_thermal_file.read())/1000
-                            # logging.debug(f"CPU Temperature => {res}")
-                            if res > self.overtemp_warning:
-                                self.status_overtemp = True
-                        except Exception as e:
-                            logging.error(e)
+            self.status_overtemp = False
+            self.status_undervoltage = False
 
-                        try:
-                            self.hwmon_undervolt_file.seek(0)
-                            res = self.hwmon_undervolt_file.read()
-                            if res == "1":
-                                self.status_undervoltage = True
-                        except Exception as e:
-                            logging.error(e)
+            # RBPi native sensors interface
+            if self.get_throttled_file:
+                try:
+                    self.get_throttled_file.seek(0)
+                    thr = int('0x%s' %
+                              self.get_throttled_file.read(), 16)
+                    if thr & 0x1:
+                        self.status_undervoltage = True
+                    elif thr & (0x4 | 0x2):
+                        self.status_overtemp = True
+                except Exception as e:
+                    logging.error(e)
 
-                    else:
+            # Alternate sensor interface
+            elif self.hwmon_thermal_file and self.hwmon_undervolt_file:
+                try:
+                    self.hwmon_thermal_file.seek(0)
+                    res = int(self.hwmon_thermal_file.read())/1000
+                    # logging.debug(f"CPU Temperature => {res}")
+                    if res > self.overtemp_warning:
                         self.status_overtemp = True
+                except Exception as e:
+                    logging.error(e)
+
+                try:
+                    self.hwmon_undervolt_file.seek(0)
+                    res = self.hwmon_undervolt_file.read()
+                    if res == "1":
                         self.status_undervoltage = True
+                except Exception as e:
+                    logging.error(e)
 
-                else:
-                    status_counter += 1
-
-                # MIDI Player
-                # TODO: Add callback from MIDI player to avoid polling (and regular access to c-lib)
-                status_midi_player = libsmf.getPlayState()
-                if self.status_midi_player != status_midi_player:
-                    self.status_midi_player = status_midi_player
-                    zynsigman.send(
-                        zynsigman.S_STATE_MAN, self.SS_MIDI_PLAYER_STATE, state=status_midi_player)
-
-                # MIDI Recorder
-                # TODO: Add callback from MIDI recorder to avoid polling (and regular access to c-lib)
-                status_midi_recorder = libsmf.isRecording()
-                if self.status_midi_recorder != status_midi_recorder:
-                    self.status_midi_recorder = status_midi_recorder
-                    zynsigman.send(
-                        zynsigman.S_STATE_MAN, self.SS_MIDI_RECORDER_STATE, state=status_midi_recorder)
-
-                # Sequencer Status => It must be improved using callbacks
-                self.zynseq.update_state()
-
-                # Clean some status flags
-                if xruns_status:
-                    self.status_xrun = False
-                    xruns_status = False
-                if self.status_xrun:
-                    xruns_status = True
-
-                if midi_status:
-                    self.status_midi = False
-                    midi_status = False
-                if self.status_midi:
-                    midi_status = True
-
-                if midi_clock_status:
-                    self.status_midi_clock = False
-                    midi_clock_status = False
-                if self.status_midi_clock:
-                    midi_clock_status = True
-
-                if self.sync:
-                    self.sync = False
-                    os.sync()
-
-                if now > next_second_check:
-                    for cb in self.slow_update_callbacks:
-                        if now > cb[2]:
-                            try:
-                                cb[1]()
-                                cb[2] = now + cb[0]
-                            except Exception as e:
-                                logging.error(e)
-                    next_second_check = now + 1
+            else:
+                self.status_overtemp = True
+                self.status_undervoltage = True
 
-            except Exception as e:
-                logging.exception(e)
+        else:
+            self.status_counter += 1
+
+        # Clean some status flags
+        if self.xruns_status:
+            self.status_xrun = False
+            self.xruns_status = False
+        if self.status_xrun:
+            self.xruns_status = True
+
+        if self.midi_status:
+            self.status_midi = False
+            self.midi_status = False
+        if self.status_midi:
+            self.midi_status = True
 
-            sleep(0.2)
+        if self.midi_clock_status:
+            self.status_midi_clock = False
+            self.midi_clock_status = False
+        if self.status_midi_clock:
+            self.midi_clock_status = True
+
+        if self.sync:
+            self.sync = False
+            # File system sync may block => run in its own thread
+            zynsched.add_oneshot(0, self.sync_task, name="sync", blocking=True)
+
+    def sync_task(self):
+        """Sync file system, run by scheduler in its own thread"""
+
+        os.sync()
 
     def cb_status_audio_player(self, handle, state):
         if handle == self.audio_player.handle:
             self.status_audio_player = state
 
+    def cb_status_smf(self, play_state, recording):
+        """Handle MIDI player & recorder state changes, called from zynsmf notification thread
+
+        play_state : MIDI player state [PLAY_STATE_STOPPED|PLAY_STATE_STARTING|PLAY_STATE_PLAYING|PLAY_STATE_STOPPING]
+        recording : True if MIDI recorder is recording
+        """
+
+        if self.status_midi_player != play_state:
+            self.status_midi_player = play_state
+            zynsigman.send(
+                zynsigman.S_STATE_MAN, self.SS_MIDI_PLAYER_STATE, state=play_state)
+        if self.status_midi_recorder != recording:
+            self.status_midi_recorder = recording
+            zynsigman.send(
+                zynsigman.S_STATE_MAN, self.SS_MIDI_RECORDER_STATE, state=recording)
+
     def fast_thread_task(self):
         """Perform fast / high priority background tasks"""
 
@@ -682,236 +700,276 @@ class zynthian_state_manager:
             self.zynmidi_read()
             sleep(0.01)
 
-    def add_slow_update_callback(self, rate, cb):
+    def add_slow_update_callback(self, rate, cb, blocking=False):
         """Add a callback to be called every "rate" seconds
 
         rate - time in seconds between callbacks
         cb - Callback function
+        blocking - True if callback may block (I/O, subprocesses) so it runs in its own thread
         """
 
         self.remove_slow_update_callback(cb)
-        self.slow_update_callbacks.append([rate, cb, 0])
+        # Short delay after startup before first slow update
+        self.slow_update_callbacks[cb] = zynsched.add_periodic(rate, cb, delay=2, blocking=blocking)
 
     def remove_slow_update_callback(self, cb):
-        """Add a callback to be called every "rate" seconds
+        """Remove a callback added with add_slow_update_callback
 
-        rate - time in seconds between callbacks
         cb - Callback function
         """
 
-        for cb in self.slow_update_callbacks:
-            if cb[1] == cb:
-                cb.remove(cb)
-                break
+        zynsched.cancel(self.slow_update_callbacks.pop(cb, None))
 
     # ------------------------------------------------------------------
     # MIDI processing
     # ------------------------------------------------------------------
 
+    def build_zynmidi_handlers(self):
+        """Build table of MIDI event handlers indexed by status byte
+
+        Handlers are called as handler(izmip, chan, ev) and return False if the event must not flag MIDI activity.
+        None means the event just flags MIDI activity. Must be rebuilt when master MIDI channel changes.
+        """
+
+        handlers = [None] * 256
+        for chan in range(16):
+            if chan == zynthian_gui_config.master_midi_channel:
+                for evtype in range(0x8, 0xF):
+                    handlers[(evtype << 4) | chan] = self.midi_event_master
+            else:
+                handlers[0x80 | chan] = self.midi_event_note_off
+                handlers[0x90 | chan] = self.midi_event_note_on
+                handlers[0xB0 | chan] = self.midi_event_cc
+                handlers[0xC0 | chan] = self.midi_event_pc
+        # System Messages (Common & RT)
+        handlers[0xF0] = self.midi_event_ignore  # SysEx
+        handlers[0xF8] = self.midi_event_clock  # Clock
+        handlers[0xF9] = self.midi_event_ignore  # Tick
+        handlers[0xFE] = self.midi_event_ignore  # Active Sense
+        self.zynmidi_handlers = handlers
+
     def zynmidi_read(self):
+        """Read & process pending events from zynmidi buffer
+
+        Events are decoded in batch: each 32-bit word is [izmip, status, data1, data2], MSB first.
+        SysEx messages continue in the following words, 4 data bytes per word, until 0xF7.
+        Returns : Number of 32-bit words read from buffer
+        """
+
         try:
             n = lib_zyncore.get_zynmidi_num_pending()
             if n <= 0:
-                return
+                return 0
             midi_events = (ctypes.c_uint32 * n)()
             n = lib_zyncore.read_zynmidi_buffer(midi_events, n)
+            if n <= 0:
+                return 0
+            # Convert words to big endian byte stream in a single pass
+            words = array("I")
+            words.frombytes(memoryview(midi_events).cast("B")[:n * 4])
+            if sys.byteorder == "little":
+                words.byteswap()
+            data = words.tobytes()
+            izmips = data[0::4]
+            statuses = data[1::4]
+
+            handlers = self.zynmidi_handlers
+            ctrldev_midi_event = self.ctrldev_manager.midi_event
+            # Profiling is checked once per batch to keep disabled overhead negligible
+            prof = zynmidiprof if zynmidiprof.enabled else None
+            if prof:
+                read_ts = monotonic()
+            flag = False
             i = 0
             while i < n:
-                ev = midi_events[i].to_bytes(4, 'big')
+                izmip = izmips[i]
+                status = statuses[i]
+                pos = i * 4
                 i += 1
-                izmip = ev[0]
-                evhead = ev[1]
-                ev = ev[1:]
 
                 # Process SysEx
-                if evhead == 0xF0:
+                if status == 0xF0:
                     # logging.debug(f"RECEIVED SYSEX FROM {izmip}...")
-                    sysex_data = bytearray(ev)
-                    while i < n:
-                        chunk = midi_events[i].to_bytes(4, 'big')
-                        sysex_data.extend(chunk)
-                        if 0xF7 in chunk:
-                            break
-                        i += 1
+                    end = data.find(b"\xF7", pos + 1)
                     # This is probably not correct and we should continue reading in the next period
-                    if i == n:
+                    if end < 0:
                         logging.error(
                             f"SysEx message from device {izmip} is not terminated")
-                        continue
-                    # Crop data until find the 0xF7 mark
-                    while sysex_data[-1] != 0xF7:
-                        del sysex_data[-1]
-                    # logging.debug(f"  SYSEX DATA => {sysex_data}")
-                    ev = bytes(sysex_data)
+                        break
+                    ev = data[pos + 1:end + 1]
+                    i = end // 4 + 1
+                    # logging.debug(f"  SYSEX DATA => {ev}")
+                else:
+                    ev = data[pos + 1:pos + 4]
+
+                if prof:
+                    handler_ts = monotonic()
 
                 # Try to manage with a control device driver
-                if self.ctrldev_manager.midi_event(izmip, ev):
-                    self.status_midi = True
-                    self.last_event_flag = True
+                if ctrldev_midi_event(izmip, ev):
+                    if prof:
+                        prof.add_event(izmip, status, "ctrldev", read_ts, handler_ts)
+                    flag = True
                     continue
 
-                evtype = (evhead >> 4) & 0x0F
-                chan = evhead & 0x0F
-
-                # logging.info(f"MIDI EVENT: IZMIP={izmip}, TYPE={evtype}, CHAN={chan}")
+                # logging.info(f"MIDI EVENT: IZMIP={izmip}, STATUS={status:02X}")
+                handler = handlers[status]
+                if handler is None or handler(izmip, status & 0x0F, ev) is not False:
+                    flag = True
+                if prof:
+                    prof.add_event(izmip, status, handler.__name__ if handler else "unhandled", read_ts, handler_ts)
 
-                # System Messages (Common & RT)
-                if evtype == 0xF:
-                    # SysEx
-                    if chan == 0x0:
-                        continue
-                    # Clock
-                    elif chan == 0x8:
-                        self.status_midi_clock = True
-                        continue
-                    # Tick
-                    elif chan == 0x9:
-                        continue
-                    # Active Sense
-                    elif chan == 0xE:
-                        continue
-                    # Reset
-                    elif chan == 0xF:
-                        pass
-
-                # Master MIDI Channel...
-                elif chan == zynthian_gui_config.master_midi_channel:
-                    logging.info(f"MASTER MIDI MESSAGE: {ev.hex()}")
-                    # Webconf configured messages for Snapshot Control...
-                    if ev == zynthian_gui_config.master_midi_program_change_up:
-                        logging.debug("PROGRAM CHANGE UP!")
-                        self.load_snapshot_by_prog(self.snapshot_program + 1)
-                    elif ev == zynthian_gui_config.master_midi_program_change_down:
-                        logging.debug("PROGRAM CHANGE DOWN!")
-                        self.load_snapshot_by_prog(self.snapshot_program - 1)
-                    elif ev == zynthian_gui_config.master_midi_bank_change_up:
-                        logging.debug("BANK CHANGE UP!")
-                        self.set_snapshot_midi_bank(self.snapshot_bank + 1)
-                    elif ev == zynthian_gui_config.master_midi_bank_change_down:
-                        logging.debug("BANK CHANGE DOWN!")
-                        self.set_snapshot_midi_bank(self.snapshot_bank - 1)
-                    # Program Change => Snapshot Load
-                    elif evtype == 0xC:
-                        pgm = ev[1] & 0x7F
-                        logging.debug("PROGRAM CHANGE %d" % pgm)
-                        self.start_busy("load_snapshot", "loading snapshot")
-                        self.load_snapshot_by_prog(pgm)
-                        self.end_busy("load_snapshot")
-                    # Control Change...
-                    elif evtype == 0xB:
-                        ccnum = ev[1] & 0x7F
-                        ccval = ev[2] & 0x7F
-                        if ccnum == zynthian_gui_config.master_midi_bank_change_ccnum:
-                            logging.debug(f"BANK CHANGE {ccval}")
-                            self.set_snapshot_midi_bank(ccval)
-                        elif ccnum == 120:
-                            self.all_sounds_off()
-                        elif ccnum == 123:
-                            self.all_notes_off()
-                        else:
-                            if self.midi_learn_zctrl:
-                                self.chain_manager.add_midi_learn(
-                                    chan, ccnum, self.midi_learn_zctrl, izmip)
-                            else:
-                                self.zynmixer.midi_control_change(
-                                    chan, ccnum, ccval)
-                    # Master Note CUIA with ZynSwitch emulation
-                    elif evtype == 0x8 or evtype == 0x9:
-                        note = str(ev[1] & 0x7F)
-                        vel = ev[2] & 0x7F
-                        if note in zynthian_gui_config.master_midi_note_cuia:
-                            cuia_str = zynthian_gui_config.master_midi_note_cuia[note]
-                            parts = cuia_str.split(" ", 2)
-                            cuia = parts[0].lower()
-                            if len(parts) > 1:
-                                params = self.parse_cuia_params(parts[1])
-                            else:
-                                params = None
-                            # Emulate Zynswitch Push/Release with Note On/Off
-                            if cuia == "zynswitch" and len(params) == 1:
-                                if evtype == 0x8 or vel == 0:
-                                    params.append('R')
-                                else:
-                                    params.append('P')
-                                self.cuia_queue.put_nowait((cuia, params))
-                            # Or normal CUIA
-                            elif evtype == 0x9 and vel > 0:
-                                self.cuia_queue.put_nowait((cuia, params))
-
-                # Control Change...
-                elif evtype == 0xB:
-                    ccnum = ev[1] & 0x7F
-                    ccval = ev[2] & 0x7F
-                    # logging.debug("MIDI CONTROL CHANGE: CH{}, CC{} => {}".format(chan, ccnum, ccval))
-                    if ccnum < 120:
-                        if not self.midi_learn_zctrl:
-                            self.chain_manager.midi_control_change(
-                                izmip, chan, ccnum, ccval)
-                            self.zynmixer.midi_control_change(
-                                chan, ccnum, ccval)
-                            self.alsa_mixer_processor.midi_control_change(
-                                chan, ccnum, ccval)
-                            self.audio_player.midi_control_change(
-                                chan, ccnum, ccval)
-                        zynsigman.send_queued(
-                            zynsigman.S_MIDI, zynsigman.SS_MIDI_CC, izmip=izmip, chan=chan, num=ccnum, val=ccval)
-                    # Special CCs >= Channel Mode
-                    elif ccnum == 120:
-                        self.all_sounds_off_chan(chan)
-                    elif ccnum == 123:
-                        self.all_notes_off_chan(chan)
-
-                # Program Change...
-                elif evtype == 0xC:
-                    pgm = ev[1] & 0x7F
-                    logging.info(f"MIDI PROGRAM CHANGE: CH#{chan}, PRG#{pgm}")
-                    # MIDI learn SubSnapShot (ZS3)
-                    if self.midi_learn_pc is not None:
-                        # When using internal PC, ignore MIDI channel
-                        if izmip == 0xFF:
-                            self.save_zs3(f"*/{pgm}")
-                        else:
-                            self.save_zs3(f"{chan}/{pgm}")
-                        send_signal = True
-                    else:
-                        # select SubSnapShot (ZS3)
-                        if zynthian_gui_config.midi_prog_change_zs3:
-                            # When using internal PC, ignore MIDI channel
-                            if izmip == 0xFF:
-                                send_signal = self.load_zs3(f"*/{pgm}")
-                            else:
-                                send_signal = self.load_zs3(f"{chan}/{pgm}")
-                        # or select preset
-                        else:
-                            # Sends to active chain's MIDI channel when device uses ACTI mode
-                            if zynautoconnect.get_midi_in_dev_mode(izmip):
-                                chan = self.chain_manager.get_active_chain().midi_chan
-                            send_signal = self.chain_manager.set_midi_prog_preset(
-                                chan, pgm)
-                    if send_signal:
-                        zynsigman.send_queued(
-                            zynsigman.S_MIDI, zynsigman.SS_MIDI_PC, izmip=izmip, chan=chan, num=pgm)
-
-                # Note Off
-                elif evtype == 0x8:
-                    # Handle external devices only
-                    if izmip < self.get_max_num_midi_devs():
-                        zynsigman.send_queued(zynsigman.S_MIDI, zynsigman.SS_MIDI_NOTE_OFF,
-                                        izmip=izmip, chan=chan, note=ev[1] & 0x7f, vel=ev[2] & 0x7f)
-
-                # Note On
-                elif evtype == 0x9:
-                    # Handle external devices only
-                    if izmip < self.get_max_num_midi_devs():
-                        zynsigman.send_queued(zynsigman.S_MIDI, zynsigman.SS_MIDI_NOTE_ON,
-                                        izmip=izmip, chan=chan, note=ev[1] & 0x7f, vel=ev[2] & 0x7f)
-
-                # Flag MIDI event
+            # Flag MIDI event
+            if flag:
                 self.status_midi = True
                 self.last_event_flag = True
-
+            return n
         except Exception as err:
             logging.exception(err)
+            return 0
+
+    def midi_event_ignore(self, izmip, chan, ev):
+        return False
+
+    def midi_event_clock(self, izmip, chan, ev):
+        self.status_midi_clock = True
+        return False
+
+    def midi_event_master(self, izmip, chan, ev):
+        """Handle MIDI event on master MIDI channel"""
+
+        evtype = ev[0] >> 4
+        logging.info(f"MASTER MIDI MESSAGE: {ev.hex()}")
+        # Webconf configured messages for Snapshot Control...
+        if ev == zynthian_gui_config.master_midi_program_change_up:
+            logging.debug("PROGRAM CHANGE UP!")
+            self.load_snapshot_by_prog(self.snapshot_program + 1)
+        elif ev == zynthian_gui_config.master_midi_program_change_down:
+            logging.debug("PROGRAM CHANGE DOWN!")
+            self.load_snapshot_by_prog(self.snapshot_program - 1)
+        elif ev == zynthian_gui_config.master_midi_bank_change_up:
+            logging.debug("BANK CHANGE UP!")
+            self.set_snapshot_midi_bank(self.snapshot_bank + 1)
+        elif ev == zynthian_gui_config.master_midi_bank_change_down:
+            logging.debug("BANK CHANGE DOWN!")
+            self.set_snapshot_midi_bank(self.snapshot_bank - 1)
+        # Program Change => Snapshot Load
+        elif evtype == 0xC:
+            pgm = ev[1] & 0x7F
+            logging.debug("PROGRAM CHANGE %d" % pgm)
+            self.start_busy("load_snapshot", "loading snapshot")
+            self.load_snapshot_by_prog(pgm)
+            self.end_busy("load_snapshot")
+        # Control Change...
+        elif evtype == 0xB:
+            ccnum = ev[1] & 0x7F
+            ccval = ev[2] & 0x7F
+            if ccnum == zynthian_gui_config.master_midi_bank_change_ccnum:
+                logging.debug(f"BANK CHANGE {ccval}")
+                self.set_snapshot_midi_bank(ccval)
+            elif ccnum == 120:
+                self.all_sounds_off()
+            elif ccnum == 123:
+                self.all_notes_off()
+            else:
+                if self.midi_learn_zctrl:
+                    self.chain_manager.add_midi_learn(
+                        chan, ccnum, self.midi_learn_zctrl, izmip)
+                else:
+                    self.zynmixer.midi_control_change(
+                        chan, ccnum, ccval)
+        # Master Note CUIA with ZynSwitch emulation
+        elif evtype == 0x8 or evtype == 0x9:
+            note = str(ev[1] & 0x7F)
+            vel = ev[2] & 0x7F
+            if note in zynthian_gui_config.master_midi_note_cuia:
+                cuia_str = zynthian_gui_config.master_midi_note_cuia[note]
+                parts = cuia_str.split(" ", 2)
+                cuia = parts[0].lower()
+                if len(parts) > 1:
+                    params = self.parse_cuia_params(parts[1])
+                else:
+                    params = None
+                # Emulate Zynswitch Push/Release with Note On/Off
+                if cuia == "zynswitch" and len(params) == 1:
+                    if evtype == 0x8 or vel == 0:
+                        params.append('R')
+                    else:
+                        params.append('P')
+                    self.cuia_queue.put_nowait((cuia, params))
+                # Or normal CUIA
+                elif evtype == 0x9 and vel > 0:
+                    self.cuia_queue.put_nowait((cuia, params))
+
+    def midi_event_cc(self, izmip, chan, ev):
+        """Handle MIDI Control Change event"""
+
+        ccnum = ev[1] & 0x7F
+        ccval = ev[2] & 0x7F
+        # logging.debug("MIDI CONTROL CHANGE: CH{}, CC{} => {}".format(chan, ccnum, ccval))
+        if ccnum < 120:
+            if not self.midi_learn_zctrl:
+                self.chain_manager.midi_control_change(
+                    izmip, chan, ccnum, ccval)
+                self.zynmixer.midi_control_change(
+                    chan, ccnum, ccval)
+                self.alsa_mixer_processor.midi_control_change(
+                    chan, ccnum, ccval)
+                self.audio_player.midi_control_change(
+                    chan, ccnum, ccval)
+            zynsigman.send_queued(
+                zynsigman.S_MIDI, zynsigman.SS_MIDI_CC, izmip=izmip, chan=chan, num=ccnum, val=ccval)
+        # Special CCs >= Channel Mode
+        elif ccnum == 120:
+            self.all_sounds_off_chan(chan)
+        elif ccnum == 123:
+            self.all_notes_off_chan(chan)
+
+    def midi_event_pc(self, izmip, chan, ev):
+        """Handle MIDI Program Change event"""
+
+        pgm = ev[1] & 0x7F
+        logging.info(f"MIDI PROGRAM CHANGE: CH#{chan}, PRG#{pgm}")
+        # MIDI learn SubSnapShot (ZS3)
+        if self.midi_learn_pc is not None:
+            # When using internal PC, ignore MIDI channel
+            if izmip == 0xFF:
+                self.save_zs3(f"*/{pgm}")
+            else:
+                self.save_zs3(f"{chan}/{pgm}")
+            send_signal = True
+        else:
+            # select SubSnapShot (ZS3)
+            if zynthian_gui_config.midi_prog_change_zs3:
+                # When using internal PC, ignore MIDI channel
+                with zynmidiprof.handler("load_zs3", izmip):
+                    if izmip == 0xFF:
+                        send_signal = self.load_zs3(f"*/{pgm}")
+                    else:
+                        send_signal = self.load_zs3(f"{chan}/{pgm}")
+            # or select preset
+            else:
+                # Sends to active chain's MIDI channel when device uses ACTI mode
+                if zynautoconnect.get_midi_in_dev_mode(izmip):
+                    chan = self.chain_manager.get_active_chain().midi_chan
+                with zynmidiprof.handler("set_midi_prog_preset", izmip):
+                    send_signal = self.chain_manager.set_midi_prog_preset(
+                        chan, pgm)
+        if send_signal:
+            zynsigman.send_queued(
+                zynsigman.S_MIDI, zynsigman.SS_MIDI_PC, izmip=izmip, chan=chan, num=pgm)
+
+    def midi_event_note_off(self, izmip, chan, ev):
+        # Handle external devices only
+        if izmip < self.get_max_num_midi_devs():
+            zynsigman.send_queued(zynsigman.S_MIDI, zynsigman.SS_MIDI_NOTE_OFF,
+                                  izmip=izmip, chan=chan, note=ev[1] & 0x7f, vel=ev[2] & 0x7f)
+
+    def midi_event_note_on(self, izmip, chan, ev):
+        # Handle external devices only
+        if izmip < self.get_max_num_midi_devs():
+            zynsigman.send_queued(zynsigman.S_MIDI, zynsigman.SS_MIDI_NOTE_ON,
+                                  izmip=izmip, chan=chan, note=ev[1] & 0x7f, vel=ev[2] & 0x7f)
 
     # ---------------------------------------------------------------------------
     # Power Saving
@@ -930,6 +988,7 @@ class zynthian_state_manager:
 
     def set_power_save_mode(self, psm=True):
         self.power_save_mode = psm
+        zynsched.set_power_save(psm)
         if psm:
             logging.info("Power Save Mode: ON")
             self.ctrldev_manager.sleep_on()
@@ -949,8 +1008,76 @@ class zynthian_state_manager:
     # Snapshot Save & Load
     # ----------------------------------------------------------------------------
 
-    def get_state(self):
-        """Get a dictionary describing the full state model"""
+    def get_state(self, riff_b64=True, scope=None, chain_ids=None):
+        """Get a dictionary describing the state model
+
+        Only the requested parts of the state are gathered, so partial captures cost proportionally to their size.
+        The full state includes also "zs3-0" (saved as side effect), MIDI profile & audio recorder state.
+
+        riff_b64 : False to not include base64 encoded zynseq RIFF data
+        scope : List of state parts to capture (STATE_SCOPE_XXX). (Default: full state)
+        chain_ids : List of chain ids to capture in STATE_SCOPE_CHAINS. (Default: all chains)
+        Returns : State dictionary, in snapshot format
+        """
+
+        if scope is None and chain_ids is None:
+            return self.get_full_state(riff_b64)
+        if scope is None:
+            scope = STATE_SCOPE_ALL
+
+        state = {
+            'schema_version': SNAPSHOT_SCHEMA_VERSION
+        }
+
+        zs3_state = {}
+        if STATE_SCOPE_CHAINS in scope:
+            if chain_ids is None:
+                chain_ids = list(self.chain_manager.chains)
+            else:
+                chain_ids = [chain_id for chain_id in chain_ids if chain_id in self.chain_manager.chains]
+            state['chains'] = self.chain_manager.get_state(chain_ids)
+            zs3_state = self.get_zs3_state("Last state", chain_ids)
+            engine_states = {}
+            for processor in self.chain_manager.processors.values():
+                if processor.chain_id in chain_ids and processor.engine:
+                    for eid, engine in self.chain_manager.zyngines.items():
+                        if engine is processor.engine and eid not in engine_states:
+                            engine_state = engine.get_extended_config()
+                            if engine_state:
+                                engine_states[eid] = engine_state
+            if engine_states:
+                state["engine_config"] = engine_states
+
+        if STATE_SCOPE_MIXER in scope:
+            zs3_state["title"] = "Last state"
+            mixer_state = self.zynmixer.get_state(False)
+            if mixer_state:
+                zs3_state["mixer"] = mixer_state
+            if zynthian_gui_config.snapshot_mixer_settings and self.alsa_mixer_processor:
+                state['alsa_mixer'] = self.alsa_mixer_processor.get_state()
+
+        if zs3_state or STATE_SCOPE_ZS3 in scope:
+            state['zs3'] = {}
+            if zs3_state:
+                state['zs3']['zs3-0'] = zs3_state
+            if STATE_SCOPE_ZS3 in scope:
+                for zs3_id, zs3 in self.zs3.items():
+                    if zs3_id != "zs3-0":
+                        state['zs3'][zs3_id] = zs3
+                state['last_zs3_id'] = self.last_zs3_id
+
+        if STATE_SCOPE_SEQUENCER in scope and riff_b64:
+            binary_riff_data = self.zynseq.get_riff_data()
+            b64_data = base64.b64encode(binary_riff_data)
+            state['zynseq_riff_b64'] = b64_data.decode('utf-8')
+
+        return state
+
+    def get_full_state(self, riff_b64=True):
+        """Get a dictionary describing the full state model
+
+        riff_b64 : False to not include base64 encoded zynseq RIFF data
+        """
 
         self.save_zs3("zs3-0", "Last state")
         self.purge_zs3()
@@ -984,9 +1111,10 @@ class zynthian_state_manager:
             state['audio_recorder_armed'] = armed_state
 
         # Zynseq RIFF data
-        binary_riff_data = self.zynseq.get_riff_data()
-        b64_data = base64.b64encode(binary_riff_data)
-        state['zynseq_riff_b64'] = b64_data.decode('utf-8')
+        if riff_b64:
+            binary_riff_data = self.zynseq.get_riff_data()
+            b64_data = base64.b64encode(binary_riff_data)
+            state['zynseq_riff_b64'] = b64_data.decode('utf-8')
 
         return state
 
@@ -999,38 +1127,12 @@ class zynthian_state_manager:
         self.start_busy("export chain", "exporting chain")
         try:
             # Get state
-            state = self.get_state()
-            procs = []
-            for id in list(state["chains"]):
-                if id != chain_id:
-                    del state["chains"][id]
-                else:
-                    for slot in state["chains"][id]["slots"]:
-                        for proc in slot.keys():
-                            procs.append(proc)
-            for zs3 in list(state["zs3"]):
-                if zs3 != "zs3-0":
-                    del state["zs3"][zs3]
-                else:
-                    if "processors" in state["zs3"][zs3]:
-                        for proc in list(state["zs3"][zs3]["processors"]):
-                            if proc not in procs:
-                                del state["zs3"][zs3]["processors"][proc]
-                    for id in list(state["zs3"][zs3]["chains"]):
-                        if id != chain_id:
-                            del state["zs3"][zs3]["chains"][id]
-                    for key in ["global", "midi_capture", "active_chain"]:
-                        try:
-                            del state["zs3"][zs3][key]
-                        except:
-                            pass
-
-
-            for key in ["last_snapshot_fpath", "midi_profile_state", "engine_config", "audio_recorder_armed", "zynseq_riff_b64", "alsa_mixer", "zyngui"]:
-                try:
-                    del state[key]
-                except:
-                    pass
+            state = self.get_state(scope=[STATE_SCOPE_CHAINS], chain_ids=[chain_id])
+            # Engine config is shared by all chains using the engine => not exported
+            try:
+                del state["engine_config"]
+            except:
+                pass
 
             # JSON Encode
             json = JSONEncoder().encode(state)
@@ -1054,25 +1156,32 @@ class zynthian_state_manager:
     def save_snapshot(self, fpath, extra_data=None):
         """Save current state model to file
 
+        The state is captured and encoded in the calling thread. The file is written by the snapshot writer thread,
+        that signals SS_SAVE_SNAPSHOT when done. Write errors are shown from cb_snapshot_saved.
+
         fpath : Full filename and path
         extra_data : Dictionary to add to snapshot, e.g. UI specific config
-        Returns : True on success
+        Returns : True if snapshot write was queued
         """
 
         self.start_busy("save snapshot", "saving snapshot")
         try:
             # Get state
-            state = self.get_state()
+            if zynthian_gui_config.snapshot_binary_format:
+                # Binary container => raw RIFF data section
+                state = self.get_state(riff_b64=False)
+                riff_data = self.zynseq.get_riff_data()
+                if riff_data is None:
+                    # Legacy format fails too => don't save a snapshot without sequences
+                    raise RuntimeError("Can't get sequencer RIFF data")
+            else:
+                state = self.get_state()
+                riff_data = None
             if isinstance(extra_data, dict):
                 state = {**state, **extra_data}
-            # JSON Encode
-            json = JSONEncoder().encode(state)
-            with open(fpath, "w") as fh:
-                logging.info(f"Saving snapshot {fpath} ...")
-                # logging.debug(f"Snapshot JSON Data =>\n{json}")
-                fh.write(json)
-                fh.flush()
-                os.fsync(fh.fileno())
+            # Encoding freezes the state, so it can't change before being written
+            logging.info(f"Saving snapshot {fpath} ...")
+            self.snapshot_writer.write(fpath, zynthian_snapshot_file.encode_snapshot(state, riff_data))
         except Exception as e:
             logging.exception(traceback.format_exc())
             logging.error("Can't save snapshot file '%s': %s" % (fpath, e))
@@ -1081,10 +1190,29 @@ class zynthian_state_manager:
             self.end_busy("save snapshot")
             return False
 
-        self.last_snapshot_fpath = fpath
         self.end_busy("save snapshot")
         return True
 
+    def cb_snapshot_saved(self, fpath, success):
+        """Called by snapshot writer thread when a snapshot file has been written
+
+        fpath : Full filename and path
+        success : True if file was written successfully
+        """
+
+        if success:
+            self.last_snapshot_fpath = fpath
+            self.snapshot_catalog.update_snapshot(fpath)
+            if fpath == self.last_state_snapshot_fpath and not self.snapshot_writer.is_pending(fpath):
+                zynjournal.end_compaction(self.last_state_journal_seq)
+        zynsigman.send_queued(zynsigman.S_STATE_MAN, self.SS_SAVE_SNAPSHOT, fpath=fpath, success=success)
+        if not success:
+            # Show error in UI, as it was when snapshot was written by save_snapshot
+            self.start_busy("save snapshot error", "saving snapshot")
+            self.set_busy_error("ERROR saving snapshot", fpath)
+            sleep(2)
+            self.end_busy("save snapshot error")
+
     def load_snapshot(self, fpath, load_chains=True, load_sequences=True, merge=False):
         """Loads a snapshot from file
 
@@ -1095,20 +1223,33 @@ class zynthian_state_manager:
         """
 
         self.start_busy("load snapshot", "loading snapshot")
+        zynloadprof.begin("snapshot", fpath=fpath)
+        self.snapshot_writer.wait(fpath)
+        self.wait_preload_snapshot()
         try:
-            with open(fpath, "r") as fh:
-                json = fh.read()
-                logging.info(f"Loading snapshot '{fpath}' ...")
-                # logging.debug(f"Snapshot JSON Data =>\n{json}")
-        except Exception as e:
+            logging.info(f"Loading snapshot '{fpath}' ...")
+            with zynloadprof.phase(zynloadprof.PH_JSON_DECODE):
+                snapshot, riff_data = zynthian_snapshot_file.read_snapshot(fpath, load_sequences)
+        except OSError as e:
             logging.error("Can't load snapshot '%s': %s" % (fpath, e))
+            zynloadprof.end()
+            self.end_busy("load snapshot")
+            return None
+        except Exception as e:
+            logging.exception("Invalid snapshot: %s" % e)
+            self.set_busy_error("ERROR: Invalid snapshot", e)
+            sleep(2)
+            zynloadprof.end()
             self.end_busy("load snapshot")
             return None
 
+        # Loaded state is not journaled => it is saved by journal compaction
+        zynjournal.pause()
         mute = self.zynmixer.get_mute(self.zynmixer.MAX_NUM_CHANNELS - 1)
         try:
-            snapshot = JSONDecoder().decode(json)
-            state = self.fix_snapshot(snapshot)
+            self.snapshot_catalog.update_snapshot(fpath, snapshot, loaded=True)
+            with zynloadprof.phase(zynloadprof.PH_LEGACY_FIX):
+                state = self.fix_snapshot(snapshot)
 
             if load_chains:
                 # Mute output to avoid unwanted noises
@@ -1129,6 +1270,8 @@ class zynthian_state_manager:
                                 del state[key]
                             except:
                                 pass
+                        # Binary RIFF section is not merged either, as zynseq_riff_b64
+                        riff_data = None
                         # Need to reassign chains and processor ids
                         chain_map = {}  # Map of new chain id indexed by old id
                         proc_map = {}   # Map of new processor id indexed by old id
@@ -1197,8 +1340,9 @@ class zynthian_state_manager:
                         except:
                             pass
 
-                    self.chain_manager.set_state(
-                        state['chains'], engine_config, merge)
+                    with zynloadprof.phase(zynloadprof.PH_CHAINS):
+                        self.chain_manager.set_state(
+                            state['chains'], engine_config, merge)
                 self.chain_manager.stop_unused_engines()
                 zynautoconnect.resume()
 
@@ -1209,6 +1353,7 @@ class zynthian_state_manager:
                 zs3 = self.sanitize_zs3_from_json(state["zs3"])
                 if not merge:
                     self.zs3 = zs3
+                    self.invalidate_zs3_plans()
                 self.load_zs3(zs3["zs3-0"], autoconnect=False)
                 try:
                     mute |= self.zs3["zs3-0"]["mixer"]["chan_16"]["mute"]
@@ -1216,7 +1361,8 @@ class zynthian_state_manager:
                     pass
 
                 if "alsa_mixer" in state:
-                    self.alsa_mixer_processor.set_state(state["alsa_mixer"])
+                    with zynloadprof.phase(zynloadprof.PH_MIXER_RESTORE):
+                        self.alsa_mixer_processor.set_state(state["alsa_mixer"])
 
                 if "audio_recorder_armed" in state:
                     for midi_chan in range(self.zynmixer.MAX_NUM_CHANNELS):
@@ -1228,10 +1374,13 @@ class zynthian_state_manager:
                 if "midi_profile_state" in state:
                     self.set_midi_profile_state(state["midi_profile_state"])
 
-            if load_sequences and "zynseq_riff_b64" in state:
-                b64_bytes = state["zynseq_riff_b64"].encode("utf-8")
-                binary_riff_data = base64.decodebytes(b64_bytes)
-                self.zynseq.restore_riff_data(binary_riff_data)
+            with zynloadprof.phase(zynloadprof.PH_SEQUENCER_RESTORE):
+                if load_sequences and riff_data is not None:
+                    self.zynseq.restore_riff_data(riff_data)
+                elif load_sequences and "zynseq_riff_b64" in state:
+                    b64_bytes = state["zynseq_riff_b64"].encode("utf-8")
+                    binary_riff_data = base64.decodebytes(b64_bytes)
+                    self.zynseq.restore_riff_data(binary_riff_data)
 
             if fpath == self.last_snapshot_fpath and "last_state_fpath" in state:
                 self.last_snapshot_fpath = state["last_snapshot_fpath"]
@@ -1250,28 +1399,99 @@ class zynthian_state_manager:
             self.set_busy_error("ERROR: Invalid snapshot", e)
             sleep(2)
 
-        zynautoconnect.request_midi_connect()
-        zynautoconnect.request_audio_connect(True)
+        with zynloadprof.phase(zynloadprof.PH_AUTOCONNECT):
+            zynautoconnect.request_midi_connect()
+            zynautoconnect.request_audio_connect(True)
 
         # Restore mute state
         self.zynmixer.set_mute(self.zynmixer.MAX_NUM_CHANNELS - 1, mute)
+        zynjournal.resume()
+        if fpath != self.last_state_snapshot_fpath:
+            zynjournal.request_compaction()
 
         # Signal snapshot loading
         zynsigman.send_queued(zynsigman.S_STATE_MAN, self.SS_LOAD_SNAPSHOT)
+        zynloadprof.end()
+
+        # Warm standby => start engines of next snapshot in bank
+        if state is not None and load_chains and not merge and zynthian_gui_config.snapshot_preload_next \
+                and fpath != self.last_state_snapshot_fpath:
+            self.preload_snapshot()
 
         self.end_busy("load snapshot")
         return state
 
+    def preload_snapshot(self, fpath=None):
+        """Start the engines required by a snapshot in the background
+
+        Engines are kept in standby, not routed and muted, until the snapshot is loaded.
+        Then load_snapshot reuses them and only chains, routing & mixer state must be restored.
+
+        fpath : Full path and filename of snapshot file (Default: next snapshot in current bank)
+        Returns : True if preloading started
+        """
+
+        if fpath is None:
+            fpath = self.get_next_snapshot_fpath()
+            if fpath is None:
+                return False
+        self.wait_preload_snapshot()
+        # Chains & engines are changed by this thread => pass a copy to preload thread
+        usage = self.chain_manager.get_engine_usage()
+        self.preload_thread = Thread(target=self.preload_snapshot_task, args=(fpath, usage))
+        self.preload_thread.name = "Preload snapshot"
+        self.preload_thread.daemon = True  # thread dies with the program
+        self.preload_thread.start()
+        return True
+
+    def preload_snapshot_task(self, fpath, usage):
+        """Thread task that starts the engines required by a snapshot
+
+        fpath : Full path and filename of snapshot file
+        usage : Copy of engines in use, as returned by chain_manager.get_engine_usage
+        """
+
+        logging.info(f"Preloading snapshot '{fpath}' ...")
+        try:
+            snapshot, riff_data = zynthian_snapshot_file.read_snapshot(fpath, False)
+            state = self.fix_snapshot(snapshot)
+            if "chains" in state:
+                self.chain_manager.preload_engines(state["chains"], usage)
+        except Exception as e:
+            logging.error(f"Can't preload snapshot '{fpath}' => {e}")
+
+    def wait_preload_snapshot(self):
+        """Wait for the snapshot preload thread to finish, if running"""
+
+        if self.preload_thread:
+            if self.preload_thread.is_alive():
+                self.set_busy_details("waiting for preloaded engines")
+                self.preload_thread.join()
+            self.preload_thread = None
+
+    def get_next_snapshot_fpath(self):
+        """Get the snapshot following the last loaded snapshot in the current bank
+
+        Returns : Full path and filename of snapshot file or None if no next snapshot
+        """
+
+        if self.snapshot_bank is None:
+            return None
+        fpaths = [fpath for fpath, entry in self.snapshot_catalog.get_snapshots(self.snapshot_bank)]
+        try:
+            return fpaths[fpaths.index(self.last_snapshot_fpath) + 1]
+        except (ValueError, IndexError):
+            return None
+
     def set_snapshot_midi_bank(self, bank):
         """Set the current snapshot bank
 
         bank: Snapshot bank (0..127)
         """
 
-        for bank in glob(f"{self.snapshot_dir}/{bank:03d}*"):
-            if isdir(bank):
-                self.snapshot_bank = basename(bank)
-                return
+        bank_name = self.snapshot_catalog.get_bank_by_number(bank)
+        if bank_name is not None:
+            self.snapshot_bank = bank_name
 
     def load_snapshot_by_prog(self, program, bank=None):
         """Loads a snapshot from its MIDI program and bank
@@ -1285,9 +1505,9 @@ class zynthian_state_manager:
             bank = self.snapshot_bank
         if bank is None:
             return  # Don't load snapshot if invalid bank selected
-        files = glob(f"{self.snapshot_dir}/{bank}/{program:03d}-*.zss")
-        if files:
-            self.load_snapshot(files[0])
+        fpath = self.snapshot_catalog.get_snapshot_by_prog(bank, program)
+        if fpath:
+            self.load_snapshot(fpath)
             return True
         return False
 
@@ -1309,6 +1529,7 @@ class zynthian_state_manager:
     def backup_snapshot(self, path):
         """Make a backup copy of a snapshot file"""
 
+        self.snapshot_writer.wait(path)
         if isfile(path):
             dpath = dirname(path)
             fbase, fext = splitext(basename(path))
@@ -1326,17 +1547,89 @@ class zynthian_state_manager:
             return self.load_snapshot(self.default_snapshot_fpath)
 
     def save_last_state_snapshot(self):
-        self.save_snapshot(self.last_state_snapshot_fpath)
+        """Save last state snapshot
+
+        If the state journal is enabled, this compacts the journal.
+        Returns : True on success
+        """
+
+        if not zynjournal.enabled:
+            return self.save_snapshot(self.last_state_snapshot_fpath)
+        journal_seq = zynjournal.begin_compaction()
+        # Records covered by the saved snapshot are removed from journal when the file is written.
+        # Set before queuing the write, so the writer callback can't see the previous sequence number.
+        prev_journal_seq = self.last_state_journal_seq
+        self.last_state_journal_seq = journal_seq
+        if not self.save_snapshot(self.last_state_snapshot_fpath, {"journal_seq": journal_seq}):
+            self.last_state_journal_seq = prev_journal_seq
+            zynjournal.request_compaction()
+            return False
+        return True
 
     def load_last_state_snapshot(self):
+        """Load last state snapshot and replay the state journal over it
+
+        Returns : State dictionary or None on failure
+        """
+
+        state = None
         if isfile(self.last_state_snapshot_fpath):
-            return self.load_snapshot(self.last_state_snapshot_fpath)
+            state = self.load_snapshot(self.last_state_snapshot_fpath)
+        if zynthian_gui_config.last_state_journal:
+            zynjournal.stop()
+            if state and "journal_seq" in state:
+                self.replay_state_journal(state["journal_seq"])
+            else:
+                zynjournal.reset()
+            zynjournal.start(self.zynmixer)
+        return state
 
     def delete_last_state_snapshot(self):
+        # Pending write would recreate the file
+        self.snapshot_writer.cancel(self.last_state_snapshot_fpath)
         try:
             os.remove(self.last_state_snapshot_fpath)
         except:
             pass
+        zynjournal.reset()
+
+    # ----------------------------------------------------------------------------
+    # State journal
+    # ----------------------------------------------------------------------------
+
+    def replay_state_journal(self, journal_seq):
+        """Apply journaled controller & preset changes over loaded last state
+
+        journal_seq : Sequence number of last journal record covered by last state snapshot
+        """
+
+        records = zynjournal.get_replay_records(journal_seq)
+        if not records:
+            return
+        logging.info(f"Replaying {len(records)} state journal records ...")
+        zynjournal.pause()
+        for rec in records:
+            try:
+                if rec["t"] == REC_PROCESSOR:
+                    zctrl = self.chain_manager.processors[rec["i"]].controllers_dict[rec["s"]]
+                elif rec["t"] == REC_MIXER:
+                    zctrl = self.zynmixer.zctrls[rec["i"]][rec["s"]]
+                elif rec["t"] == REC_PRESET:
+                    self.chain_manager.processors[rec["i"]].set_bank_preset_state(rec["v"])
+                    continue
+                else:
+                    continue
+                zctrl.set_value(rec["v"], True)
+            except Exception as e:
+                logging.warning(f"Can't replay state journal record {rec} => {e}")
+        zynjournal.resume()
+
+    def check_state_journal(self):
+        """Compact state journal when idle (called periodically by scheduler)"""
+
+        if zynjournal.enabled and not self.is_busy() and zynjournal.needs_compaction(STATE_JOURNAL_IDLE_TIME):
+            logging.debug("Compacting state journal ...")
+            self.save_last_state_snapshot()
 
     # ----------------------------------------------------------------------------
     # ZS3 management
@@ -1369,6 +1662,7 @@ class zynthian_state_manager:
             tstate["restore"] = not tstate["restore"]
         except:
             tstate["restore"] = False
+        self.invalidate_zs3_plans(zs3_id)
 
     def load_zs3(self, zs3_id, autoconnect=True):
         """Restore a ZS3
@@ -1389,6 +1683,10 @@ class zynthian_state_manager:
                 except:
                     logging.info(f"Not found ZS3 matching '{zs3_id}'")
                     return False
+            try:
+                plan = self.zs3_plans[zs3_id]
+            except KeyError:
+                plan = self.zs3_plans[zs3_id] = self.compile_zs3_plan(zs3_state)
         else:
             try:
                 zs3_state = zs3_id
@@ -1397,12 +1695,46 @@ class zynthian_state_manager:
                     zs3_id = "zs3-0"
             except:
                 zs3_id = "zs3-0"
+            plan = self.compile_zs3_plan(zs3_state)
+
+        zynloadprof.begin("zs3", zs3_id=zs3_id)
+        try:
+            routing_changed = self.run_zs3_plan(plan)
+
+            if zs3_id != 'zs3-0':
+                self.last_zs3_id = zs3_id
+                #self.zs3['zs3-0'] = self.zs3[zs3_id].copy()
+            zynsigman.send(zynsigman.S_STATE_MAN, self.SS_LOAD_ZS3, zs3_id=zs3_id)
+
+            if autoconnect and routing_changed:
+                with zynloadprof.phase(zynloadprof.PH_AUTOCONNECT):
+                    zynautoconnect.request_midi_connect(True)
+                    zynautoconnect.request_audio_connect(True)
+        finally:
+            zynloadprof.end()
+        return True
+
+    def compile_zs3_plan(self, zs3_state):
+        """Build a ZS3 recall plan
+
+        Resolves chains, processors & controllers referenced by the ZS3 state,
+        so recalling doesn't need to parse the state model again.
+        zs3_state : ZS3 state dictionary
+        Returns : Recall plan dictionary
+        """
+
+        plan = {
+            "chains": [],  # List of (chain, midi_chan, zmop_opts, routing, mute)
+            "processors": [],  # List of (processor, controllers_dict, proc_state, zctrl_values)
+            "midi_cc": [],  # List of (processor, controllers_dict, cc, symbol, zctrl)
+            "active_chain": None,
+            "mixer": None,
+            "midi_capture": None,
+            "global": None
+        }
 
         restored_chains = []
-        restored_cc_mapping = []
-        mute_pause = False
         if "chains" in zs3_state:
-            self.set_busy_details("restoring chains state")
             for chain_id, chain_state in zs3_state["chains"].items():
                 chain_id = int(chain_id)
 
@@ -1421,83 +1753,72 @@ class zynthian_state_manager:
                     continue
 
                 try:
-                    if zs3_state["mixer"][f"chan_{chain.mixer_chan:02}"]["mute"]:
-                        # Avoid subsequent config changes from being heard on muted chains
-                        self.zynmixer.set_mute(chain.mixer_chan, 1)
-                        mute_pause = True
+                    mute = bool(zs3_state["mixer"][f"chan_{chain.mixer_chan:02}"]["mute"])
                 except:
-                    pass
+                    mute = False
 
                 if "midi_chan" in chain_state:
-                    if chain.midi_chan is not None and chain.midi_chan != chain_state['midi_chan']:
-                        self.chain_manager.set_midi_chan(chain_id, chain_state['midi_chan'])
+                    midi_chan = chain_state["midi_chan"]
+                else:
+                    midi_chan = None
 
+                # List of (getter, setter, value) for ZMOP options
+                zmop_opts = []
                 if chain.zmop_index is not None:
-                    if "note_low" in chain_state:
-                        lib_zyncore.zmop_set_note_low(chain.zmop_index, chain_state["note_low"])
-                    else:
-                        lib_zyncore.zmop_set_note_low(chain.zmop_index, 0)
-                    if "note_high" in chain_state:
-                        lib_zyncore.zmop_set_note_high(chain.zmop_index, chain_state["note_high"])
-                    else:
-                        lib_zyncore.zmop_set_note_high(chain.zmop_index, 127)
-                    if "transpose_octave" in chain_state:
-                        lib_zyncore.zmop_set_transpose_octave(chain.zmop_index, chain_state["transpose_octave"])
-                    else:
-                        lib_zyncore.zmop_set_transpose_octave(chain.zmop_index, 0)
-                    if "transpose_semitone" in chain_state:
-                        lib_zyncore.zmop_set_transpose_semitone(chain.zmop_index, chain_state["transpose_semitone"])
-                    else:
-                        lib_zyncore.zmop_set_transpose_semitone(
-                            chain.zmop_index, 0)
-                if "midi_in" in chain_state:
-                    chain.midi_in = chain_state["midi_in"]
-                if "midi_out" in chain_state:
-                    chain.midi_out = chain_state["midi_out"]
-                if "midi_thru" in chain_state:
-                    chain.midi_thru = chain_state["midi_thru"]
-                if "audio_in" in chain_state:
-                    chain.audio_in = chain_state["audio_in"]
-                chain.audio_out = []
+                    for key, default, get_zmop_opt, set_zmop_opt in (
+                            ("note_low", 0, lib_zyncore.zmop_get_note_low, lib_zyncore.zmop_set_note_low),
+                            ("note_high", 127, lib_zyncore.zmop_get_note_high, lib_zyncore.zmop_set_note_high),
+                            ("transpose_octave", 0, lib_zyncore.zmop_get_transpose_octave, lib_zyncore.zmop_set_transpose_octave),
+                            ("transpose_semitone", 0, lib_zyncore.zmop_get_transpose_semitone, lib_zyncore.zmop_set_transpose_semitone)):
+                        if key in chain_state:
+                            zmop_opts.append((get_zmop_opt, set_zmop_opt, chain_state[key]))
+                        else:
+                            zmop_opts.append((get_zmop_opt, set_zmop_opt, default))
+
+                routing = {}
+                for key in ("midi_in", "midi_out", "midi_thru", "audio_in", "audio_thru"):
+                    if key in chain_state:
+                        routing[key] = chain_state[key]
+                routing["audio_out"] = []
                 if "audio_out" in chain_state:
                     for out in chain_state["audio_out"]:
                         try:
-                            chain.audio_out.append(f"{self.chain_manager.processors[out[0]].jackname}:{out[1]}")
+                            routing["audio_out"].append(f"{self.chain_manager.processors[out[0]].jackname}:{out[1]}")
                         except:
-                            chain.audio_out.append(out)
+                            routing["audio_out"].append(out)
+
+                plan["chains"].append((chain, midi_chan, zmop_opts, routing, mute))
 
-                if "audio_thru" in chain_state:
-                    chain.audio_thru = chain_state["audio_thru"]
-                chain.rebuild_graph()
                 if "midi_cc" in chain_state:
                     for cc, cfg in chain_state["midi_cc"].items():
                         for proc_id, symbol in cfg:
                             if proc_id in self.chain_manager.processors:
-                                restored_cc_mapping.append((proc_id, int(cc), symbol))
-        if mute_pause:
-            # Wait for soft mutes to apply before changing settings
-            sleep(self.jack_period)
+                                processor = self.chain_manager.processors[proc_id]
+                                plan["midi_cc"].append((processor, processor.controllers_dict, int(cc), symbol,
+                                                        processor.controllers_dict.get(symbol)))
 
         if "processors" in zs3_state:
             for proc_id, proc_state in zs3_state["processors"].items():
                 try:
                     processor = self.chain_manager.processors[int(proc_id)]
-                    if processor.chain_id in restored_chains:
-                        self.set_busy_details(f"restoring {processor.get_basepath()} state")
-                        processor.set_state(proc_state)
                 except Exception as e:
                     logging.error(f"Failed to restore processor {proc_id} state => {e}")
-
-        for cc_map in restored_cc_mapping:
-            processor = self.chain_manager.processors[cc_map[0]]
-            try:
-                zctrl = processor.controllers_dict[cc_map[2]]
-                self.chain_manager.add_midi_learn(processor.midi_chan, cc_map[1], zctrl)
-            except:
-                logging.warning(f"Failed to restore MIDI learning {cc_map[1]} => {cc_map[2]}")
+                    continue
+                if processor.chain_id not in restored_chains:
+                    continue
+                # List of (zctrl, value, midi_cc_momentary_switch)
+                zctrl_values = []
+                if "controllers" in proc_state:
+                    for symbol, ctrl_state in proc_state["controllers"].items():
+                        try:
+                            zctrl = processor.controllers_dict[symbol]
+                        except KeyError:
+                            continue
+                        zctrl_values.append((zctrl, ctrl_state.get("value"), ctrl_state.get("midi_cc_momentary_switch")))
+                plan["processors"].append((processor, processor.controllers_dict, proc_state, zctrl_values))
 
         if "active_chain" in zs3_state:
-            self.chain_manager.set_active_chain_by_id(zs3_state["active_chain"])
+            plan["active_chain"] = zs3_state["active_chain"]
 
         if "mixer" in zs3_state:
             try:
@@ -1505,31 +1826,118 @@ class zynthian_state_manager:
             except:
                 restore_flag = True
             if restore_flag:
-                self.set_busy_details("restoring mixer state")
-                self.zynmixer.set_state(zs3_state["mixer"])
+                plan["mixer"] = zs3_state["mixer"]
 
         if "midi_capture" in zs3_state:
-            self.set_busy_details("restoring midi capture state")
-            self.set_midi_capture_state(zs3_state['midi_capture'])
+            plan["midi_capture"] = zs3_state["midi_capture"]
 
         if "global" in zs3_state:
-            if "midi_transpose" in zs3_state["global"]:
-                lib_zyncore.set_global_transpose(int(zs3_state["global"]["midi_transpose"]))
-            if "zctrl_x" in zs3_state["global"]:
+            plan["global"] = zs3_state["global"]
+
+        return plan
+
+    def run_zs3_plan(self, plan):
+        """Execute a ZS3 recall plan, applying only what differs from current state
+
+        plan : Recall plan dictionary, as returned by compile_zs3_plan()
+        Returns : True if chain routing changed
+        """
+
+        mute_pause = False
+        routing_changed = False
+        if plan["chains"]:
+            self.set_busy_details("restoring chains state")
+        for chain, midi_chan, zmop_opts, routing, mute in plan["chains"]:
+            # Avoid subsequent config changes from being heard on muted chains
+            if mute and not self.zynmixer.get_mute(chain.mixer_chan):
+                self.zynmixer.set_mute(chain.mixer_chan, 1)
+                mute_pause = True
+
+            if midi_chan is not None and chain.midi_chan is not None and chain.midi_chan != midi_chan:
+                self.chain_manager.set_midi_chan(chain.chain_id, midi_chan)
+
+            # Only write ZMOP options that differ from current router config
+            if chain.zmop_index is not None:
+                for get_zmop_opt, set_zmop_opt, value in zmop_opts:
+                    if get_zmop_opt(chain.zmop_index) != value:
+                        set_zmop_opt(chain.zmop_index, value)
+
+            # Only rebuild chain graph if routing changed
+            chain_routing_changed = False
+            for key, value in routing.items():
+                if getattr(chain, key) != value:
+                    setattr(chain, key, value)
+                    chain_routing_changed = True
+            if chain_routing_changed:
+                chain.rebuild_graph()
+                routing_changed = True
+
+        if mute_pause:
+            # Wait for soft mutes to apply before changing settings
+            sleep(self.jack_period)
+
+        for processor, controllers_dict, proc_state, zctrl_values in plan["processors"]:
+            try:
+                self.set_busy_details(f"restoring {processor.get_basepath()} state")
+                if processor.controllers_dict is controllers_dict:
+                    processor.set_bank_preset_state_diff(proc_state)
+                # Engine rebuilt controllers since plan was compiled => resolve by symbol
+                if processor.controllers_dict is not controllers_dict:
+                    processor.set_state_diff(proc_state)
+                    continue
+                with zynloadprof.phase(zynloadprof.PH_CONTROLLER_RESTORE, processor.get_profile_name()):
+                    for zctrl, value, momentary in zctrl_values:
+                        if value is not None and value != zctrl.value:
+                            zctrl.set_value(value, True)
+                        if momentary is not None:
+                            zctrl.midi_cc_momentary_switch = momentary
+            except Exception as e:
+                logging.error(f"Failed to restore processor {processor.id} state => {e}")
+
+        for processor, controllers_dict, cc, symbol, zctrl in plan["midi_cc"]:
+            try:
+                if processor.controllers_dict is not controllers_dict or zctrl is None:
+                    zctrl = processor.controllers_dict[symbol]
+                # Skip MIDI learning already bound to this chain & CC
+                if processor.chain_id is not None:
+                    key = (processor.chain_id << 16) | (cc << 8)
+                    if zctrl in self.chain_manager.chain_midi_cc_binding.get(key, []):
+                        continue
+                self.chain_manager.add_midi_learn(processor.midi_chan, cc, zctrl)
+            except:
+                logging.warning(f"Failed to restore MIDI learning {cc} => {symbol}")
+
+        if plan["active_chain"] is not None:
+            self.chain_manager.set_active_chain_by_id(plan["active_chain"])
+
+        if plan["mixer"] is not None:
+            self.set_busy_details("restoring mixer state")
+            with zynloadprof.phase(zynloadprof.PH_MIXER_RESTORE):
+                self.zynmixer.set_state(plan["mixer"])
+
+        if plan["midi_capture"] is not None:
+            self.set_busy_details("restoring midi capture state")
+            self.set_midi_capture_state(plan["midi_capture"])
+
+        global_state = plan["global"]
+        if global_state is not None:
+            if "midi_transpose" in global_state:
+                lib_zyncore.set_global_transpose(int(global_state["midi_transpose"]))
+            if "zctrl_x" in global_state:
                 try:
-                    processor = self.chain_manager.processors[zs3_state["global"]["zctrl_x"][0]]
-                    self.zctrl_x = processor.controllers_dict[zs3_state["global"]["zctrl_x"][1]]
+                    processor = self.chain_manager.processors[global_state["zctrl_x"][0]]
+                    self.zctrl_x = processor.controllers_dict[global_state["zctrl_x"][1]]
                 except:
                     self.zctrl_x = None
-            if "zctrl_y" in zs3_state["global"]:
+            if "zctrl_y" in global_state:
                 try:
-                    processor = self.chain_manager.processors[zs3_state["global"]["zctrl_y"][0]]
-                    self.zctrl_y = processor.controllers_dict[zs3_state["global"]["zctrl_y"][1]]
+                    processor = self.chain_manager.processors[global_state["zctrl_y"][0]]
+                    self.zctrl_y = processor.controllers_dict[global_state["zctrl_y"][1]]
                 except:
                     self.zctrl_y = None
-            if "zynaptik" in zs3_state["global"]:
+            if "zynaptik" in global_state:
                 try:
-                    zynaptik_config = zs3_state["global"]["zynaptik"]
+                    zynaptik_config = global_state["zynaptik"]
                     lib_zyncore.zynaptik_cvin_set_volts_octave(ctypes.c_float(zynaptik_config["cvin_volts_octave"]))
                     lib_zyncore.zynaptik_cvin_set_note0(zynaptik_config["cvin_note0"])
                     lib_zyncore.zynaptik_cvout_set_volts_octave(ctypes.c_float(zynaptik_config["cvout_volts_octave"]))
@@ -1537,56 +1945,39 @@ class zynthian_state_manager:
                 except:
                     pass
 
-        if zs3_id != 'zs3-0':
-            self.last_zs3_id = zs3_id
-            #self.zs3['zs3-0'] = self.zs3[zs3_id].copy()
-        zynsigman.send(zynsigman.S_STATE_MAN, self.SS_LOAD_ZS3, zs3_id=zs3_id)
-
-        if autoconnect:
-            zynautoconnect.request_midi_connect(True)
-            zynautoconnect.request_audio_connect(True)
-        return True
+        return routing_changed
 
-    def save_zs3(self, zs3_id=None, title=None):
-        """Store current state as ZS3
+    def invalidate_zs3_plans(self, zs3_id=None):
+        """Discard compiled ZS3 recall plans
 
-        zs3_id : ID of zs3 to save / overwrite (Default: Create new id)
-        title : ZS3 title (Default: Create new title)
+        zs3_id : ID of ZS3 whose plan is discarded (Default: all plans)
         """
 
         if zs3_id is None:
-            # Get next id and name
-            used_ids = []
-            for zid in self.zs3:
-                if zid.startswith("zs3-"):
-                    try:
-                        used_ids.append(int(zid.split('-')[1]))
-                    except:
-                        pass
-            used_ids.sort()
-            # Get next free zs3 id
-            for index in range(1, len(used_ids) + 2):
-                if index not in used_ids:
-                    zs3_id = f"zs3-{index}"
-                    break
+            self.zs3_plans.clear()
+        else:
+            self.zs3_plans.pop(zs3_id, None)
 
-        if title is None:
-            title = self.midi_learn_pc
+    def get_zs3_state(self, title, chain_ids=None):
+        """Get a ZS3 describing current state
 
-        if not title:
-            if zs3_id in self.zs3:
-                title = self.zs3[zs3_id]['title']
-            else:
-                title = zs3_id.upper()
+        title : ZS3 title
+        chain_ids : List of chain ids to capture (Default: all chains & global state)
+        Returns : ZS3 state dictionary
+        """
 
         # Initialise zs3
-        self.zs3[zs3_id] = {
-            "title": title,
-            "active_chain": self.chain_manager.active_chain_id,
-            "global": {}
+        zs3_state = {
+            "title": title
         }
+        if chain_ids is None:
+            zs3_state["active_chain"] = self.chain_manager.active_chain_id
+            zs3_state["global"] = {}
+            chains = self.chain_manager.chains
+        else:
+            chains = {chain_id: self.chain_manager.chains[chain_id] for chain_id in chain_ids}
         chain_states = {}
-        for chain_id, chain in self.chain_manager.chains.items():
+        for chain_id, chain in chains.items():
             chain_state = {
                 "midi_chan": chain.midi_chan
             }
@@ -1637,11 +2028,13 @@ class zynthian_state_manager:
             if chain_state:
                 chain_states[chain_id] = chain_state
         if chain_states:
-            self.zs3[zs3_id]["chains"] = chain_states
+            zs3_state["chains"] = chain_states
 
         # Add processors
         processor_states = {}
         for id, processor in self.chain_manager.processors.items():
+            if chain_ids is not None and processor.chain_id not in chains:
+                continue
             processor_state = {
                 "bank_info": processor.bank_info,
                 "preset_info": processor.preset_info,
@@ -1651,31 +2044,38 @@ class zynthian_state_manager:
             for symbol, zctrl in processor.controllers_dict.items():
                 processor_state["controllers"][symbol] = zctrl.get_state()
             processor_states[id] = processor_state
-        if processor_states:
-            self.zs3[zs3_id]["processors"] = processor_states
+        # Scoped states (e.g. exported chain) always include processors, as expected when merging snapshots
+        if processor_states or chain_ids is not None:
+            zs3_state["processors"] = processor_states
 
         # Add mixer state
-        mixer_state = self.zynmixer.get_state(False)
+        if chain_ids is None:
+            mixer_state = self.zynmixer.get_state(False)
+        else:
+            mixer_state = self.zynmixer.get_state(False, [chain.mixer_chan for chain in chains.values() if chain.mixer_chan is not None])
         if mixer_state:
-            self.zs3[zs3_id]["mixer"] = mixer_state
+            zs3_state["mixer"] = mixer_state
+
+        if chain_ids is not None:
+            return zs3_state
 
         # Add MIDI capture state
         mcstate = self.get_midi_capture_state()
         if mcstate:
-            self.zs3[zs3_id]["midi_capture"] = mcstate
+            zs3_state["midi_capture"] = mcstate
 
         # Add global parameters
-        self.zs3[zs3_id]["global"]["midi_transpose"] = lib_zyncore.get_global_transpose()
+        zs3_state["global"]["midi_transpose"] = lib_zyncore.get_global_transpose()
         try:
             processor_id = self.zctrl_x.processor.id
             symbol = self.zctrl_x.symbol
-            self.zs3[zs3_id]["global"]["zctrl_x"] = [processor_id, symbol]
+            zs3_state["global"]["zctrl_x"] = [processor_id, symbol]
         except:
             pass
         try:
             processor_id = self.zctrl_y.processor.id
             symbol = self.zctrl_y.symbol
-            self.zs3[zs3_id]["global"]["zctrl_y"] = [processor_id, symbol]
+            zs3_state["global"]["zctrl_y"] = [processor_id, symbol]
         except:
             pass
         try:
@@ -1688,10 +2088,49 @@ class zynthian_state_manager:
                     "cvout_volts_octave": lib_zyncore.zynaptik_cvout_get_volts_octave(),
                     "cvout_note0": lib_zyncore.zynaptik_cvout_get_note0()
                 }
-                self.zs3[zs3_id]["global"]["zynaptik"] = zynaptik_config
+                zs3_state["global"]["zynaptik"] = zynaptik_config
         except:
             pass
 
+        return zs3_state
+
+    def save_zs3(self, zs3_id=None, title=None):
+        """Store current state as ZS3
+
+        zs3_id : ID of zs3 to save / overwrite (Default: Create new id)
+        title : ZS3 title (Default: Create new title)
+        """
+
+        if zs3_id is None:
+            # Get next id and name
+            used_ids = []
+            for zid in self.zs3:
+                if zid.startswith("zs3-"):
+                    try:
+                        used_ids.append(int(zid.split('-')[1]))
+                    except:
+                        pass
+            used_ids.sort()
+            # Get next free zs3 id
+            for index in range(1, len(used_ids) + 2):
+                if index not in used_ids:
+                    zs3_id = f"zs3-{index}"
+                    break
+
+        if title is None:
+            title = self.midi_learn_pc
+
+        if not title:
+            if zs3_id in self.zs3:
+                title = self.zs3[zs3_id]['title']
+            else:
+                title = zs3_id.upper()
+
+        self.zs3[zs3_id] = self.get_zs3_state(title)
+
+        # Precompile recall plan
+        self.zs3_plans[zs3_id] = self.compile_zs3_plan(self.zs3[zs3_id])
+
         if zs3_id != 'zs3-0':
             self.last_zs3_id = zs3_id
             # Jofemodo: this has not sense from my POV
@@ -1705,6 +2144,7 @@ class zynthian_state_manager:
         """
         try:
             del (self.zs3[zs3_id])
+            self.invalidate_zs3_plans(zs3_id)
             if self.last_zs3_id == zs3_id:
                 self.last_zs3_id = None
 
@@ -1716,6 +2156,7 @@ class zynthian_state_manager:
 
         # ZS3 list (subsnapshots)
         self.zs3 = {}
+        self.invalidate_zs3_plans()
 
     def sanitize_zs3_from_json(self, zs3_state):
         """Fix chain & processor ID keys in ZS3 data decoded from JSON"""
@@ -1758,18 +2199,21 @@ class zynthian_state_manager:
         for key, state in self.zs3.items():
             if state["active_chain"] not in self.chain_manager.chains:
                 state["active_chain"] = self.chain_manager.active_chain_id
+                self.invalidate_zs3_plans(key)
             if "processors" in state:
                 for processor_id in list(state["processors"]):
                     if int(processor_id) not in self.chain_manager.processors:
                         logging.debug(
                             f"Purging processor {processor_id} from ZS3 {key}")
                         del state["processors"][processor_id]
+                        self.invalidate_zs3_plans(key)
             if "chains" in state:
                 for chain_id in list(state["chains"]):
                     if int(chain_id) not in self.chain_manager.chains:
                         logging.debug(
                             f"Purging chain {chain_id} from ZS3 {key}")
                         del state["chains"][chain_id]
+                        self.invalidate_zs3_plans(key)
 
     # ------------------------------------------------------------------
     # Jackd Info
@@ -1863,9 +2307,8 @@ class zynthian_state_manager:
         for idev in range(NUM_MIDI_DEVS_IN):
             if zynautoconnect.devices_in[idev] is None:
                 continue
-            try:
-                uid = zynautoconnect.devices_in[idev].aliases[0]
-            except:
+            uid = zynautoconnect.get_midi_in_uid(idev)
+            if uid is None:
                 logging.error(f"No aliases for idev {idev} => Skipping!")
                 continue
             routed_chains = []
@@ -2009,6 +2452,7 @@ class zynthian_state_manager:
             # Set MIDI Master Channel
             lib_zyncore.set_midi_master_chan(
                 zynthian_gui_config.master_midi_channel)
+            self.build_zynmidi_handlers()
             # Set MIDI System Messages flag
             lib_zyncore.set_midi_system_events(
                 zynthian_gui_config.midi_sys_enabled)
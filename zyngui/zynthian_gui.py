@@ -46,6 +46,9 @@ from zynlibs.zynseq import *
 
 from zyngine import zynthian_state_manager
 from zyngine.zynthian_signal_manager import zynsigman
+from zyngine.zynthian_load_profiler import zynloadprof
+from zyngine.zynthian_midi_profiler import zynmidiprof
+from zyngine.zynthian_scheduler import zynsched
 
 from zyngui import zynthian_gui_config
 from zyngui import zynthian_gui_keyboard
@@ -135,9 +138,9 @@ class zynthian_gui:
         self.chain_manager = self.state_manager.chain_manager
 
         self.debug_thread = None
-        self.busy_thread = None
+        self.busy_sched_task = None
         self.control_thread = None
-        self.status_thread = None
+        self.status_sched_task = None
         self.cuia_thread = None
         self.cuia_queue = self.state_manager.cuia_queue
         self.zynread_wait_flag = False
@@ -522,9 +525,9 @@ class zynthian_gui:
 
         # Start processing signals, threads & polling
         self.register_signals()
-        self.start_busy_thread()
+        self.start_busy_task()
         self.start_control_thread()
-        self.start_status_thread()
+        self.start_status_task()
         self.start_cuia_thread()
         self.start_zynpot_thread()
         self.start_polling()
@@ -1166,6 +1169,36 @@ class zynthian_gui:
     def cuia_stop_workflow_capture(self, params=None):
         self.stop_capture_log()
 
+    def cuia_show_load_profile(self, params=None):
+        report = zynloadprof.format_report(zynloadprof.get_report())
+        logging.info(report)
+        self.show_info(report)
+
+    def cuia_toggle_midi_profile(self, params=None):
+        zynmidiprof.enable(not zynmidiprof.enabled)
+        self.show_info(f"MIDI profiler {'enabled' if zynmidiprof.enabled else 'disabled'}")
+
+    def cuia_show_midi_profile(self, params=None):
+        report = zynmidiprof.get_report()
+        text = zynmidiprof.format_report(report)
+        fpath = zynmidiprof.dump(report)
+        if fpath:
+            text += f"\nDumped to '{fpath}'"
+        logging.info(text)
+        self.show_info(text)
+
+    def cuia_reset_midi_profile(self, params=None):
+        zynmidiprof.reset()
+
+    def cuia_toggle_signal_profile(self, params=None):
+        zynsigman.enable_profile(not zynsigman.profile)
+        self.show_info(f"Signal profiler {'enabled' if zynsigman.profile else 'disabled'}")
+
+    def cuia_show_signal_profile(self, params=None):
+        report = zynsigman.format_profile(zynsigman.get_profile())
+        logging.info(report)
+        self.show_info(report)
+
     # Panic Actions
 
     def cuia_all_notes_off(self, params=None):
@@ -1405,6 +1438,18 @@ class zynthian_gui:
     def cuia_screen_snapshot(self, params=None):
         self.show_screen("snapshot")
 
+    def cuia_preload_snapshot(self, params=None):
+        """Start engines of a snapshot in standby, so it loads faster
+
+        params : [snapshot path] (Default: next snapshot in bank)
+        """
+
+        try:
+            fpath = params[0]
+        except:
+            fpath = None
+        self.state_manager.preload_snapshot(fpath)
+
     def cuia_screen_zs3(self, params=None):
         self.screens["zs3"].enable_midi_learn()
         self.show_screen("zs3")
@@ -2296,91 +2341,81 @@ class zynthian_gui:
             return "break"
 
     # ------------------------------------------------------------------
-    # "Busy" Animated Icon Thread
+    # "Busy" Animated Icon Task
     # ------------------------------------------------------------------
 
-    def start_busy_thread(self):
-        self.busy_thread = Thread(target=self.busy_thread_task, args=())
-        self.busy_thread.name = "Busy"
-        self.busy_thread.daemon = True  # thread dies with the program
-        self.busy_thread.start()
-        # logging.debug(f"START BUSY {self.busy_thread}")
+    def start_busy_task(self):
+        self.busy_timeout = 0
+        # Blocking => showing/closing the loading screen waits for screen_lock, that is held while building screens
+        self.busy_sched_task = zynsched.add_periodic(0.1, self.busy_task, name="busy", stretch=False, blocking=True)
 
-    def busy_thread_task(self):
-        busy_timeout = 0
+    def busy_task(self):
         busy_warn_time = 300
-        while not self.exit_flag:
-            if self.state_manager.is_busy():
-                busy_timeout += 1
-                busy_message = self.state_manager.get_busy_message()
-                busy_details = self.state_manager.get_busy_details()
-                # Show loading screen if busy and busy message
-                if self.current_screen != "loading":
-                    if busy_message:
-                        self.show_loading(busy_message, busy_details)
+        if self.state_manager.is_busy():
+            self.busy_timeout += 1
+            busy_message = self.state_manager.get_busy_message()
+            busy_details = self.state_manager.get_busy_details()
+            # Show loading screen if busy and busy message
+            if self.current_screen != "loading":
+                if busy_message:
+                    self.show_loading(busy_message, busy_details)
+            else:
+                busy_error = self.state_manager.get_busy_error()
+                if busy_error:
+                    self.screens['loading'].set_error(busy_error)
                 else:
-                    busy_error = self.state_manager.get_busy_error()
-                    if busy_error:
-                        self.screens['loading'].set_error(busy_error)
+                    busy_warning = self.state_manager.get_busy_warning()
+                    if busy_warning:
+                        self.screens['loading'].set_warning(busy_warning)
                     else:
-                        busy_warning = self.state_manager.get_busy_warning()
-                        if busy_warning:
-                            self.screens['loading'].set_warning(busy_warning)
-                        else:
-                            busy_success = self.state_manager.get_busy_success()
-                            if busy_success:
-                                self.screens['loading'].set_success(
-                                    busy_success)
-                            elif busy_message:
-                                self.screens['loading'].set_title(busy_message)
-                    if busy_details:
-                        self.screens['loading'].set_details(busy_details)
+                        busy_success = self.state_manager.get_busy_success()
+                        if busy_success:
+                            self.screens['loading'].set_success(
+                                busy_success)
+                        elif busy_message:
+                            self.screens['loading'].set_title(busy_message)
+                if busy_details:
+                    self.screens['loading'].set_details(busy_details)
+        else:
+            self.busy_timeout = 0
+            self.screen_lock.acquire()
+            if self.current_screen == "loading":
+                self.screen_lock.release()
+                self.close_screen("loading")
             else:
-                busy_timeout = 0
-                self.screen_lock.acquire()
-                if self.current_screen == "loading":
-                    self.screen_lock.release()
-                    self.close_screen("loading")
-                else:
-                    self.screen_lock.release()
-
-            try:
-                if self.current_screen:
-                    self.screens[self.current_screen].refresh_loading()
-            except Exception as err:
-                logging.error(
-                    f"refresh_loading() on screen '{self.current_screen}' => {err}")
+                self.screen_lock.release()
 
-            if busy_timeout == busy_warn_time:
-                logging.warning(
-                    f"Clients have been busy for longer than {int(busy_warn_time / 10)}s: {self.state_manager.busy}")
+        try:
+            if self.current_screen:
+                self.screens[self.current_screen].refresh_loading()
+        except Exception as err:
+            logging.error(
+                f"refresh_loading() on screen '{self.current_screen}' => {err}")
 
-            sleep(0.1)
+        if self.busy_timeout == busy_warn_time:
+            logging.warning(
+                f"Clients have been busy for longer than {int(busy_warn_time / 10)}s: {self.state_manager.busy}")
 
     # ------------------------------------------------------------------
-    # Status Refresh Thread
+    # Status Refresh Task
     # ------------------------------------------------------------------
 
-    def start_status_thread(self):
-        self.status_thread = Thread(target=self.status_thread_task, args=())
-        self.status_thread.name = "Status"
-        self.status_thread.daemon = True  # thread dies with the program
-        self.status_thread.start()
+    def start_status_task(self):
+        self.status_sched_task = zynsched.add_periodic(0.2, self.status_task, name="gui status", stretch=False)
 
-    def status_thread_task(self):
-        while not self.exit_flag:
-            # When in power save mode:
-            # + Make LED refresh faster so the fading effect looks smooth
-            # + Don't need to refresh status info because it's not shown
-            if self.state_manager.power_save_mode:
-                if self.wsleds:
-                    self.wsleds.update()
-                sleep(0.05)
-            else:
-                self.refresh_status()
-                if self.wsleds:
-                    self.wsleds.update()
-                sleep(0.2)
+    def status_task(self):
+        # When in power save mode:
+        # + Make LED refresh faster so the fading effect looks smooth
+        # + Don't need to refresh status info because it's not shown
+        if self.state_manager.power_save_mode:
+            period = 0.05
+        else:
+            self.refresh_status()
+            period = 0.2
+        if self.wsleds:
+            self.wsleds.update()
+        if self.status_sched_task.period != period:
+            zynsched.reschedule(self.status_sched_task, period=period)
 
     def refresh_status(self):
         # Refresh on-screen status
@@ -2560,6 +2595,11 @@ class zynthian_gui:
         # Stop State manager
         self.state_manager.stop()
 
+        # Stop scheduled tasks
+        zynsched.cancel(self.busy_sched_task)
+        zynsched.cancel(self.status_sched_task)
+        zynsched.stop()
+
         # Signal cuia thread so it can unlock and finish normally
         self.cuia_queue.put_nowait("__EXIT__")
 
@@ -2569,7 +2609,7 @@ class zynthian_gui:
     def stop(self):
         # Get threads still running
         running_thread_names = []
-        for t in [self.control_thread, self.status_thread, self.busy_thread, self.cuia_thread, self.state_manager.slow_thread, self.state_manager.fast_thread, self.multitouch.thread, self.zynpot_thread]:
+        for t in [self.control_thread, zynsched.thread, self.cuia_thread, self.state_manager.fast_thread, self.multitouch.thread, self.zynpot_thread]:
             if t and t.is_alive():
                 running_thread_names.append(t.name)
         if zynautoconnect.is_running():
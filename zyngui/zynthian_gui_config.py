@@ -554,8 +554,13 @@ else:
 # ------------------------------------------------------------------------------
 
 restore_last_state = int(os.environ.get('ZYNTHIAN_UI_RESTORE_LAST_STATE', 0))
+# Journal changes to last state, so it survives power loss (requires restore_last_state)
+last_state_journal = restore_last_state and int(os.environ.get(
+    'ZYNTHIAN_UI_LAST_STATE_JOURNAL', 0))
 snapshot_mixer_settings = int(os.environ.get(
     'ZYNTHIAN_UI_SNAPSHOT_MIXER_SETTINGS', 0))
+snapshot_binary_format = int(os.environ.get(
+    'ZYNTHIAN_UI_SNAPSHOT_BINARY_FORMAT', 0))
 show_cpu_status = int(os.environ.get('ZYNTHIAN_UI_SHOW_CPU_STATUS', 0))
 visible_mixer_strips = int(os.environ.get(
     'ZYNTHIAN_UI_VISIBLE_MIXER_STRIPS', 0))
@@ -564,6 +569,27 @@ control_test_enabled = int(os.environ.get(
     'ZYNTHIAN_UI_CONTROL_TEST_ENABLED', 0))
 power_save_secs = 60 * \
     int(os.environ.get('ZYNTHIAN_UI_POWER_SAVE_MINUTES', 60))
+# Max number of engines started concurrently when loading a snapshot (<2 => sequential)
+snapshot_engine_start_workers = int(os.environ.get(
+    'ZYNTHIAN_UI_SNAPSHOT_ENGINE_START_WORKERS', 4))
+# Preload engines of next snapshot in bank after loading a snapshot (1 => enabled)
+snapshot_preload_next = int(os.environ.get(
+    'ZYNTHIAN_UI_SNAPSHOT_PRELOAD_NEXT', 0))
+# Max controller values per second sent to engines with blocking IPC, e.g. Jalv (0 => send synchronously)
+controller_send_rate = int(os.environ.get(
+    'ZYNTHIAN_UI_CONTROLLER_SEND_RATE', 200))
+# Number of threads processing queued signal callbacks
+signal_queue_workers = int(os.environ.get(
+    'ZYNTHIAN_UI_SIGNAL_QUEUE_WORKERS', 1))
+# Profile signal callbacks, logging the ones taking longer than budget (ms)
+signal_profile = int(os.environ.get('ZYNTHIAN_UI_SIGNAL_PROFILE', 0))
+signal_callback_budget = int(os.environ.get(
+    'ZYNTHIAN_UI_SIGNAL_CALLBACK_BUDGET', 50))
+# Profile MIDI event dispatching from start (may be toggled with CUIA TOGGLE_MIDI_PROFILE)
+midi_profile = int(os.environ.get('ZYNTHIAN_UI_MIDI_PROFILE', 0))
+# Factor applied to the period of background tasks (status, sensors, ...) in power save mode
+scheduler_power_save_stretch = int(os.environ.get(
+    'ZYNTHIAN_UI_SCHEDULER_POWER_SAVE_STRETCH', 4))
 
 # ------------------------------------------------------------------------------
 # Audio Options
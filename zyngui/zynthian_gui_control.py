@@ -98,7 +98,8 @@ class zynthian_gui_control(zynthian_gui_selector):
             pending_click_listbox = False
         super().build_view()
         if not self.shown:
-            zynsigman.register(zynsigman.S_MIDI, zynsigman.SS_MIDI_CC, self.cb_midi_cc)
+            zynsigman.register(zynsigman.S_MIDI, zynsigman.SS_MIDI_CC, self.cb_midi_cc,
+                               priority=zynsigman.PRIO_LOW, coalesce=("izmip", "chan", "num"))
             zynsigman.register(zynsigman.S_MIDI, zynsigman.SS_MIDI_PC, self.cb_midi_pc)
             if zynthian_gui_config.enable_touch_navigation:
                 zynsigman.register(zynsigman.S_GUI, zynsigman.SS_GUI_SHOW_SIDEBAR, self.cb_show_sidebar)
@@ -122,25 +122,25 @@ class zynthian_gui_midi_config(zynthian_gui_selector):
         def append_port(idev):
             """Add a port to list"""
             if self.input:
-                port = zynautoconnect.devices_in[idev]
+                uid, name = zynautoconnect.get_port_aliases(zynautoconnect.devices_in[idev])
                 mode = get_mode_str(idev)
                 if self.chain is None:
-                    self.list_data.append((port.aliases[0], idev, f"{mode}{port.aliases[1]}"))
+                    self.list_data.append((uid, idev, f"{mode}{name}"))
                 elif not self.zyngui.state_manager.ctrldev_manager.is_input_device_available_to_chains(idev):
-                    self.list_data.append((port.aliases[0], idev, f"    {mode}{port.aliases[1]}"))
+                    self.list_data.append((uid, idev, f"    {mode}{name}"))
                 else:
                     if lib_zyncore.zmop_get_route_from(self.chain.zmop_index, idev):
-                        self.list_data.append((port.aliases[0], idev, f"\u2612 {mode}{port.aliases[1]}"))
+                        self.list_data.append((uid, idev, f"\u2612 {mode}{name}"))
                     else:
-                        self.list_data.append((port.aliases[0], idev, f"\u2610 {mode}{port.aliases[1]}"))
+                        self.list_data.append((uid, idev, f"\u2610 {mode}{name}"))
             else:
-                port = zynautoconnect.devices_out[idev]
+                uid, name = zynautoconnect.get_port_aliases(zynautoconnect.devices_out[idev])
                 if self.chain is None:
-                    self.list_data.append((port.aliases[0], idev, f"{port.aliases[1]}"))
-                elif port.aliases[0] in self.chain.midi_out:
-                    self.list_data.append((port.aliases[0], idev, f"\u2612 {port.aliases[1]}"))
+                    self.list_data.append((uid, idev, f"{name}"))
+                elif uid in self.chain.midi_out:
+                    self.list_data.append((uid, idev, f"\u2612 {name}"))
                 else:
-                    self.list_data.append((port.aliases[0], idev, f"\u2610 {port.aliases[1]}"))
+                    self.list_data.append((uid, idev, f"\u2610 {name}"))
 
         def append_service_device(dev_name, obj):
             """Add service (that is also a port) to list"""
@@ -151,7 +151,7 @@ class zynthian_gui_midi_config(zynthian_gui_selector):
                     port = zynautoconnect.devices_out[obj]
                 if port:
                     mode = get_mode_str(obj)
-                    self.list_data.append((f"stop_{dev_name}", obj, f"\u2612 {mode}{port.aliases[1]}"))
+                    self.list_data.append((f"stop_{dev_name}", obj, f"\u2612 {mode}{zynautoconnect.get_port_aliases(port)[1]}"))
             else:
                 self.list_data.append((f"start_{dev_name}", None, f"\u2610 {obj}"))
 
@@ -172,14 +172,18 @@ class zynthian_gui_midi_config(zynthian_gui_selector):
         else:
             devs = zynautoconnect.devices_out
         for i, dev in enumerate(devs):
-            if dev and len(dev.aliases) > 1:
-                if dev.aliases[0].startswith("USB:"):
-                    usb_devices.append((dev.aliases[1], i))
-                elif dev.aliases[0].startswith("BLE:"):
-                    ble_devices.append((dev.aliases[1], i))
-                elif dev.aliases[0].startswith("AUBIO:"):
+            if dev:
+                # Port aliases are read from autoconnect's port metadata cache
+                info = zynautoconnect.get_port_info(dev)
+                if len(info.aliases) < 2:
+                    continue
+                if info.uid.startswith("USB:"):
+                    usb_devices.append((info.friendly_name, i))
+                elif info.uid.startswith("BLE:"):
+                    ble_devices.append((info.friendly_name, i))
+                elif info.uid.startswith("AUBIO:"):
                     aubio_devices.append(i)
-                elif dev.aliases[0].startswith("NET:"):
+                elif info.uid.startswith("NET:"):
                     net_devices[dev.name] = i
                 else:
                     int_devices.append(i)
@@ -315,8 +319,8 @@ class zynthian_gui_midi_config(zynthian_gui_selector):
                 else:
                     try:
                         if idev is not None:
-                            dev_id = zynautoconnect.get_midi_out_dev(
-                                idev).aliases[0]
+                            dev_id = zynautoconnect.get_port_aliases(
+                                zynautoconnect.get_midi_out_dev(idev))[0]
                             self.chain.toggle_midi_out(dev_id)
                         elif isinstance(action, int):
                             self.chain.toggle_midi_out(action)
@@ -351,7 +355,7 @@ class zynthian_gui_midi_config(zynthian_gui_selector):
                     port = zynautoconnect.devices_out[idev]
                 if self.list_data[i][0].startswith("AUBIO:") or self.list_data[i][0].endswith("aubionotes"):
                     options["Select aubio inputs"] = "AUBIO_INPUTS"
-                options[f"Rename port '{port.aliases[0]}'"] = port
+                options[f"Rename port '{zynautoconnect.get_port_aliases(port)[0]}'"] = port
                 # options[f"Reset name to '{zynautoconnect.build_midi_port_name(port)[1]}'"] = port
                 self.zyngui.screens['option'].config(
                     "MIDI Input Device", options, self.menu_cb)
@@ -363,7 +367,7 @@ class zynthian_gui_midi_config(zynthian_gui_selector):
         try:
             if option.startswith("Rename port"):
                 self.zyngui.show_keyboard(
-                    self.rename_device, params.aliases[1])
+                    self.rename_device, zynautoconnect.get_port_aliases(params)[1])
                 return
             elif option.startswith("Reset name"):
                 zynautoconnect.set_port_friendly_name(params)
@@ -32,6 +32,7 @@ import shutil
 
 
 # Zynthian specific modules
+from zyngine.zynthian_signal_manager import zynsigman
 from zyngui.zynthian_gui_selector import zynthian_gui_selector
 
 # ------------------------------------------------------------------------------
@@ -50,6 +51,24 @@ class zynthian_gui_snapshot(zynthian_gui_selector):
 
         self.check_bankless_mode()
 
+    def build_view(self):
+        if super().build_view():
+            zynsigman.register_queued(
+                zynsigman.S_STATE_MAN, self.sm.SS_SAVE_SNAPSHOT, self.cb_save_snapshot)
+            return True
+        else:
+            return False
+
+    def hide(self):
+        if self.shown:
+            zynsigman.unregister(
+                zynsigman.S_STATE_MAN, self.sm.SS_SAVE_SNAPSHOT, self.cb_save_snapshot)
+            super().hide()
+
+    def cb_save_snapshot(self, fpath, success):
+        if self.shown:
+            self.update_list()
+
     def is_not_empty_snapshot(self):
         return self.cm.get_chain_count() > 1 or self.cm.get_processor_count() > 0
 
@@ -155,23 +174,19 @@ class zynthian_gui_snapshot(zynthian_gui_selector):
         i = i + 1
         self.change_index_offset(i)
 
-        for dpath in sorted(glob(f"{self.sm.snapshot_dir}/[0-9][0-9][0-9]*")):
-            if isdir(dpath):
-                bank_name = basename(dpath)
-                if bank_name.startswith('.'):
-                    continue
-
-                self.list_data.append((dpath, i, bank_name))
-                try:
-                    bank_number = self.get_midi_number(bank_name)
-                    logging.debug("Snapshot Bank '%s' => MIDI bank %d" %
-                                  (bank_name, bank_number))
-                except:
-                    logging.warning(
-                        "Snapshot Bank '%s' don't have a MIDI bank number" % bank_name)
-                if bank_name == self.sm.snapshot_bank:
-                    self.index = i
-                i = i + 1
+        for bank_name in self.sm.snapshot_catalog.get_banks():
+            dpath = join(self.sm.snapshot_dir, bank_name)
+            self.list_data.append((dpath, i, bank_name))
+            try:
+                bank_number = self.get_midi_number(bank_name)
+                logging.debug("Snapshot Bank '%s' => MIDI bank %d" %
+                              (bank_name, bank_number))
+            except:
+                logging.warning(
+                    "Snapshot Bank '%s' don't have a MIDI bank number" % bank_name)
+            if bank_name == self.sm.snapshot_bank:
+                self.index = i
+            i = i + 1
 
     def load_snapshot_list(self):
         self.list_data = []
@@ -196,13 +211,12 @@ class zynthian_gui_snapshot(zynthian_gui_selector):
 
         self.change_index_offset(i)
 
-        for fpath in sorted(glob(f"{self.sm.snapshot_dir}/{self.sm.snapshot_bank}/*.zss")):
-            if isfile(fpath):
-                title = basename(fpath)[:-4].replace(';', '>', 1).replace(';', '/')
-                self.list_data.append((fpath, i, title))
-                i += 1
-                if fpath == self.sm.last_snapshot_fpath:
-                    self.index = i + 1
+        for fpath, entry in self.sm.snapshot_catalog.get_snapshots(self.sm.snapshot_bank):
+            title = basename(fpath)[:-4].replace(';', '>', 1).replace(';', '/')
+            self.list_data.append((fpath, i, title))
+            i += 1
+            if fpath == self.sm.last_snapshot_fpath:
+                self.index = i + 1
 
     def fill_list(self):
         self.check_bankless_mode()
@@ -273,6 +287,7 @@ class zynthian_gui_snapshot(zynthian_gui_selector):
 
     def delete_bank(self, bank):
         try:
+            self.sm.snapshot_writer.cancel(f"{self.sm.snapshot_dir}/{bank}")
             shutil.rmtree(f"{self.sm.snapshot_dir}/{bank}")
             if self.sm.snapshot_bank == bank:
                 self.sm.snapshot_dir = None
@@ -286,6 +301,7 @@ class zynthian_gui_snapshot(zynthian_gui_selector):
         else:
             new_path = f"{self.sm.snapshot_dir}/{self.old_prog}"
         try:
+            self.sm.snapshot_writer.wait(self.old_path)
             os.rename(self.old_path, new_path)
             self.update_list()
         except:
@@ -404,12 +420,24 @@ class zynthian_gui_snapshot(zynthian_gui_selector):
 
     def do_rename(self, data):
         try:
-            os.rename(data[0], data[1])
+            self.rename_file(data[0], data[1])
             self.update_list()
         except Exception as e:
             logging.warning(
                 "Failed to rename snapshot '{}' to '{}' => {}".format(data[0], data[1], e))
 
+    def rename_file(self, fpath, dfpath):
+        """Rename a snapshot file, after pending writes to it are completed
+
+        fpath : Current full path and filename
+        dfpath : New full path and filename
+        """
+
+        self.sm.snapshot_writer.wait(fpath)
+        # Pending write to destination would overwrite renamed file
+        self.sm.snapshot_writer.cancel(dfpath)
+        os.rename(fpath, dfpath)
+
     def set_program(self, value):
         fpath = self.list_data[self.index][0]
         parts = self.get_parts_from_path(fpath)
@@ -464,9 +492,9 @@ class zynthian_gui_snapshot(zynthian_gui_selector):
             return
         files_to_change.sort(reverse=True)
         for files in files_to_change:
-            os.rename(files[0], files[1])
+            self.rename_file(files[0], files[1])
 
-        os.rename(fpath, dfpath)
+        self.rename_file(fpath, dfpath)
         parts = self.get_parts_from_path(dfpath)
 
         self.zyngui.close_screen()
@@ -489,6 +517,8 @@ class zynthian_gui_snapshot(zynthian_gui_selector):
     def delete_confirmed(self, fpath):
         logging.info("DELETE SNAPSHOT: {}".format(fpath))
         try:
+            # Pending write would recreate the file
+            self.sm.snapshot_writer.cancel(fpath)
             os.remove(fpath)
             self.update_list()
         except Exception as e:
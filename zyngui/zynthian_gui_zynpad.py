@@ -71,6 +71,7 @@ class zynthian_gui_zynpad(zynthian_gui_base.zynthian_gui_base):
         self.bank = self.zynseq.bank
         # Columns used during last layout - used to update stale views
         self.columns = self.zynseq.col_in_bank
+        self.pad_info = [None] * 64  # Cached (disabled, midi_chan, title, empty) of each pad, refreshed on full pad refresh
         self.midi_learn = False
         self.trigger_channel = None
         self.trigger_device = None
@@ -119,6 +120,8 @@ class zynthian_gui_zynpad(zynthian_gui_base.zynthian_gui_base):
             zynsigman.S_STEPSEQ, self.zynseq.SS_SEQ_PLAY_STATE, self.update_play_state)
         zynsigman.register(zynsigman.S_STEPSEQ,
                            self.zynseq.SS_SEQ_PROGRESS, self.update_progress)
+        zynsigman.register(
+            zynsigman.S_STEPSEQ, self.zynseq.SS_SEQ_REFRESH, self.update_all)
         return True
 
     # Function to hide GUI
@@ -128,6 +131,8 @@ class zynthian_gui_zynpad(zynthian_gui_base.zynthian_gui_base):
                 zynsigman.S_STEPSEQ, self.zynseq.SS_SEQ_PLAY_STATE, self.update_play_state)
             zynsigman.unregister(
                 zynsigman.S_STEPSEQ, self.zynseq.SS_SEQ_PROGRESS, self.update_progress)
+            zynsigman.unregister(
+                zynsigman.S_STEPSEQ, self.zynseq.SS_SEQ_REFRESH, self.update_all)
             super().hide()
 
     # Function to set quantity of pads
@@ -290,11 +295,28 @@ class zynthian_gui_zynpad(zynthian_gui_base.zynthian_gui_base):
         self.redrawing = False
         self.columns = self.zynseq.col_in_bank
 
+    # Function to get pad info that doesn't change with play state
+    #  pad: Pad index
+    #  returns: Tuple (disabled, midi_chan, title, empty), also cached in pad_info
+    def get_pad_info(self, pad):
+        disabled = self.zynseq.libseq.getSequenceLength(self.bank, pad) == 0
+        midi_chan = self.zynseq.libseq.getChannel(self.bank, pad, 0)
+        title = self.zynseq.get_sequence_name(self.bank, pad)
+        try:
+            int(title)  # Test for default (integer index)
+            title = self.chain_manager.get_synth_preset_name(midi_chan)
+        except:
+            pass
+        empty = self.zynseq.libseq.isEmpty(self.bank, pad)
+        self.pad_info[pad] = (disabled, midi_chan, title, empty)
+        return self.pad_info[pad]
+
     # Function to refresh pad if it has changed
     #  pad: Pad index
     #  mode: Play mode
     #  state: Play state
     #  group: Sequence group
+    # Play state events (mode, state & group passed) use cached pad info, other calls refresh it.
     def refresh_pad(self, pad, mode=None, state=None, group=None):
         if pad > 63:
             return
@@ -304,6 +326,9 @@ class zynthian_gui_zynpad(zynthian_gui_base.zynthian_gui_base):
             mode = (state >> 8) & 0xFF
             group = (state >> 16) & 0xFF
             state &= 0xFF
+            disabled, midi_chan, title, empty = self.get_pad_info(pad)
+        else:
+            disabled, midi_chan, title, empty = self.pad_info[pad] or self.get_pad_info(pad)
         if state == zynseq.SEQ_RESTARTING:
             state = zynseq.SEQ_PLAYING
         elif state == zynseq.SEQ_STOPPINGSYNC:
@@ -312,7 +337,7 @@ class zynthian_gui_zynpad(zynthian_gui_base.zynthian_gui_base):
         foreground = "white"
         cellh = self.pads[pad]["header"]
         cellb = self.pads[pad]["body"]
-        if self.zynseq.libseq.getSequenceLength(self.bank, pad) == 0 or mode == zynseq.SEQ_DISABLED:
+        if disabled or mode == zynseq.SEQ_DISABLED:
             self.grid_canvas.itemconfig(
                 cellh, fill=zynthian_gui_config.PAD_COLOUR_DISABLED)
             self.grid_canvas.itemconfig(
@@ -322,17 +347,10 @@ class zynthian_gui_zynpad(zynthian_gui_base.zynthian_gui_base):
                 cellh, fill=zynthian_gui_config.PAD_COLOUR_GROUP[group % 16])
             self.grid_canvas.itemconfig(
                 cellb, fill=zynthian_gui_config.PAD_COLOUR_GROUP_LIGHT[group % 16])
-        if self.zynseq.libseq.getSequenceLength(self.bank, pad) == 0:
+        if disabled:
             mode = 0
         group = chr(65 + group)
         # patnum = self.zynseq.libseq.getPatternAt(self.bank, pad, 0, 0)
-        midi_chan = self.zynseq.libseq.getChannel(self.bank, pad, 0)
-        title = self.zynseq.get_sequence_name(self.bank, pad)
-        try:
-            int(title)  # Test for default (integer index)
-            title = self.chain_manager.get_synth_preset_name(midi_chan)
-        except:
-            pass
         self.grid_canvas.itemconfig(
             self.pads[pad]["title"], text=title, fill=foreground)
         self.grid_canvas.itemconfig(
@@ -341,7 +359,7 @@ class zynthian_gui_zynpad(zynthian_gui_base.zynthian_gui_base):
             self.pads[pad]["num"], text=f"{group}{pad+1}", fill=foreground)
         self.grid_canvas.itemconfig(
             self.pads[pad]["mode"], image=self.mode_icon[self.zynseq.col_in_bank][mode])
-        if state == 0 and self.zynseq.libseq.isEmpty(self.bank, pad):
+        if state == 0 and empty:
             self.grid_canvas.itemconfig(
                 self.pads[pad]["state"], image=self.empty_icon)
         else:
@@ -352,6 +370,9 @@ class zynthian_gui_zynpad(zynthian_gui_base.zynthian_gui_base):
         if bank == self.bank:
             self.refresh_pad(seq, mode=mode, state=state, group=group)
 
+    def update_all(self):
+        self.refresh_status(force=True)
+
     def update_progress(self, bank, seq, progress):
         if bank == self.bank:
             x0 = int(seq / self.columns) * self.column_width
@@ -785,7 +806,7 @@ class zynthian_gui_zynpad(zynthian_gui_base.zynthian_gui_base):
         res = []
         for idev, port in enumerate(zynautoconnect.devices_in):
             if port and idev not in self.zyngui.state_manager.ctrldev_manager.drivers:
-                res.append(port.aliases[1])
+                res.append(zynautoconnect.get_port_aliases(port)[1])
         return res
 
     # Set the trigger device (zmip) from the param editor value (zctrl)
@@ -813,7 +834,7 @@ class zynthian_gui_zynpad(zynthian_gui_base.zynthian_gui_base):
             return "All"
         else:
             try:
-                return zynautoconnect.devices_in[self.trigger_device].aliases[1]
+                return zynautoconnect.get_port_aliases(zynautoconnect.devices_in[self.trigger_device])[1]
             except:
                 return "None"
 
@@ -75,3 +75,13 @@ struct MIDI_MESSAGE {
     uint8_t value1  = 0;
     uint8_t value2  = 0;
 };
+
+// Sequence state change event
+struct SEQ_STATE_EVENT {
+    uint8_t bank     = 0;
+    uint8_t sequence = 0;
+    uint8_t state    = 0; // Play state
+    uint8_t mode     = 0; // Play mode
+    uint8_t group    = 0;
+    uint8_t progress = 0; // Play position in percent of sequence length
+};
@@ -150,7 +150,9 @@ void SequenceManager::updateAllSequenceLengths() {
             (*itSeq)->updateLength();
 }
 
-size_t SequenceManager::clock(std::pair<double, double> timeinfo, std::multimap<uint32_t, MIDI_MESSAGE*>* pSchedule, bool bSync) {
+void SequenceManager::setStateCallback(void (*cbFn)(uint8_t, uint8_t, Sequence*)) { m_pStateCb = cbFn; }
+
+size_t SequenceManager::clock(std::pair<double, double> timeinfo, std::multimap<uint32_t, MIDI_MESSAGE*>* pSchedule, bool bSync, bool bBeat) {
     /** Get events scheduled for next step from all tracks in each playing sequence.
         Populate schedule with start, end and interpolated events
     */
@@ -159,6 +161,9 @@ size_t SequenceManager::clock(std::pair<double, double> timeinfo, std::multimap<
     for (auto it = m_vPlayingSequences.begin(); it != m_vPlayingSequences.end();) {
         Sequence* pSequence = getSequence(it->first, it->second);
         if (pSequence->getPlayState() == STOPPED) {
+            // Stopped outside clock, e.g. by another sequence in same group
+            if (m_pStateCb)
+                m_pStateCb(it->first, it->second, pSequence);
             it = m_vPlayingSequences.erase(it);
             continue;
         }
@@ -173,10 +178,9 @@ size_t SequenceManager::clock(std::pair<double, double> timeinfo, std::multimap<
                 // pEvent->msg.value1, pEvent->msg.value2, pEvent->time, nEventTime, dSamplesPerClock);
             }
         }
-        if (nEventType & 2) {
-            // Change of state
-            // uint8_t nTrigger = getTriggerNote(it->first, it->second);
-            // It's currently polled from python
+        if ((nEventType & 2 || bBeat) && m_pStateCb) {
+            // Change of state or progress
+            m_pStateCb(it->first, it->second, pSequence);
         }
         ++it;
     }
@@ -236,10 +240,12 @@ uint16_t SequenceManager::getTriggerSequence(uint8_t note) {
 
 size_t SequenceManager::getPlayingSequencesCount() { return m_vPlayingSequences.size(); }
 
-void SequenceManager::stop() {
-    for (auto it = m_vPlayingSequences.begin(); it != m_vPlayingSequences.end(); ++it)
+std::vector<std::pair<uint32_t, uint32_t>> SequenceManager::stop() {
+    std::vector<std::pair<uint32_t, uint32_t>> vStopped;
+    vStopped.swap(m_vPlayingSequences);
+    for (auto it = vStopped.begin(); it != vStopped.end(); ++it)
         getSequence(it->first, it->second)->setPlayState(STOPPED);
-    m_vPlayingSequences.clear();
+    return vStopped;
 }
 
 void SequenceManager::cleanPatterns() {
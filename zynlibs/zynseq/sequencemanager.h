@@ -80,10 +80,15 @@ class SequenceManager {
      *   @param  timeinfo Pair: Offset since JACK epoch for start of next period, duration of clock cycle in frames
      *   @param  pSchedule Pointer to the schedule to populate with events
      *   @param  bSync True indicates a sync pulse
-     *   @param  dSamplesPerClock Quantity of samples in each clock cycle
+     *   @param  bBeat True indicates start of a beat, when progress of playing sequences is notified
      *   @retval size_t Quantity of playing sequences
      */
-    size_t clock(std::pair<double, double> timeinfo, std::multimap<uint32_t, MIDI_MESSAGE*>* pSchedule, bool bSync);
+    size_t clock(std::pair<double, double> timeinfo, std::multimap<uint32_t, MIDI_MESSAGE*>* pSchedule, bool bSync, bool bBeat = false);
+
+    /** @brief  Set function called (from jack process thread) when a playing sequence changes state or at the start of each beat
+     *   @param  cbFn Pointer to function with template void(uint8_t bank, uint8_t sequence, Sequence* pSequence) or NULL
+     */
+    void setStateCallback(void (*cbFn)(uint8_t, uint8_t, Sequence*));
 
     /** @brief  Get pointer to sequence
      *   @param  bank Index of bank containing sequence
@@ -176,8 +181,9 @@ class SequenceManager {
     size_t getPlayingSequencesCount();
 
     /** @brief  Stop all collections / sequences
+     *   @retval vector Vector of <bank,sequence> pairs for stopped sequences
      */
-    void stop();
+    std::vector<std::pair<uint32_t, uint32_t>> stop();
 
     /** @brief  Remove all unused empty patterns
      */
@@ -246,4 +252,5 @@ class SequenceManager {
         m_vPlayingSequences;                             // Vector of <bank,sequence> pairs for currently playing sequences (used to optimise play control)
     std::map<uint8_t, uint16_t> m_mTriggers;             // Map of bank<<8|sequence indexed by MIDI note triggers
     std::map<uint32_t, std::vector<Sequence*>> m_mBanks; // Map of banks: vectors of pointers to sequences indexed by bank
+    void (*m_pStateCb)(uint8_t, uint8_t, Sequence*) = NULL; // Function called when a playing sequence changes state
 };
@@ -23,8 +23,12 @@
  * ******************************************************************
  */
 
+#include <atomic>  // provides std::atomic for state event queue
 #include <cstring> // provides strcmp
+#include <errno.h> // provides errno
+#include <mutex>   // provides std::mutex for state event queue
 #include <queue>
+#include <semaphore.h> // provides sem_t for state event notification
 #include <set>
 #include <string>
 #include <vector>
@@ -66,6 +70,16 @@ uint32_t g_nPattern   = 0;                          // Index of currently edited
 Sequence* g_pSequence = NULL;                       // Pattern editor sequence
 std::multimap<uint32_t, MIDI_MESSAGE*> g_mSchedule; // Schedule of MIDI events (queue for sending), indexed by scheduled play time (samples since JACK epoch)
 bool g_bMutex              = false;                 // Mutex lock for access to g_mSchedule
+
+#define STATE_EVENT_QUEUE_SIZE 1024
+SEQ_STATE_EVENT g_aStateEvents[STATE_EVENT_QUEUE_SIZE]; // Ring buffer of state events queued by jack process thread
+std::atomic<uint32_t> g_nStateEventWrite(0);            // Write index of state event ring buffer
+std::atomic<uint32_t> g_nStateEventRead(0);             // Read index of state event ring buffer
+std::vector<SEQ_STATE_EVENT> g_vApiStateEvents;         // State events queued by library functions (non-realtime threads)
+std::mutex g_mutexApiStateEvents;                       // Mutex lock for access to g_vApiStateEvents
+std::atomic<bool> g_bStateEventOverflow(false);         // True if state events were lost
+std::atomic<bool> g_bStateEventPosted(false);           // True if state event semaphore has been posted and not waited
+sem_t g_semStateEvent;                                  // Posted when state events are queued
 bool g_bDebug              = false;                 // True to output debug info
 bool g_bPatternModified    = false;                 // True if pattern has changed since last check
 bool g_bDirty              = false;                 // True if anything has been modified
@@ -513,7 +527,7 @@ int onJackProcess(jack_nframes_t nFrames, void* pArgs) {
             // Pass clock time and schedule to pattern manager so it can populate with events. Pass sync pulse so that it can synchronise its sequences, e.g.
             // start zynpad sequences
             g_nPlayingSequences =
-                g_seqMan.clock(g_qClockPos.front(), &g_mSchedule, bSync); //!@todo Optimise to reduce rate calling clock especially if we increase the clock
+                g_seqMan.clock(g_qClockPos.front(), &g_mSchedule, bSync, g_nClock == 0); //!@todo Optimise to reduce rate calling clock especially if we increase the clock
                                                                           //!rate from 24 to 96 or above. Maybe return the time until next check
             // Advance clock
             if (++g_nClock >= PPQN) {
@@ -641,6 +655,93 @@ void end() {
     }
 }
 
+// ** State event queue **
+
+// Signal that state events are pending (safe to call from jack process thread)
+static void postStateEvent() {
+    if (!g_bStateEventPosted.exchange(true))
+        sem_post(&g_semStateEvent);
+}
+
+static void fillStateEvent(SEQ_STATE_EVENT* pEvent, uint8_t bank, uint8_t sequence, Sequence* pSequence) {
+    pEvent->bank     = bank;
+    pEvent->sequence = sequence;
+    pEvent->state    = pSequence->getPlayState();
+    pEvent->mode     = pSequence->getPlayMode();
+    pEvent->group    = pSequence->getGroup();
+    uint32_t nLength = pSequence->getLength();
+    pEvent->progress = nLength ? 100 * pSequence->getPlayPosition() / nLength : 0;
+}
+
+// Queue state event - called by sequence manager from jack process thread
+static void onSequenceState(uint8_t bank, uint8_t sequence, Sequence* pSequence) {
+    uint32_t nWrite = g_nStateEventWrite.load(std::memory_order_relaxed);
+    uint32_t nNext  = (nWrite + 1) % STATE_EVENT_QUEUE_SIZE;
+    if (nNext == g_nStateEventRead.load(std::memory_order_acquire)) {
+        g_bStateEventOverflow = true;
+    } else {
+        fillStateEvent(&g_aStateEvents[nWrite], bank, sequence, pSequence);
+        g_nStateEventWrite.store(nNext, std::memory_order_release);
+    }
+    postStateEvent();
+}
+
+// Queue state event from library function (non-realtime thread)
+static void queueStateEvent(uint8_t bank, uint8_t sequence) {
+    SEQ_STATE_EVENT event;
+    fillStateEvent(&event, bank, sequence, g_seqMan.getSequence(bank, sequence));
+    {
+        std::lock_guard<std::mutex> lock(g_mutexApiStateEvents);
+        if (g_vApiStateEvents.size() < STATE_EVENT_QUEUE_SIZE)
+            g_vApiStateEvents.push_back(event);
+        else
+            g_bStateEventOverflow = true;
+    }
+    postStateEvent();
+}
+
+bool waitStateEvents(uint32_t timeout) {
+    struct timespec ts;
+    clock_gettime(CLOCK_REALTIME, &ts);
+    ts.tv_sec += timeout / 1000;
+    ts.tv_nsec += (timeout % 1000) * 1000000;
+    if (ts.tv_nsec >= 1000000000) {
+        ++ts.tv_sec;
+        ts.tv_nsec -= 1000000000;
+    }
+    while (sem_timedwait(&g_semStateEvent, &ts)) {
+        if (errno != EINTR)
+            return false;
+    }
+    g_bStateEventPosted = false;
+    return true;
+}
+
+int32_t getStateEvents(SEQ_STATE_EVENT* events, uint32_t size) {
+    if (g_bStateEventOverflow.exchange(false)) {
+        // Discard pending events - client must refresh full state
+        g_nStateEventRead.store(g_nStateEventWrite.load(std::memory_order_acquire), std::memory_order_release);
+        std::lock_guard<std::mutex> lock(g_mutexApiStateEvents);
+        g_vApiStateEvents.clear();
+        return -1;
+    }
+    uint32_t nCount = 0;
+    {
+        std::lock_guard<std::mutex> lock(g_mutexApiStateEvents);
+        for (; nCount < size && nCount < g_vApiStateEvents.size(); ++nCount)
+            events[nCount] = g_vApiStateEvents[nCount];
+        g_vApiStateEvents.erase(g_vApiStateEvents.begin(), g_vApiStateEvents.begin() + nCount);
+    }
+    uint32_t nRead  = g_nStateEventRead.load(std::memory_order_relaxed);
+    uint32_t nWrite = g_nStateEventWrite.load(std::memory_order_acquire);
+    for (; nCount < size && nRead != nWrite; ++nCount) {
+        events[nCount] = g_aStateEvents[nRead];
+        nRead          = (nRead + 1) % STATE_EVENT_QUEUE_SIZE;
+    }
+    g_nStateEventRead.store(nRead, std::memory_order_release);
+    return nCount;
+}
+
 // ** Library management functions **
 
 __attribute__((constructor)) void zynseq(void) { fprintf(stderr, "Started libzynseq\n"); }
@@ -653,6 +754,9 @@ void init(char* name) {
     g_metro_peep.data = metronome_peep;
     g_metro_peep.size = sizeof(metronome_peep) / sizeof(float);
 
+    sem_init(&g_semStateEvent, 0, 0);
+    g_seqMan.setStateCallback(onSequenceState);
+
     // Register with Jack server
     // fprintf(stderr, "**zynseq initialising as %s**\n", name);
     char* sServerName = NULL;
@@ -1936,6 +2040,7 @@ uint8_t getPlayMode(uint8_t bank, uint8_t sequence) {
 void setPlayMode(uint8_t bank, uint8_t sequence, uint8_t mode) {
     Sequence* pSequence = g_seqMan.getSequence(bank, sequence);
     pSequence->setPlayMode(mode);
+    queueStateEvent(bank, sequence);
     if (bank + sequence)
         g_bDirty = true;
 }
@@ -1954,6 +2059,7 @@ void setPlayState(uint8_t bank, uint8_t sequence, uint8_t state) {
             state = STOPPED;
     }
     g_seqMan.setSequencePlayState(bank, sequence, state);
+    queueStateEvent(bank, sequence);
     /*
     if(sequence == 0)
     {
@@ -2013,7 +2119,11 @@ uint8_t getProgress(uint8_t bank, uint8_t start, uint8_t end, uint16_t* progress
     return count;
 }
 
-void stop() { g_seqMan.stop(); }
+void stop() {
+    // Sequences removed from playing list don't get state events from clock => queue them here
+    for (auto& seq : g_seqMan.stop())
+        queueStateEvent(seq.first, seq.second);
+}
 
 uint32_t getPlayPosition(uint8_t bank, uint8_t sequence) {
     Sequence* pSequence = g_seqMan.getSequence(bank, sequence);
@@ -2057,7 +2167,8 @@ uint8_t getGroup(uint8_t bank, uint8_t sequence) {
 
 void setGroup(uint8_t bank, uint8_t sequence, uint8_t group) {
     Sequence* pSequence = g_seqMan.getSequence(bank, sequence);
-    return pSequence->setGroup(group);
+    pSequence->setGroup(group);
+    queueStateEvent(bank, sequence);
     g_bDirty = true;
 }
 
@@ -781,6 +781,21 @@ uint8_t getStateChange(uint8_t bank, uint8_t start, uint8_t end, uint32_t* state
  */
 uint8_t getProgress(uint8_t bank, uint8_t start, uint8_t end, uint16_t* progress);
 
+/** @brief  Wait for sequence state change events
+ *   @param  timeout Maximum time to wait in milliseconds
+ *   @retval bool True if events may be pending, false on timeout
+ */
+bool waitStateEvents(uint32_t timeout);
+
+/** @brief  Get pending sequence state change events
+ *   @param  events Pointer to array of SEQ_STATE_EVENT to hold results
+ *   @param  size Size of events array
+ *   @retval int32_t Quantity of events or -1 if events were lost (queue overflow) so full state must be refreshed
+ *   @note   Events are queued when a playing sequence changes state, at the start of each beat (progress) for playing sequences
+ *           and when play state, mode or group are changed by library functions
+ */
+int32_t getStateEvents(SEQ_STATE_EVENT* events, uint32_t size);
+
 /** @brief  Get quantity of tracks in a sequence
  *   @param  bank Index of bank
  *   @param  sequence Index of sequence
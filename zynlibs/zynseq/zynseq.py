@@ -26,6 +26,8 @@
 import ctypes
 import logging
 from math import sqrt
+from time import monotonic
+from threading import Thread
 from hashlib import new
 from os.path import dirname, realpath
 
@@ -45,6 +47,8 @@ from zyngine.zynthian_signal_manager import zynsigman
 #
 # -------------------------------------------------------------------------------
 
+STATE_SWEEP_INTERVAL = 1.0  # Period of check for sequences changed without state event (seconds)
+
 SEQ_EVENT_BANK = 1
 SEQ_EVENT_TEMPO = 2
 SEQ_EVENT_CHANNEL = 3
@@ -73,6 +77,18 @@ SEQ_RESTARTING = 4
 SEQ_STOPPINGSYNC = 5
 SEQ_LASTPLAYSTATUS = 5
 
+
+class SEQ_STATE_EVENT(ctypes.Structure):
+    _fields_ = [
+        ("bank", ctypes.c_uint8),
+        ("sequence", ctypes.c_uint8),
+        ("state", ctypes.c_uint8),
+        ("mode", ctypes.c_uint8),
+        ("group", ctypes.c_uint8),
+        ("progress", ctypes.c_uint8)
+    ]
+
+
 PLAY_MODES = ['Disabled', 'Oneshot', 'Loop',
               'Oneshot all', 'Loop all', 'Oneshot sync', 'Loop sync']
 
@@ -117,6 +133,11 @@ class zynseq(zynthian_engine):
             self.libseq.getProgress.argtypes = [
                 ctypes.c_uint8, ctypes.c_uint8, ctypes.c_uint8, ctypes.POINTER(ctypes.c_uint16)]
             self.libseq.getProgress.restype = ctypes.c_uint8
+            self.libseq.waitStateEvents.argtypes = [ctypes.c_uint32]
+            self.libseq.waitStateEvents.restype = ctypes.c_bool
+            self.libseq.getStateEvents.argtypes = [
+                ctypes.POINTER(SEQ_STATE_EVENT), ctypes.c_uint32]
+            self.libseq.getStateEvents.restype = ctypes.c_int32
             self.libseq.init(bytes("zynseq", "utf-8"))
         except Exception as e:
             self.libseq = None
@@ -133,13 +154,71 @@ class zynseq(zynthian_engine):
         self.bank = None
         self.select_bank(1, True)
 
+        self.seq_states = {}  # Last notified (state, mode, group, progress) indexed by sequence in current bank
+        self.exit_flag = False
+        self.state_thread = None
+        if self.libseq:
+            self.state_thread = Thread(target=self.state_thread_task, args=())
+            self.state_thread.name = "zynseq state"
+            self.state_thread.daemon = True  # thread dies with the program
+            self.state_thread.start()
+
     # Destroy instance of shared library
     def destroy(self):
+        self.exit_flag = True
+        if self.state_thread and self.state_thread.is_alive():
+            self.state_thread.join()
         if self.libseq:
             ctypes.dlclose(self.libseq._handle)
         self.libseq = None
 
-    def update_state(self):
+    # Thread that waits for sequence state change events from library and sends them as signals
+    def state_thread_task(self):
+        events = (SEQ_STATE_EVENT * 256)()
+        next_sweep = monotonic() + STATE_SWEEP_INTERVAL
+        while not self.exit_flag:
+            try:
+                timeout = max(0, int((next_sweep - monotonic()) * 1000))
+                if self.libseq.waitStateEvents(timeout):
+                    self.process_state_events(events)
+                # Periodically check sequences changed without state event, e.g. edited.
+                # Run on a fixed interval, as beat events keep coming while sequences play.
+                if monotonic() >= next_sweep:
+                    next_sweep = monotonic() + STATE_SWEEP_INTERVAL
+                    self.update_state(False)
+            except Exception as e:
+                logging.exception(e)
+
+    # Drain pending state change events from library and send signals for current bank
+    # events: Array of SEQ_STATE_EVENT used as buffer
+    def process_state_events(self, events):
+        changes = {}
+        while True:
+            count = self.libseq.getStateEvents(events, len(events))
+            if count < 0:
+                # Events were lost
+                self.seq_states = {}
+                zynsigman.send(zynsigman.S_STEPSEQ, self.SS_SEQ_REFRESH)
+                return
+            # Only latest event of each sequence matters
+            for event in events[:count]:
+                if event.bank == self.bank:
+                    changes[event.sequence] = (event.state, event.mode, event.group, event.progress)
+            if count < len(events):
+                break
+        for seq, seq_state in changes.items():
+            last_state = self.seq_states.get(seq)
+            self.seq_states[seq] = seq_state
+            if last_state is None or last_state[:3] != seq_state[:3]:
+                zynsigman.send(zynsigman.S_STEPSEQ, self.SS_SEQ_PLAY_STATE,
+                               bank=self.bank, seq=seq, state=seq_state[0], mode=seq_state[1], group=seq_state[2])
+            if last_state is None or last_state[3] != seq_state[3]:
+                zynsigman.send(zynsigman.S_STEPSEQ, self.SS_SEQ_PROGRESS,
+                               bank=self.bank, seq=seq, progress=seq_state[3])
+
+    # Send signals for sequences changed since last check
+    # progress: True to also send progress of all populated sequences
+    def update_state(self, progress=True):
         num_seq = self.col_in_bank ** 2
         states = (ctypes.c_uint32 * num_seq)()
         count = self.libseq.getStateChange(self.bank, 0, num_seq, states)
@@ -150,7 +229,8 @@ class zynseq(zynthian_engine):
             seq = (states[i] >> 24) & 0xff
             zynsigman.send(zynsigman.S_STEPSEQ, self.SS_SEQ_PLAY_STATE,
                            bank=self.bank, seq=seq, state=state, mode=mode, group=group)
-        self.update_progress()
+        if progress:
+            self.update_progress()
 
     def update_progress(self):
         num_seq = self.col_in_bank ** 2
@@ -180,6 +260,7 @@ class zynseq(zynthian_engine):
         # WARNING!!! Limited to 8 to avoid issues with GUI zynpad that have 8x8 = 64 pads
         self.col_in_bank = min(8, int(sqrt(self.seq_in_bank)))
         self.bank = bank
+        self.seq_states = {}
         zynsigman.send(zynsigman.S_STEPSEQ, self.SS_SEQ_REFRESH)
         self.changing_bank = False
 
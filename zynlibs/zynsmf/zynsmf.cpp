@@ -9,7 +9,9 @@
 #include <jack/jack.h>     //provides interface to JACK
 #include <jack/midiport.h> //provides interface to JACK MIDI ports
 #include <map>             //provides std::map
+#include <semaphore.h>     //provides sem_t for state change notifications
 #include <stdio.h>         //provides printf
+#include <thread>          //provides std::thread
 
 #define DPRINTF(fmt, args...)                                                                                                                                  \
     if (g_bDebug)                                                                                                                                              \
@@ -47,6 +49,11 @@ Smf* g_pRecorderSmf  = NULL; // Pointer to the SMF object that is attached to re
 Smf* g_pSmf          = NULL; // Pointer to the SMF containing g_pEvent (current event)
 Event* g_pEvent      = NULL; // Pointer to the current event
 
+void (*g_pStateCb)(uint8_t, uint8_t) = NULL; // Pointer to state change callback function
+std::thread* g_pNotifyThread        = NULL; // Thread that calls state change callback
+sem_t g_semStateChange;                     // Posted when play or record state may have changed
+bool g_bNotifyRunning = false;              // True while notification thread is running
+
 //!@todo If playback is active and the parent process closes then seg fault occurs probably because Jack continutes to try to access the object
 
 // Silly little class to provide a vector of pointers and clean up on exit
@@ -272,6 +279,58 @@ static int onJackSamplerate(jack_nframes_t nFrames, void* args) {
     return 0;
 }
 
+// Request state change notification (safe to call from jack process thread)
+static inline void notifyStateChange() {
+    if (g_bNotifyRunning)
+        sem_post(&g_semStateChange);
+}
+
+// Check for play or record state change since last jack process cycle
+static inline void checkStateChange() {
+    static uint8_t nLastPlayState = STOPPED;
+    static bool bLastRecording    = false;
+    if (nLastPlayState != g_nPlayState || bLastRecording != g_bRecording) {
+        nLastPlayState = g_nPlayState;
+        bLastRecording = g_bRecording;
+        notifyStateChange();
+    }
+}
+
+// Thread that calls state change callback when play or record state changes
+static void notifyThread() {
+    uint8_t nPlayState = 0xFF; // Force first notification
+    bool bRecording    = false;
+    while (true) {
+        sem_wait(&g_semStateChange);
+        if (!g_bNotifyRunning)
+            break;
+        if (nPlayState == g_nPlayState && bRecording == g_bRecording)
+            continue;
+        nPlayState = g_nPlayState;
+        bRecording = g_bRecording;
+        if (g_pStateCb)
+            g_pStateCb(nPlayState, bRecording);
+    }
+}
+
+void setStateCallback(void (*cbFn)(uint8_t, uint8_t)) {
+    if (g_pNotifyThread) {
+        g_bNotifyRunning = false;
+        sem_post(&g_semStateChange);
+        g_pNotifyThread->join();
+        delete g_pNotifyThread;
+        g_pNotifyThread = NULL;
+        sem_destroy(&g_semStateChange);
+    }
+    g_pStateCb = cbFn;
+    if (!cbFn)
+        return;
+    sem_init(&g_semStateChange, 0, 0);
+    g_bNotifyRunning = true;
+    g_pNotifyThread  = new std::thread(notifyThread);
+    notifyStateChange(); // Send current state
+}
+
 // Handle JACK process callback
 static int onJackProcess(jack_nframes_t nFrames, void* notused) {
     static uint8_t nCommand;
@@ -280,6 +339,7 @@ static int onJackProcess(jack_nframes_t nFrames, void* notused) {
 
     if (g_pMidiInputPort == NULL && g_pMidiOutputPort == NULL)
         return 0;
+    checkStateChange();
     static jack_transport_state_t nPreviousTransportState = JackTransportStopped;
     static uint8_t nPreviousPlayState                     = STOPPED;
     static uint8_t nStatus;
@@ -526,6 +586,7 @@ void startPlayback() {
         return;
     g_dPosition  = 0.0;
     g_nPlayState = STARTING;
+    notifyStateChange();
 }
 
 void stopPlayback() {
@@ -534,6 +595,7 @@ void stopPlayback() {
     g_nPlayState = STOPPING;
     if (g_pPlayerSmf)
         g_pPlayerSmf->setPosition(0);
+    notifyStateChange();
 }
 
 uint8_t getPlayState() { return g_nPlayState; }
@@ -584,12 +646,14 @@ void startRecording() {
     g_dRecorderTicksPerFrame = double(g_pRecorderSmf->getTicksPerQuarterNote()) / ((double(g_nMicrosecondsPerQuarterNote) / 1000000) * double(g_nSamplerate));
     addTempo(g_pRecorderSmf, 0, 60000000.0 / g_nMicrosecondsPerQuarterNote);
     g_bRecording = true;
+    notifyStateChange();
 }
 
 void stopRecording() {
     if (!g_bRecording)
         return;
     g_bRecording = false;
+    notifyStateChange();
     // Add note-off for any currently held notes
     for (int chan = 0; chan < 16; ++chan) {
         for (int note = 0; note < 128; ++note) {
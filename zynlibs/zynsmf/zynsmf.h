@@ -209,6 +209,12 @@ void stopRecording();
  */
 bool isRecording();
 
+/** @brief  Set callback function for play & record state changes
+ *   @param  cbFn Pointer to callback function with template void(uint8_t playState, uint8_t recording) or NULL to remove callback
+ *   @note   Callback is called from a notification thread, not from jack process thread. It is called once with current state when set.
+ */
+void setStateCallback(void (*cbFn)(uint8_t, uint8_t));
+
 /** @brief  Get tempo at current position
  *   @param  pSmf Pointer to the SMF
  *   @param  nTime Ticks from start of song
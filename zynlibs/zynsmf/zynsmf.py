@@ -28,6 +28,7 @@ from _ctypes import dlclose
 from os.path import dirname, realpath
 
 libsmf = None
+state_cb = None
 
 EVENT_TYPE_NONE = 0x00
 EVENT_TYPE_MIDI = 0x01
@@ -111,6 +112,7 @@ def init():
         libsmf.muteTrack.argtypes = [
             ctypes.c_ulong, ctypes.c_uint, ctypes.c_ubyte]
         libsmf.isTrackMuted.argtypes = [ctypes.c_ulong, ctypes.c_uint]
+        libsmf.setStateCallback.argtypes = [ctypes.c_void_p]
     except Exception as e:
         libsmf = None
         print(f"Can't initialise zynsmf library: {e}")
@@ -120,10 +122,29 @@ def init():
 def destroy():
     global libsmf
     if libsmf:
+        libsmf.setStateCallback(None)
         dlclose(libsmf._handle)
     libsmf = None
 
 
+# Set callback function for play & record state changes
+#  cb: Function called as cb(play_state, recording) from a library thread or None to remove
+def set_state_cb(cb):
+    global state_cb
+    state_cb = cb
+    if libsmf:
+        if callable(cb):
+            libsmf.setStateCallback(_state_cb)
+        else:
+            libsmf.setStateCallback(None)
+
+
+@ctypes.CFUNCTYPE(None, ctypes.c_ubyte, ctypes.c_ubyte)
+def _state_cb(play_state, recording):
+    if callable(state_cb):
+        state_cb(play_state, bool(recording))
+
+
 # Load a MIDI file
 #  smf: Pointer to smf object to populate
 #  filename: Full path and filename